@@ -0,0 +1,63 @@
+"""
+Add chat_history.response_time to an existing database
+Works on SQLite and MySQL; safe to re-run (existing columns are skipped)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import inspect, text
+
+from database.models import db, ChatHistory
+
+
+def migrate_chat_history(engine, verbose: bool = True):
+    """
+    Add the ChatHistory columns missing from chat_history (response_time
+    on databases created before it existed)
+
+    Returns:
+        List of added column names
+    """
+    added = []
+    table = ChatHistory.__table__
+    if table.name not in inspect(engine).get_table_names():
+        if verbose:
+            print(f"   • {table.name} doesn't exist yet - db.create_all() will create it")
+        return added
+
+    existing = {c['name'] for c in inspect(engine).get_columns(table.name)}
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        ddl = column.type.compile(dialect=engine.dialect)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {ddl}"))
+        added.append(column.name)
+        if verbose:
+            print(f"   ✓ Added {table.name}.{column.name} ({ddl})")
+
+    if verbose and not added:
+        print(f"   • {table.name} is up to date")
+    return added
+
+
+def main():
+    from app import app
+
+    print("=" * 70)
+    print("⏱️  ADDING CHAT RESPONSE TIME COLUMN")
+    print("=" * 70)
+
+    with app.app_context():
+        print(f"\n📊 Database: {db.engine.dialect.name}")
+        added = migrate_chat_history(db.engine)
+
+    print("\n" + "=" * 70)
+    print(f"✅ CHAT HISTORY MIGRATION COMPLETE - {len(added)} column(s) added")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Add the composite chat/expense/income indexes to an existing database
+Works on SQLite and MySQL; safe to re-run (existing indexes are skipped)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from sqlalchemy import inspect, text
+
+from database.models import db, ChatHistory, Expense, Income
+
+# Single-column indexes replaced by the composites (every query on these columns also filters by user_id)
+OBSOLETE_INDEXES = {
+    'chat_history': ['ix_chat_history_session_id', 'ix_chat_history_created_at'],
+}
+
+
+def migrate_indexes(engine, verbose: bool = True):
+    """
+    Create the models' composite indexes that are missing and drop the
+    single-column ones they replace
+
+    Returns:
+        Tuple of (created index names, dropped index names)
+    """
+    created, dropped = [], []
+    inspector = inspect(engine)
+
+    for model in (ChatHistory, Expense, Income):
+        table = model.__table__
+        existing = {ix['name'] for ix in inspector.get_indexes(table.name)}
+
+        for index in table.indexes:
+            if index.name in existing:
+                if verbose:
+                    print(f"   • {index.name} already exists")
+                continue
+            index.create(engine)
+            created.append(index.name)
+            if verbose:
+                print(f"   ✓ Created {index.name} ({', '.join(c.name for c in index.columns)})")
+
+        for name in OBSOLETE_INDEXES.get(table.name, []):
+            if name not in existing:
+                continue
+            # Plain DDL - an Index object would attach itself to the model's table
+            on_table = f" ON {table.name}" if engine.dialect.name == 'mysql' else ''
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP INDEX {name}{on_table}"))
+            dropped.append(name)
+            if verbose:
+                print(f"   ✓ Dropped {name}")
+
+    # Refresh planner statistics so the new indexes get picked up straight away
+    with engine.begin() as conn:
+        if engine.dialect.name == 'sqlite':
+            conn.execute(text("ANALYZE"))
+        elif engine.dialect.name == 'mysql':
+            conn.execute(text("ANALYZE TABLE chat_history, expenses, incomes"))
+
+    return created, dropped
+
+
+def main():
+    from app import app
+
+    print("=" * 70)
+    print("🗂️  ADDING COMPOSITE INDEXES")
+    print("=" * 70)
+
+    with app.app_context():
+        print(f"\n📊 Database: {db.engine.dialect.name}")
+        created, dropped = migrate_indexes(db.engine)
+
+    print("\n" + "=" * 70)
+    print(f"✅ INDEX MIGRATION COMPLETE - {len(created)} created, {len(dropped)} dropped")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
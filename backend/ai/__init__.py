@@ -2,5 +2,12 @@
 CredNest AI - AI Module
 """
 from .conversation_manager import ConversationManager
+from .llm_gateway import AsyncLLMGateway, LLMBusyError
+from .response_cache import ResponseCache
+from .context_builder import ContextBuilder, count_tokens
+from .session_summarizer import SessionSummarizer
+from .history_cache import HistoryCache, LocalHistoryBackend, RedisHistoryBackend
 
-__all__ = ['ConversationManager']
+__all__ = ['ConversationManager', 'AsyncLLMGateway', 'LLMBusyError', 'ResponseCache',
+           'HistoryCache', 'LocalHistoryBackend', 'RedisHistoryBackend', 'ContextBuilder', 'count_tokens',
+           'SessionSummarizer']
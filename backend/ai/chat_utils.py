@@ -3,39 +3,143 @@ CredNest AI - Enhanced Chat Utilities
 Conversation memory, greeting detection, and finance topic validation
 """
 
-def is_greeting_or_casual(message):
+import re
+
+
+def _trie_pattern(phrases) -> str:
+    """
+    Regex alternation for `phrases`, factored into a prefix trie
+
+    A flat alternation of ~150 phrases is tried branch by branch at every
+    position; as a trie each position follows at most one branch per
+    character, so a scan costs about as much as a single-phrase search.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def build(node) -> str:
+        branches = [(r'\s+' if char == ' ' else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if '' in node else body
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """
+    Matches many phrases in a single pass with word-boundary semantics
+
+    All phrases are compiled into one trie-shaped regex; each match is
+    mapped back to the labels of the phrase that produced it. Matching
+    whole words means "hi" doesn't match "this" and "sup" doesn't match
+    "support". The regex takes the longest phrase at a position ("home
+    loan" over "home"), so every phrase also carries the labels of the
+    phrases inside it ("monthly payment" is both emi and finance).
+    """
+
+    def __init__(self, phrase_groups: dict):
+        """
+        Args:
+            phrase_groups: Mapping of label -> iterable of phrases
+        """
+        self._labels = {}
+        for label, phrases in phrase_groups.items():
+            for phrase in phrases:
+                key = ' '.join(phrase.lower().split())
+                if key:
+                    self._labels.setdefault(key, set()).add(label)
+
+        for phrase, labels in self._labels.items():
+            padded = f" {phrase} "
+            for inner, inner_labels in self._labels.items():
+                if inner != phrase and f" {inner} " in padded:
+                    labels |= inner_labels
+
+        self._pattern = re.compile(rf"\b{_trie_pattern(self._labels)}\b")
+
+    def labels(self, text: str) -> set:
+        """All labels whose phrases occur in `text` (expects lowercase)"""
+        found = set()
+        for phrase in self._pattern.findall(text.replace('’', "'")):
+            labels = self._labels.get(phrase)
+            found |= labels if labels is not None else self._labels[' '.join(phrase.split())]
+        return found
+
+
+PHRASES = {
+    'greeting': [
+        'hello', 'hi', 'hii', 'hey', 'heya', 'good morning', 'good afternoon', 'good evening',
+        'whats up', "what's up", 'sup', 'howdy', 'greetings', 'hola', 'namaste', 'namaskar', 'yo'
+    ],
+    'how_are_you': ['how are you', 'how are u', 'how r u', 'how do you do', 'nice to meet you',
+                    'pleasure to meet you'],
+    'thanks': ['thank you', 'thanks', 'thank u', 'thnks', 'thnx', 'thx', 'appreciate it', 'appreciate'],
+    'farewell': ['bye', 'goodbye', 'see you', 'see ya', 'take care', 'good night', 'later'],
+    'identity': ['who are you', 'what can you do', 'what is your name', "what's your name",
+                 'introduce yourself', 'what do you do'],
+    'help': ['help me'],
+    'praise': ['great', 'awesome', 'cool', 'nice', 'perfect', 'excellent'],
+    'finance': [
+        'loan', 'loans', 'interest', 'bank', 'banks', 'banking', 'credit', 'cibil', 'score', 'mortgage',
+        'finance', 'financial', 'savings', 'investment', 'investments', 'insurance', 'money', 'budget',
+        'debt', 'eligibility', 'rate', 'rates', 'home loan', 'personal loan', 'car loan', 'education loan',
+        'repayment', 'tenure', 'processing fee', 'mutual fund', 'mutual funds', 'sip', 'stock', 'stocks',
+        'equity', 'fd', 'fixed deposit', 'ppf', 'nps', 'tax', 'taxes', 'deduction', 'sbi', 'hdfc', 'icici',
+        'axis', 'kotak', 'pnb', 'calculate', 'compare', 'apply', 'income', 'salary', 'expense', 'expenses',
+        'save', 'saving', 'invest', 'payment', 'account', 'rupee', 'rupees', 'rs', 'inr', 'lakh', 'lakhs',
+        'crore', 'crores', 'how much', 'best bank', 'which bank', 'should i', 'retirement', 'pension',
+        'gold', 'bonds', 'credit card'
+    ],
+    'emi': ['emi', 'emis', 'monthly installment', 'monthly instalment', 'monthly payment'],
+    'eligibility': ['eligible', 'eligibility', 'qualify', 'can i get', 'will i get', 'get approved'],
+    'documents': ['document', 'documents', 'docs', 'papers', 'paperwork', 'kyc']
+}
+
+SMALL_TALK_LABELS = frozenset({'greeting', 'how_are_you', 'thanks', 'farewell', 'identity', 'help', 'praise'})
+FINANCE_LABELS = frozenset({'finance', 'emi', 'eligibility', 'documents'})
+
+KEYWORD_MATCHER = KeywordMatcher(PHRASES)
+_DIGIT = re.compile(r'\d')
+
+
+def message_flags(message):
+    """
+    Classify a message in one pass over the compiled matcher
+
+    Returns:
+        Dictionary with the matched 'labels' plus 'casual', 'short' and
+        'finance' flags
+    """
+    text = message.lower().strip()
+    labels = KEYWORD_MATCHER.labels(text)
+    # Very short non-numeric messages ("hmm", "ok then") count as casual
+    short = len(text.split()) <= 3 and not _DIGIT.search(text)
+    return {
+        'labels': labels,
+        'casual': bool(labels & SMALL_TALK_LABELS) or short,
+        'short': short,
+        'finance': bool(labels & FINANCE_LABELS)
+    }
+
+
+def is_greeting_or_casual(message, flags=None):
     """Detect greetings and casual conversation"""
-    greetings = [
-        'hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening',
-        'how are you', 'how are u', 'whats up', "what's up", 'sup', 'howdy',
-        'greetings', 'hola', 'namaste', 'namaskar',
-        'how do you do', 'nice to meet you', 'pleasure to meet you'
-    ]
-    
-    casual_phrases = [
-        'thank you', 'thanks', 'thank u', 'thnks', 'thnx', 'appreciate',
-        'great', 'awesome', 'cool', 'nice', 'perfect', 'excellent',
-        'bye', 'goodbye', 'see you', 'take care', 'later',
-        'who are you', 'what can you do', 'help me', 'what is your name'
-    ]
-    
-    message_lower = message.lower().strip()
-    
-    for greeting in greetings + casual_phrases:
-        if greeting in message_lower:
-            return True
-    
-    if len(message_lower.split()) <= 3 and not any(char.isdigit() for char in message_lower):
-        return True
-    
-    return False
+    return (flags or message_flags(message))['casual']
 
 
-def generate_friendly_response(message):
-    """Generate contextual friendly responses"""
-    message_lower = message.lower().strip()
+def generate_friendly_response(message, labels=None):
+    """Generate contextual friendly responses (pass `labels` to reuse an earlier scan)"""
+    if labels is None:
+        labels = message_flags(message)['labels']
     
-    if any(word in message_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']):
+    if 'greeting' in labels:
         return ("Hello! 👋 I'm CredNest AI, your personal finance assistant!\n\n"
                 "I'm here to help you with:\n"
                 "💰 **Loans** - Personal, Home, Car, Education\n"
@@ -45,21 +149,21 @@ def generate_friendly_response(message):
                 "📄 **Documentation** - Know what you need\n\n"
                 "What would you like to know about today? 😊")
     
-    if 'how are you' in message_lower or 'how are u' in message_lower:
+    if 'how_are_you' in labels:
         return ("I'm doing great, thank you for asking! 😊\n\n"
                 "I'm always excited to help people with their financial questions! "
                 "Whether it's finding the best loan rates, understanding CIBIL scores, "
                 "or planning your finances, I'm here for you.\n\n"
                 "What financial question can I help you with today? 💡")
     
-    if any(word in message_lower for word in ['thank you', 'thanks', 'thank u', 'thnx', 'appreciate']):
+    if 'thanks' in labels:
         return ("You're very welcome! 😊\n\n"
                 "I'm glad I could help! If you have any more questions about "
                 "loans, banking, CIBIL scores, or anything finance-related, "
                 "feel free to ask anytime. I'm here to help! 💪\n\n"
                 "Is there anything else you'd like to know? 🤔")
     
-    if any(phrase in message_lower for phrase in ['who are you', 'what can you do', 'what is your name', 'introduce yourself']):
+    if 'identity' in labels:
         return ("I'm **CredNest AI** 🛡️ - Your intelligent financial assistant!\n\n"
                 "**What I do:**\n"
                 "🏦 Help you find the best loans across all major Indian banks\n"
@@ -71,7 +175,7 @@ def generate_friendly_response(message):
                 "**I remember** our conversation, so you can ask follow-up questions!\n\n"
                 "What would you like help with? 😊")
     
-    if any(word in message_lower for word in ['bye', 'goodbye', 'see you', 'take care']):
+    if 'farewell' in labels:
         return ("Take care! 👋\n\n"
                 "Remember, I'm always here when you need financial guidance. "
                 "Come back anytime you have questions about loans, banking, or finances!\n\n"
@@ -86,32 +190,31 @@ def generate_friendly_response(message):
             "Could you please ask me a finance-related question? 💡")
 
 
-def is_finance_related(message):
+def is_finance_related(message, flags=None):
     """Enhanced finance detection"""
-    finance_keywords = [
-        'loan', 'emi', 'interest', 'bank', 'credit', 'cibil', 'score', 'mortgage', 
-        'finance', 'financial', 'savings', 'investment', 'insurance', 'money', 'budget',
-        'debt', 'eligibility', 'document', 'rate', 'home loan', 'personal loan', 
-        'car loan', 'education loan', 'repayment', 'tenure', 'processing fee',
-        'mutual fund', 'stock', 'equity', 'fd', 'fixed deposit', 'tax', 'deduction',
-        'sbi', 'hdfc', 'icici', 'axis', 'kotak', 'calculate', 'compare', 'apply',
-        'income', 'salary', 'expense', 'save', 'invest', 'payment', 'account',
-        'rupee', 'lakh', 'crore', 'how much', 'best bank', 'which bank', 'should i'
-    ]
-    
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in finance_keywords)
+    return (flags or message_flags(message))['finance']
 
 
-def get_session_history_from_db(session_id, user_id, limit=10):
-    """Retrieve conversation history from database"""
+def get_session_history_from_db(session_id, user_id, limit=10, history_cache=None):
+    """
+    Retrieve conversation history, from the HistoryCache when the session
+    is hot and from the database otherwise (seeding the cache on success)
+    """
     from database.models import ChatHistory
     
+    if history_cache is not None:
+        cached = history_cache.get(user_id, session_id, limit)
+        if cached is not None:
+            return cached
+    
+    # Load enough rows to fill the session's ring buffer
+    fetch_limit = max(limit, history_cache.max_turns) if history_cache is not None else limit
+    
     try:
         chats = ChatHistory.query.filter_by(
             session_id=session_id,
             user_id=user_id
-        ).order_by(ChatHistory.created_at.desc()).limit(limit).all()
+        ).order_by(ChatHistory.created_at.desc()).limit(fetch_limit).all()
         
         # Reverse to get chronological order
         chats = list(reversed(chats))
@@ -119,17 +222,56 @@ def get_session_history_from_db(session_id, user_id, limit=10):
         history = []
         for chat in chats:
             history.append({
+                'id': chat.id,
                 'user': chat.message,
                 'assistant': chat.response,
                 'timestamp': chat.created_at
             })
         
-        return history
+        if history_cache is not None:
+            history_cache.set(user_id, session_id, history)
+        
+        return history[-limit:] if limit else history
     except Exception as e:
         print(f"⚠️  Error retrieving session history: {e}")
         return []
 
 
+def list_chat_sessions(user_id, limit=50, after=None):
+    """
+    List a user's chat sessions, most recently active first
+    
+    Reads the denormalized chat_sessions table, walking the
+    (user_id, last_message_at) index - one query, no aggregation.
+    
+    Args:
+        user_id: Owner of the sessions
+        limit: Sessions per page
+        after: (last_message_at, session_id) of the previous page's last row
+    
+    Returns:
+        Tuple of (list of ChatSession rows, (last_message_at, session_id) to
+        continue from, or None on the last page)
+    """
+    from database.models import db, ChatSession
+    
+    query = ChatSession.query.filter_by(user_id=user_id)
+    if after:
+        last_message_at, session_id = after
+        query = query.filter(db.or_(
+            ChatSession.last_message_at < last_message_at,
+            db.and_(ChatSession.last_message_at == last_message_at, ChatSession.session_id < session_id)
+        ))
+    
+    rows = query.order_by(ChatSession.last_message_at.desc(), ChatSession.session_id.desc()).limit(limit + 1).all()
+    sessions = rows[:limit]
+    
+    next_key = None
+    if len(rows) > limit:
+        next_key = (sessions[-1].last_message_at, sessions[-1].session_id)
+    return sessions, next_key
+
+
 def build_enhanced_system_prompt():
     """Build enhanced system prompt with comprehensive finance expertise"""
     return """You are CredNest AI, an **elite financial advisor and expert** specializing in Indian banking, loans, investments, insurance, and comprehensive personal finance. You have deep knowledge of the Indian financial ecosystem and genuinely care about helping users make informed, smart financial decisions.
@@ -0,0 +1,149 @@
+"""
+CredNest AI - Context Window Builder
+Packs the system prompt, recent conversation turns and the new message
+into a token budget. The newest turns are kept verbatim; older assistant
+answers are cut down to their opening sentences, and turns that still
+don't fit are dropped. A session summary, when present, is sent as a
+second system message.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+# Words and individual symbols; long words are split the way BPE vocabularies do
+_TOKEN_PIECES = re.compile(r'\w+|[^\w\s]')
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+# Chat-format overhead per message (role + separators)
+MESSAGE_OVERHEAD = 4
+
+# Counts of recently seen texts, keyed on (hash, length) so the cache never keeps the texts alive
+_COUNT_CACHE_SIZE = 4096
+_counts = OrderedDict()
+_counts_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estimate Llama-style BPE tokens locally (no tokenizer download)
+
+    Every word or symbol is at least one token, with one more for each
+    further 6 characters of a long word. Close enough for budgeting; the
+    provider's own prompt_tokens figure is reported alongside it. The
+    system prompt and history turns are counted on every request, so
+    recent counts are memoized by the text's hash.
+    """
+    if not text:
+        return 0
+    key = (hash(text), len(text))
+    with _counts_lock:
+        count = _counts.get(key)
+        if count is not None:
+            _counts.move_to_end(key)
+            return count
+
+    count = sum(1 + (len(piece) - 1) // 6 for piece in _TOKEN_PIECES.findall(text))
+
+    with _counts_lock:
+        _counts[key] = count
+        while len(_counts) > _COUNT_CACHE_SIZE:
+            _counts.popitem(last=False)
+    return count
+
+
+def compress_answer(text: str, max_tokens: int) -> str:
+    """Keep the leading sentences of an answer that fit in `max_tokens`"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    kept, used = [], 0
+    for sentence in _SENTENCE_END.split(text):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        cost = count_tokens(sentence)
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    if not kept:
+        # First sentence alone is over budget - cut it by words
+        words = text.split()
+        kept = [' '.join(words[:max(1, int(max_tokens * 0.75))])]
+    return ' '.join(kept) + ' …'
+
+
+class ContextBuilder:
+    """Builds token-budgeted message lists for the chat model"""
+
+    def __init__(self, token_budget: int = 4000, full_turns: int = 2, old_answer_tokens: int = 150):
+        """
+        Args:
+            token_budget: Maximum prompt tokens (system + history + message)
+            full_turns: Most recent turns kept verbatim when they fit
+            old_answer_tokens: Cap for older assistant answers
+        """
+        self.token_budget = token_budget
+        self.full_turns = full_turns
+        self.old_answer_tokens = old_answer_tokens
+
+    def build(self, system_prompt: str, history: list, user_message: str, summary: str = None):
+        """
+        Build the message list, with the session's rolling summary (if any)
+        standing in for turns older than `history`
+
+        Returns:
+            Tuple of (messages, stats) where stats reports prompt_tokens,
+            prompt_tokens_saved against the untrimmed history, and how many
+            turns were included, compressed or dropped
+        """
+        summary_message = f"Summary of the earlier conversation:\n{summary}" if summary else None
+        summary_tokens = count_tokens(summary_message) + MESSAGE_OVERHEAD if summary_message else 0
+        fixed = count_tokens(system_prompt) + count_tokens(user_message) + 2 * MESSAGE_OVERHEAD + summary_tokens
+        remaining = self.token_budget - fixed
+
+        turns = []
+        compressed = 0
+        # Newest first so the latest context always wins the budget
+        for age, exchange in enumerate(reversed(history)):
+            question = exchange['user']
+            answer = exchange['assistant'] or ''
+            question_cost = count_tokens(question) + 2 * MESSAGE_OVERHEAD
+            full_cost = question_cost + count_tokens(answer)
+
+            if age < self.full_turns and full_cost <= remaining:
+                turns.append((question, answer))
+                remaining -= full_cost
+                continue
+
+            answer_budget = min(self.old_answer_tokens, remaining - question_cost)
+            if answer_budget <= 0:
+                break
+            short_answer = compress_answer(answer, answer_budget)
+            cost = question_cost + count_tokens(short_answer)
+            if cost > remaining:
+                break
+            turns.append((question, short_answer))
+            remaining -= cost
+            compressed += short_answer != answer
+
+        messages = [{"role": "system", "content": system_prompt}]
+        if summary_message:
+            messages.append({"role": "system", "content": summary_message})
+        for question, answer in reversed(turns):
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        messages.append({"role": "user", "content": user_message})
+
+        prompt_tokens = self.token_budget - remaining
+        untrimmed = fixed + sum(count_tokens(e['user']) + count_tokens(e['assistant'] or '') + 2 * MESSAGE_OVERHEAD
+                                for e in history)
+        return messages, {
+            'prompt_tokens': prompt_tokens,
+            'prompt_tokens_saved': untrimmed - prompt_tokens,
+            'token_budget': self.token_budget,
+            'summary_tokens': summary_tokens,
+            'turns_included': len(turns),
+            'turns_compressed': compressed,
+            'turns_dropped': len(history) - len(turns)
+        }
@@ -13,107 +13,388 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 from ai.chat_utils import (
-    is_greeting_or_casual,
     generate_friendly_response,
-    is_finance_related,
     get_session_history_from_db,
     build_enhanced_system_prompt
 )
+from ai.intent_classifier import IntentClassifier, GREETING, OFF_TOPIC, TOOL
+from ai.llm_gateway import LLMBusyError
+from ai.context_builder import ContextBuilder, compress_answer
+from ai.session_summarizer import SUMMARY_PROMPT
+from ai.tool_registry import get_tool_definitions, execute_tool
+from ai.tool_formatters import format_tool_result
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+OFF_TOPIC_RESPONSE = ("I appreciate your question! 😊 However, I specialize in **financial topics only**.\n\n"
+                      "I can help you with:\n"
+                      "💰 **Loans** - Personal, Home, Car, Education\n"
+                      "📊 **CIBIL Scores** - Understanding and improving\n"
+                      "💳 **Banking** - Rates, eligibility, comparisons\n"
+                      "🧮 **EMI Calculations** - Planning your payments\n"
+                      "📄 **Financial Documentation** - What you need\n\n"
+                      "Could you ask me a finance-related question? I'd love to help! 💡")
+
+ERROR_RESPONSE = ("I apologize, but I'm experiencing technical difficulties right now. "
+                  "Could you please try asking your question again in a moment? 😊\n\n"
+                  "In the meantime, you can try our EMI calculator or eligibility checker!")
+
+
 class ConversationManager:
     """Enhanced finance AI with conversation memory"""
     
-    def __init__(self, api_key):
-        if not api_key:
+    def __init__(self, api_key, client=None, gateway=None, cache=None, history_cache=None,
+                 context_builder=None, summarizer=None, use_tools=True):
+        if not api_key and client is None:
             raise ValueError("API key required")
         
-        self.client = Groq(api_key=api_key)
+        # `client` lets callers inject any Groq-compatible client (e.g. a local fake)
+        self.client = client if client is not None else Groq(api_key=api_key)
+        # Optional AsyncLLMGateway - routes blocking completions through the async pool
+        self.gateway = gateway
+        # Optional ResponseCache for repeated, history-free questions
+        self.cache = cache
+        # Optional HistoryCache - hot sessions skip the chat_history query
+        self.history_cache = history_cache
+        # Packs system prompt + recent turns into a prompt token budget
+        self.context_builder = context_builder or ContextBuilder()
+        # Optional SessionSummarizer - older turns reach the prompt as a rolling summary
+        self.summarizer = summarizer
+        self.history_limit = summarizer.history_limit if summarizer else 8
         self.model = "llama-3.3-70b-versatile"
         self.system_prompt = build_enhanced_system_prompt()
+        # Function-calling tools answered in-process from backend/tools
+        self.tools = get_tool_definitions() if use_tools else None
+        self.classifier = IntentClassifier()
         logger.info("✓ AI initialized with enhanced memory")
     
+    def _run_tool(self, name: str, arguments: dict) -> dict:
+        """Execute a tool in-process; returns a response if its output fully answers the question"""
+        result = execute_tool(name, arguments)
+        text = format_tool_result(name, result)
+        if text is None:
+            return None
+        return {
+            'message': text,
+            'tool_used': name,
+            'tool_parameters': arguments,
+            'data': result,
+            'status': 'success'
+        }
+    
+    def _local_response(self, user_message: str) -> dict:
+        """Answer greetings, off-topic messages and tool questions without the LLM"""
+        intent = self.classifier.classify(user_message)
+        
+        if intent['intent'] == TOOL and self.tools:
+            response = self._run_tool(intent['tool'], intent['arguments'])
+            if response:
+                logger.info(f"🛠️  Answered locally with {intent['tool']}")
+                return response
+        
+        if intent['intent'] == GREETING:
+            return {
+                'message': generate_friendly_response(user_message, intent['labels']),
+                'tool_used': 'greeting_handler',
+                'tool_parameters': None,
+                'data': None,
+                'status': 'success'
+            }
+        
+        if intent['intent'] == OFF_TOPIC:
+            return {
+                'message': OFF_TOPIC_RESPONSE,
+                'tool_used': 'topic_filter',
+                'tool_parameters': None,
+                'data': None,
+                'status': 'success'
+            }
+        
+        return None
+    
+    def _complete(self, **kwargs):
+        """Blocking chat completion, through the async gateway when configured"""
+        if self.gateway:
+            return self.gateway.complete(**kwargs)
+        return self.client.chat.completions.create(**kwargs)
+    
+    def _stream(self, **kwargs):
+        """Streaming chat completion, through the async gateway when configured"""
+        if self.gateway:
+            return self.gateway.stream(**kwargs)
+        return self.client.chat.completions.create(stream=True, **kwargs)
+    
+    def _handle_tool_calls(self, messages: list, assistant_message, tool_calls) -> dict:
+        """Run model-requested tools locally, skipping the second turn when possible"""
+        calls = []
+        for call in tool_calls:
+            try:
+                arguments = json.loads(call.function.arguments or '{}')
+            except json.JSONDecodeError:
+                arguments = {}
+            calls.append((call, arguments))
+        
+        # A single self-contained tool answers the question on its own
+        if len(calls) == 1:
+            call, arguments = calls[0]
+            direct = self._run_tool(call.function.name, arguments)
+            if direct:
+                logger.info(f"🛠️  {call.function.name} answered without a second LLM turn")
+                return direct
+        
+        messages.append({
+            "role": "assistant",
+            "content": assistant_message.content or "",
+            "tool_calls": [{
+                "id": call.id,
+                "type": "function",
+                "function": {"name": call.function.name, "arguments": call.function.arguments}
+            } for call, _ in calls]
+        })
+        # A list, not a dict by tool name - the model may call the same tool twice (e.g. comparing two loans)
+        results = []
+        for call, arguments in calls:
+            result = execute_tool(call.function.name, arguments)
+            results.append({'id': call.id, 'name': call.function.name, 'arguments': arguments, 'result': result})
+            messages.append({
+                "role": "tool",
+                "tool_call_id": call.id,
+                "content": json.dumps(result, default=str)
+            })
+        
+        logger.info(f"🤖 Explaining results of {len(calls)} tool calls...")
+        response = self._complete(**self._completion_kwargs(messages))
+        
+        return {
+            'message': response.choices[0].message.content,
+            'tool_used': results[0]['name'],
+            'tool_parameters': {
+                'tool_calls': len(results),
+                'calls': [{'name': item['name'], 'arguments': item['arguments']} for item in results]
+            },
+            'data': results,
+            'status': 'success'
+        }
+    
+    @staticmethod
+    def _history_length(messages: list) -> int:
+        """Previous user/assistant messages in the prompt (not the system prompt, summary or current message)"""
+        return sum(1 for message in messages[:-1] if message['role'] != 'system')
+    
+    def _get_history(self, user_id: int = None, session_id: str = None):
+        """
+        Fetch recent exchanges for the session, if any
+        
+        Returns:
+            Tuple of (unsummarized recent exchanges, rolling summary or None)
+        """
+        if not (session_id and user_id):
+            return [], None
+        try:
+            history = get_session_history_from_db(session_id, user_id, limit=self.history_limit,
+                                                  history_cache=self.history_cache)
+        except Exception as e:
+            logger.warning(f"Could not retrieve history: {e}")
+            return [], None
+        
+        summary = None
+        if self.summarizer:
+            try:
+                summary, history = self.summarizer.prepare(user_id, session_id, history, self._summarize)
+            except Exception as e:
+                # LLMBusyError included: answer from the unsummarized window rather than no history
+                logger.warning(f"Session summary unavailable ({e}) - using the raw window")
+        logger.info(f"📚 Retrieved {len(history)} previous messages{' + summary' if summary else ''}")
+        return history, summary
+    
+    def _summarize(self, previous: str, turns: list) -> str:
+        """Fold exchanges into the running session summary with a short LLM call"""
+        exchanges = "\n\n".join(
+            f"User: {turn['user']}\nAssistant: {compress_answer(turn['assistant'] or '', 250)}" for turn in turns
+        )
+        response = self._complete(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": f"Current summary:\n{previous or '(none)'}\n\nNew exchanges:\n{exchanges}"}
+            ],
+            temperature=0.2,
+            max_tokens=self.summarizer.max_summary_tokens
+        )
+        return (response.choices[0].message.content or '').strip()
+    
+    def _build_messages(self, user_message: str, history: list, summary: str = None):
+        """
+        Build the LLM message list with system prompt, session summary and history
+        
+        Returns:
+            Tuple of (messages, context stats from the ContextBuilder)
+        """
+        messages, context = self.context_builder.build(self.system_prompt, history, user_message, summary)
+        logger.info(f"🧮 Prompt ~{context['prompt_tokens']} tokens "
+                    f"({context['turns_included']}/{len(history)} turns, "
+                    f"{context['turns_compressed']} compressed, {context['prompt_tokens_saved']} saved)")
+        return messages, context
+    
+    @staticmethod
+    def _usage(context: dict, response=None) -> dict:
+        """Prompt token report attached to every LLM response"""
+        usage = getattr(response, 'usage', None)
+        return {
+            'prompt_tokens': getattr(usage, 'prompt_tokens', None),
+            'completion_tokens': getattr(usage, 'completion_tokens', None),
+            'estimated_prompt_tokens': context['prompt_tokens'],
+            'prompt_tokens_saved': context['prompt_tokens_saved'],
+            'summary_tokens': context['summary_tokens'],
+            'turns_compressed': context['turns_compressed'],
+            'turns_dropped': context['turns_dropped']
+        }
+    
+    def _cached_response(self, user_message: str, history: list) -> dict:
+        """Return a cached answer for history-free questions"""
+        if not self.cache:
+            return None
+        if history:
+            # Follow-ups depend on the conversation - never serve them from cache
+            self.cache.record_bypass()
+            return None
+        
+        cached, tier = self.cache.get(user_message, self.system_prompt)
+        if cached:
+            logger.info(f"⚡ Response cache hit ({tier})")
+            cached['tool_used'] = 'response_cache'
+            cached['tool_parameters'] = {'cache_tier': tier, 'history_length': 0}
+            # No prompt was sent for this answer
+            cached.pop('usage', None)
+        return cached
+    
+    def _store_response(self, user_message: str, history: list, response: dict, completion_tokens: int = None):
+        """Cache a successful history-free LLM answer"""
+        if self.cache and not history and response.get('status') == 'success':
+            self.cache.set(user_message, self.system_prompt, response, completion_tokens)
+    
+    def _completion_kwargs(self, messages: list) -> dict:
+        """Groq completion parameters shared by blocking and streaming calls"""
+        return {
+            'model': self.model,
+            'messages': messages,
+            'temperature': 0.8,  # Slightly higher for more creative, detailed responses
+            'max_tokens': 4096,  # Increased for comprehensive answers
+            'top_p': 0.95  # Higher for more diverse, detailed outputs
+        }
+    
     def process_message(self, user_message: str, user_id: int = None, session_id: str = None) -> dict:
         """Process message with conversation memory and context"""
         try:
-            # Check if greeting/casual conversation
-            if is_greeting_or_casual(user_message):
-                response_text = generate_friendly_response(user_message)
-                return {
-                    'message': response_text,
-                    'tool_used': 'greeting_handler',
-                    'tool_parameters': None,
-                    'data': None,
-                    'status': 'success'
-                }
-            
-            # Check if finance-related
-            if not is_finance_related(user_message):
-                response_text = ("I appreciate your question! 😊 However, I specialize in **financial topics only**.\n\n"
-                               "I can help you with:\n"
-                               "💰 **Loans** - Personal, Home, Car, Education\n"
-                               "📊 **CIBIL Scores** - Understanding and improving\n"
-                               "💳 **Banking** - Rates, eligibility, comparisons\n"
-                               "🧮 **EMI Calculations** - Planning your payments\n"
-                               "📄 **Financial Documentation** - What you need\n\n"
-                               "Could you ask me a finance-related question? I'd love to help! 💡")
-                
-                return {
-                    'message': response_text,
-                    'tool_used': 'topic_filter',
-                    'tool_parameters': None,
-                    'data': None,
-                    'status': 'success'
-                }
+            local = self._local_response(user_message)
+            if local:
+                return local
             
             # Build conversation with history
-            messages = [{"role": "system", "content": self.system_prompt}]
-            
-            # Add conversation history if available
-            if session_id and user_id:
-                try:
-                    history = get_session_history_from_db(session_id, user_id, limit=8)
-                    logger.info(f"📚 Retrieved {len(history)} previous messages")
-                    
-                    for exchange in history:
-                        messages.append({"role": "user", "content": exchange['user']})
-                        messages.append({"role": "assistant", "content": exchange['assistant']})
-                except Exception as e:
-                    logger.warning(f"Could not retrieve history: {e}")
-            
-            # Add current message
-            messages.append({"role": "user", "content": user_message})
+            history, summary = self._get_history(user_id, session_id)
+            cached = self._cached_response(user_message, history)
+            if cached:
+                return cached
+            messages, context = self._build_messages(user_message, history, summary)
             
             logger.info(f"🤖 Calling Groq API with {len(messages)} messages...")
             
             # Call Groq API with optimized parameters for detailed responses
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.8,  # Slightly higher for more creative, detailed responses
-                max_tokens=4096,  # Increased for comprehensive answers
-                top_p=0.95  # Higher for more diverse, detailed outputs
-            )
+            kwargs = self._completion_kwargs(messages)
+            if self.tools:
+                kwargs['tools'] = self.tools
+                kwargs['tool_choice'] = 'auto'
+            response = self._complete(**kwargs)
+            
+            tool_calls = getattr(response.choices[0].message, 'tool_calls', None)
+            if tool_calls:
+                result = self._handle_tool_calls(messages, response.choices[0].message, tool_calls)
+                result['usage'] = self._usage(context, response)
+                self._store_response(user_message, history, result)
+                return result
             
             message_content = response.choices[0].message.content
             logger.info(f"✅ Got response: {message_content[:100]}...")
             
-            return {
+            result = {
                 'message': message_content,
                 'tool_used': 'ai_chat',
-                'tool_parameters': {'history_length': len(messages) - 2},  # Exclude system and current message
+                'tool_parameters': {'history_length': self._history_length(messages)},
                 'data': None,
-                'status': 'success'
+                'status': 'success',
+                'usage': self._usage(context, response)
             }
+            self._store_response(user_message, history, result, result['usage']['completion_tokens'])
+            return result
             
+        except LLMBusyError:
+            # Let the route turn backpressure into a 429
+            raise
         except Exception as e:
             logger.error(f"Error: {e}")
             return {
-                'message': ("I apologize, but I'm experiencing technical difficulties right now. "
-                          "Could you please try asking your question again in a moment? 😊\n\n"
-                          "In the meantime, you can try our EMI calculator or eligibility checker!"),
+                'message': ERROR_RESPONSE,
+                'tool_used': None,
+                'tool_parameters': None,
+                'data': None,
+                'status': 'error',
+                'error': str(e)
+            }
+    
+    def stream_message(self, user_message: str, user_id: int = None, session_id: str = None):
+        """
+        Stream a reply as it is generated
+        
+        Yields ('token', text) for every content delta, then a final
+        ('done', response_dict) carrying the full message in the same shape
+        as process_message so the caller can persist the exchange.
+        """
+        try:
+            local = self._local_response(user_message)
+            if local:
+                yield 'token', local['message']
+                yield 'done', local
+                return
+            
+            history, summary = self._get_history(user_id, session_id)
+            cached = self._cached_response(user_message, history)
+            if cached:
+                yield 'token', cached['message']
+                yield 'done', cached
+                return
+            messages, context = self._build_messages(user_message, history, summary)
+            logger.info(f"🤖 Streaming Groq API with {len(messages)} messages...")
+            
+            stream = self._stream(**self._completion_kwargs(messages))
+            
+            parts = []
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield 'token', delta
+            
+            result = {
+                'message': ''.join(parts),
+                'tool_used': 'ai_chat',
+                'tool_parameters': {'history_length': self._history_length(messages)},
+                'data': None,
+                'status': 'success',
+                'usage': self._usage(context)
+            }
+            self._store_response(user_message, history, result)
+            yield 'done', result
+            
+        except LLMBusyError:
+            # Raised before the first token - the route answers 429
+            raise
+        except Exception as e:
+            logger.error(f"Streaming error: {e}")
+            yield 'done', {
+                'message': ERROR_RESPONSE,
                 'tool_used': None,
                 'tool_parameters': None,
                 'data': None,
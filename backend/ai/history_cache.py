@@ -0,0 +1,234 @@
+"""
+CredNest AI - Conversation History Cache
+Per-session ring buffers of recent exchanges so hot sessions build their
+LLM context without querying chat_history. Populated on write, falls back
+to the database on a miss, with per-user and memory caps.
+
+Buffers live in a pluggable backend: LocalHistoryBackend keeps them in
+process (one copy per worker), RedisHistoryBackend shares them between
+workers so a delete on one worker is seen by all.
+"""
+
+import json
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+
+
+def _entry_size(entry: dict) -> int:
+    """Approximate bytes held by one cached exchange"""
+    return len(entry.get('user') or '') + len(entry.get('assistant') or '') + 64
+
+
+class LocalHistoryBackend:
+    """In-process stand-in for a shared key/list store"""
+
+    def __init__(self):
+        self._buffers = {}
+
+    def get(self, key: str):
+        buffer = self._buffers.get(key)
+        return list(buffer) if buffer is not None else None
+
+    def set(self, key: str, entries: list, max_turns: int):
+        self._buffers[key] = deque(entries, maxlen=max_turns)
+
+    def append(self, key: str, entry: dict, max_turns: int):
+        """Append to an existing buffer, returning its entries (None if not cached)"""
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            return None
+        buffer.append(entry)
+        return list(buffer)
+
+    def delete(self, key: str):
+        self._buffers.pop(key, None)
+
+    def delete_prefix(self, prefix: str):
+        for key in [k for k in self._buffers if k.startswith(prefix)]:
+            del self._buffers[key]
+
+
+class RedisHistoryBackend:
+    """Shared backend storing each ring buffer as a capped Redis list"""
+
+    def __init__(self, url: str, ttl: int = 86400, prefix: str = 'crednest:history:'):
+        import redis  # Optional dependency, only needed for the shared backend
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @staticmethod
+    def _encode(entry: dict) -> str:
+        timestamp = entry.get('timestamp')
+        if isinstance(timestamp, datetime):
+            entry = dict(entry, timestamp=timestamp.isoformat())
+        return json.dumps(entry)
+
+    def _names(self, key: str):
+        # Redis can't hold an empty list, so a marker key records "cached" separately
+        return self.prefix + key, self.prefix + key + ':cached'
+
+    def get(self, key: str):
+        items, marker = self._names(key)
+        pipe = self._redis.pipeline()
+        pipe.exists(marker)
+        pipe.lrange(items, 0, -1)
+        cached, values = pipe.execute()
+        return [json.loads(value) for value in values] if cached else None
+
+    def set(self, key: str, entries: list, max_turns: int):
+        items, marker = self._names(key)
+        pipe = self._redis.pipeline()
+        pipe.delete(items)
+        if entries:
+            pipe.rpush(items, *[self._encode(e) for e in entries[-max_turns:]])
+            pipe.expire(items, self.ttl)
+        pipe.set(marker, 1, ex=self.ttl)
+        pipe.execute()
+
+    def append(self, key: str, entry: dict, max_turns: int):
+        items, marker = self._names(key)
+        if not self._redis.exists(marker):
+            return None
+        pipe = self._redis.pipeline()
+        pipe.rpush(items, self._encode(entry))
+        pipe.ltrim(items, -max_turns, -1)
+        pipe.expire(items, self.ttl)
+        pipe.expire(marker, self.ttl)
+        pipe.lrange(items, 0, -1)
+        return [json.loads(value) for value in pipe.execute()[-1]]
+
+    def delete(self, key: str):
+        self._redis.delete(*self._names(key))
+
+    def delete_prefix(self, prefix: str):
+        names = list(self._redis.scan_iter(match=f"{self.prefix}{prefix}*", count=500))
+        if names:
+            self._redis.delete(*names)
+
+
+class HistoryCache:
+    """Thread-safe ring-buffer cache of recent exchanges per chat session"""
+
+    def __init__(self, backend=None, max_turns: int = 8, max_sessions_per_user: int = 5,
+                 max_bytes: int = 64 * 1024 * 1024):
+        """
+        Args:
+            backend: LocalHistoryBackend (default) or a shared backend
+            max_turns: Exchanges kept per session (ring buffer size)
+            max_sessions_per_user: Cached sessions per user before LRU eviction
+            max_bytes: Approximate memory cap across all cached sessions
+        """
+        self.backend = backend or LocalHistoryBackend()
+        self.max_turns = max_turns
+        self.max_sessions_per_user = max_sessions_per_user
+        self.max_bytes = max_bytes
+
+        self._sessions = OrderedDict()  # key -> (user_id, approximate bytes), global LRU order
+        self._user_sessions = {}  # user_id -> OrderedDict of keys, per-user LRU order
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(user_id: int, session_id: str) -> str:
+        return f"{user_id}:{session_id}"
+
+    def _track(self, user_id: int, key: str, entries: list = None):
+        """Mark a session as recently used, update its size and enforce the caps"""
+        if entries is not None:
+            size = sum(_entry_size(e) for e in entries)
+            self._bytes += size - self._sessions.get(key, (user_id, 0))[1]
+            self._sessions[key] = (user_id, size)
+        elif key not in self._sessions:
+            # Cached by another worker through a shared backend
+            self._sessions[key] = (user_id, 0)
+        self._sessions.move_to_end(key)
+
+        sessions = self._user_sessions.setdefault(user_id, OrderedDict())
+        sessions[key] = True
+        sessions.move_to_end(key)
+
+        while len(sessions) > self.max_sessions_per_user:
+            self._drop(next(iter(sessions)))
+            self.evictions += 1
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._drop(next(iter(self._sessions)))
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        user_id, size = self._sessions.pop(key, (None, 0))
+        self._bytes -= size
+        sessions = self._user_sessions.get(user_id)
+        if sessions is not None:
+            sessions.pop(key, None)
+            if not sessions:
+                del self._user_sessions[user_id]
+        self.backend.delete(key)
+
+    def get(self, user_id: int, session_id: str, limit: int = None):
+        """
+        Cached recent exchanges for a session
+
+        Returns:
+            Chronological list of {'id', 'user', 'assistant', 'timestamp'} dicts,
+            or None on a miss (caller should load from the database)
+        """
+        if limit is not None and limit > self.max_turns:
+            return None
+        key = self._key(user_id, session_id)
+        with self._lock:
+            entries = self.backend.get(key)
+            if entries is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._track(user_id, key)
+        return entries[-limit:] if limit else entries
+
+    def set(self, user_id: int, session_id: str, history: list):
+        """Seed a session's buffer with history loaded from the database"""
+        key = self._key(user_id, session_id)
+        entries = history[-self.max_turns:]
+        with self._lock:
+            self.backend.set(key, entries, self.max_turns)
+            self._track(user_id, key, entries)
+
+    def append(self, user_id: int, session_id: str, message: str, response: str, timestamp=None, chat_id: int = None):
+        """Record a saved exchange; uncached sessions are loaded from the DB on their next read"""
+        key = self._key(user_id, session_id)
+        entry = {'id': chat_id, 'user': message, 'assistant': response, 'timestamp': timestamp or datetime.utcnow()}
+        with self._lock:
+            entries = self.backend.append(key, entry, self.max_turns)
+            if entries is not None:
+                self._track(user_id, key, entries)
+
+    def invalidate(self, user_id: int, session_id: str = None):
+        """Drop one session, or every cached session for the user"""
+        with self._lock:
+            if session_id is not None:
+                self._drop(self._key(user_id, session_id))
+                return
+            for key in list(self._user_sessions.get(user_id, ())):
+                self._drop(key)
+            # Also clears sessions cached by other workers on a shared backend
+            self.backend.delete_prefix(self._key(user_id, ''))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'sessions': len(self._sessions),
+                'users': len(self._user_sessions),
+                'approx_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'max_turns': self.max_turns,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
@@ -0,0 +1,72 @@
+"""
+CredNest AI - Local Intent Classifier
+Routes chat messages to greeting, off-topic, a deterministic tool or the LLM
+using one precompiled keyword pass - no model call needed
+"""
+
+import re
+
+from ai.chat_utils import KEYWORD_MATCHER, SMALL_TALK_LABELS, FINANCE_LABELS, KeywordMatcher
+from ai.tool_registry import extract_tool_arguments
+
+GREETING = 'greeting'
+OFF_TOPIC = 'off_topic'
+TOOL = 'tool'
+LLM = 'llm'
+
+
+# Checked in order - the first tool whose arguments can be extracted wins
+TOOL_LABELS = (
+    ('emi', 'calculate_emi'),
+    ('eligibility', 'check_loan_eligibility'),
+    ('documents', 'get_document_checklist')
+)
+
+_DIGIT = re.compile(r'\d')
+
+
+class IntentClassifier:
+    """Rule-based router built on the shared KeywordMatcher"""
+
+    def __init__(self, phrases: dict = None):
+        self.matcher = KeywordMatcher(phrases) if phrases else KEYWORD_MATCHER
+
+    def classify(self, message: str) -> dict:
+        """
+        Classify a chat message
+
+        Returns:
+            Dictionary with 'intent' (greeting, off_topic, tool or llm),
+            'tool' and 'arguments' for tool intents, and the matched 'labels'
+        """
+        text = message.lower().strip()
+        labels = self.matcher.labels(text)
+        result = {'intent': LLM, 'tool': None, 'arguments': None, 'labels': labels}
+
+        for label, tool in TOOL_LABELS:
+            if label in labels:
+                arguments = extract_tool_arguments(tool, text)
+                if arguments:
+                    result.update(intent=TOOL, tool=tool, arguments=arguments)
+                    return result
+
+        if labels & FINANCE_LABELS or '₹' in text:
+            return result
+
+        # Small talk, or a very short non-numeric message ("hmm", "ok then")
+        if labels & SMALL_TALK_LABELS or (len(text.split()) <= 3 and not _DIGIT.search(text)):
+            result['intent'] = GREETING
+        else:
+            result['intent'] = OFF_TOPIC
+        return result
+
+
+_default_classifier = None
+
+
+def classify_intent(message: str) -> dict:
+    """Classify with a shared module-level classifier"""
+    global _default_classifier
+    if _default_classifier is None:
+        _default_classifier = IntentClassifier()
+    return _default_classifier.classify(message)
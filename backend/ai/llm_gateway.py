@@ -0,0 +1,193 @@
+"""
+CredNest AI - Async LLM Gateway
+Runs all LLM calls on one background asyncio loop with a cap on in-flight
+requests, a bounded wait queue and backpressure when the queue is full
+"""
+
+import asyncio
+import logging
+import math
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_END_OF_STREAM = object()
+
+
+class LLMBusyError(Exception):
+    """Raised when the LLM wait queue is full or a queued call timed out"""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AsyncLLMGateway:
+    """Bounded-concurrency gateway to an async Groq-compatible client"""
+
+    def __init__(self, client_factory, max_concurrency: int = 16, max_queue: int = 128,
+                 queue_timeout: float = 10.0, request_timeout: float = 60.0):
+        """
+        Args:
+            client_factory: Callable returning an async client
+                (`await client.chat.completions.create(...)`), e.g. AsyncGroq
+            max_concurrency: Maximum LLM calls in flight at once
+            max_queue: Maximum calls waiting for a slot before rejecting
+            queue_timeout: Seconds a call may wait for a slot
+            request_timeout: Seconds a single LLM call may take
+        """
+        self.client_factory = client_factory
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.request_timeout = request_timeout
+
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._started = threading.Event()
+
+        # Counters (only mutated on the loop thread)
+        self.in_flight = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self._avg_latency = 1.0
+
+    def start(self):
+        """Start the background event loop thread"""
+        if self._thread and self._thread.is_alive():
+            return self
+        self._thread = threading.Thread(target=self._run_loop, name='llm-gateway', daemon=True)
+        self._thread.start()
+        self._started.wait()
+        logger.info(f"✓ LLM gateway started (concurrency={self.max_concurrency}, queue={self.max_queue})")
+        return self
+
+    def stop(self):
+        """Stop the background event loop"""
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop = None
+
+    def _run_loop(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._client = self.client_factory()
+        self._started.set()
+        self._loop.run_forever()
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up"""
+        backlog = (self.waiting + self.in_flight) / max(1, self.max_concurrency)
+        return max(1, math.ceil(backlog * self._avg_latency))
+
+    async def _acquire(self) -> float:
+        """Wait for a slot within the queue limit; returns the start time for _release()"""
+        if self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise LLMBusyError("LLM queue is full", self._retry_after())
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise LLMBusyError("Timed out waiting for an LLM slot", self._retry_after())
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        return time.perf_counter()
+
+    def _release(self, start: float):
+        self.in_flight -= 1
+        self.completed += 1
+        # Exponential moving average of call latency for Retry-After
+        self._avg_latency = 0.8 * self._avg_latency + 0.2 * (time.perf_counter() - start)
+        self._semaphore.release()
+
+    async def _complete(self, kwargs: dict):
+        start = await self._acquire()
+        try:
+            return await asyncio.wait_for(
+                self._client.chat.completions.create(**kwargs),
+                self.request_timeout
+            )
+        finally:
+            self._release(start)
+
+    async def _stream(self, kwargs: dict, chunks: queue.Queue):
+        """Hold one slot for a whole streamed completion, handing chunks to the caller's thread"""
+        try:
+            start = await self._acquire()
+        except LLMBusyError as e:
+            chunks.put(e)
+            return
+
+        async def pump():
+            stream = await self._client.chat.completions.create(stream=True, **kwargs)
+            async for chunk in stream:
+                chunks.put(chunk)
+
+        try:
+            await asyncio.wait_for(pump(), self.request_timeout)
+            chunks.put(_END_OF_STREAM)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            chunks.put(e)
+        finally:
+            self._release(start)
+
+    def submit(self, **kwargs):
+        """Schedule a chat completion, returning a concurrent.futures.Future"""
+        if not self._loop:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(self._complete(kwargs), self._loop)
+
+    def complete(self, **kwargs):
+        """Run a chat completion from a synchronous caller and wait for it"""
+        return self.submit(**kwargs).result(self.queue_timeout + self.request_timeout + 1)
+
+    def stream(self, **kwargs):
+        """
+        Stream a chat completion from a synchronous caller, chunk by chunk
+
+        Takes a slot like complete(), so the concurrency cap, queue limit
+        and timeouts apply; LLMBusyError is raised before the first chunk.
+        Closing the generator early cancels the call and frees the slot.
+        """
+        if not self._loop:
+            self.start()
+        chunks = queue.Queue()
+        future = asyncio.run_coroutine_threadsafe(self._stream(kwargs, chunks), self._loop)
+        try:
+            while True:
+                item = chunks.get(timeout=self.queue_timeout + self.request_timeout + 1)
+                if item is _END_OF_STREAM:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def stats(self) -> dict:
+        """Current gateway counters"""
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'in_flight': self.in_flight,
+            'waiting': self.waiting,
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+            'avg_latency': round(self._avg_latency, 3)
+        }
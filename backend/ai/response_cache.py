@@ -0,0 +1,229 @@
+"""
+CredNest AI - Response Cache
+Caches LLM answers to repeated, history-free finance questions.
+Exact tier keyed on normalized message + system prompt hash, with an
+optional MinHash/LSH near-duplicate tier. TTL + LRU eviction.
+"""
+
+import hashlib
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import lru_cache
+
+_NON_WORD = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'\d+(?:\.\d+)?')
+# Filler words ignored by the near-duplicate tier
+_FILLER_WORDS = {'a', 'an', 'the', 'please', 'pls', 'kindly'}
+
+# MinHash parameters: 64 permutations split into 16 LSH bands of 4 rows
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _make_permutations():
+    """Deterministic (a, b) pairs for the universal hash family"""
+    perms = []
+    for i in range(_NUM_PERM):
+        digest = hashlib.sha256(f"crednest-minhash-{i}".encode()).digest()
+        a = int.from_bytes(digest[:8], 'big') % _PRIME or 1
+        b = int.from_bytes(digest[8:16], 'big') % _PRIME
+        perms.append((a, b))
+    return perms
+
+
+_PERMUTATIONS = _make_permutations()
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(' ', message.lower())
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def minhash_signature(text: str) -> tuple:
+    """MinHash signature over character 3-gram shingles"""
+    padded = " " + " ".join(w for w in text.split() if w not in _FILLER_WORDS) + " "
+    shingles = {zlib.crc32(padded[i:i + 3].encode()) for i in range(max(1, len(padded) - 2))}
+    return tuple(
+        min(((a * s + b) % _PRIME) & _MAX_HASH for s in shingles)
+        for a, b in _PERMUTATIONS
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+class ResponseCache:
+    """Thread-safe TTL + LRU cache for history-free LLM responses"""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600, near_duplicates: bool = False,
+                 similarity_threshold: float = 0.85):
+        """
+        Args:
+            max_entries: Maximum cached answers before LRU eviction
+            ttl: Seconds an answer stays valid
+            near_duplicates: Enable the MinHash near-duplicate tier
+            similarity_threshold: Minimum estimated Jaccard similarity for a near hit
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.near_duplicates = near_duplicates
+        self.similarity_threshold = similarity_threshold
+
+        self._entries = OrderedDict()  # key -> entry dict
+        self._buckets = {}  # (prompt_hash, band, band_values) -> set of keys
+        self._lock = threading.Lock()
+
+        self.exact_hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.evictions = 0
+        self.tokens_saved = 0
+
+    @staticmethod
+    @lru_cache(maxsize=8)
+    def prompt_hash(system_prompt: str) -> str:
+        """Short stable hash of the system prompt"""
+        return hashlib.sha256(system_prompt.encode()).hexdigest()[:16]
+
+    @staticmethod
+    def _key(normalized: str, prompt_hash: str) -> str:
+        return hashlib.sha256(f"{prompt_hash}:{normalized}".encode()).hexdigest()
+
+    def _bands(self, signature: tuple, prompt_hash: str):
+        for band in range(_BANDS):
+            yield (prompt_hash, band, signature[band * _ROWS:(band + 1) * _ROWS])
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry and entry['signature']:
+            for bucket in self._bands(entry['signature'], entry['prompt_hash']):
+                keys = self._buckets.get(bucket)
+                if keys:
+                    keys.discard(key)
+                    if not keys:
+                        del self._buckets[bucket]
+
+    def _live(self, key: str, now: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if now - entry['created_at'] > self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _near_lookup(self, normalized: str, prompt_hash: str, now: float):
+        signature = minhash_signature(normalized)
+        numbers = _NUMBER.findall(normalized)
+        candidates = set()
+        for bucket in self._bands(signature, prompt_hash):
+            candidates.update(self._buckets.get(bucket, ()))
+
+        best, best_score = None, 0.0
+        for key in candidates:
+            entry = self._live(key, now)
+            # Never reuse an answer computed for different amounts/rates/tenures
+            if entry is None or entry['numbers'] != numbers:
+                continue
+            score = sum(x == y for x, y in zip(signature, entry['signature'])) / _NUM_PERM
+            if score > best_score:
+                best, best_score = entry, score
+
+        if best is not None and best_score >= self.similarity_threshold:
+            self._entries.move_to_end(best['key'])
+            return best, best_score
+        return None, best_score
+
+    def get(self, message: str, system_prompt: str):
+        """
+        Look up a cached answer
+
+        Returns:
+            Tuple of (response dict or None, tier) where tier is 'exact', 'near' or None
+        """
+        normalized = normalize_message(message)
+        prompt_hash = self.prompt_hash(system_prompt)
+        now = time.time()
+
+        with self._lock:
+            entry = self._live(self._key(normalized, prompt_hash), now)
+            if entry:
+                self.exact_hits += 1
+                self.tokens_saved += entry['tokens']
+                return dict(entry['response']), 'exact'
+
+            if self.near_duplicates:
+                entry, _ = self._near_lookup(normalized, prompt_hash, now)
+                if entry:
+                    self.near_hits += 1
+                    self.tokens_saved += entry['tokens']
+                    return dict(entry['response']), 'near'
+
+            self.misses += 1
+            return None, None
+
+    def set(self, message: str, system_prompt: str, response: dict, tokens: int = None):
+        """Store an answer for a history-free message"""
+        normalized = normalize_message(message)
+        prompt_hash = self.prompt_hash(system_prompt)
+        key = self._key(normalized, prompt_hash)
+        signature = minhash_signature(normalized) if self.near_duplicates else None
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {
+                'key': key,
+                'response': dict(response),
+                'prompt_hash': prompt_hash,
+                'signature': signature,
+                'numbers': _NUMBER.findall(normalized),
+                'tokens': tokens or estimate_tokens(response.get('message', '')),
+                'created_at': time.time()
+            }
+            if signature:
+                for bucket in self._bands(signature, prompt_hash):
+                    self._buckets.setdefault(bucket, set()).add(key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def record_bypass(self):
+        """Count a lookup skipped because the session has history"""
+        with self._lock:
+            self.bypassed += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._buckets.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters for measuring LLM spend saved"""
+        with self._lock:
+            lookups = self.exact_hits + self.near_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'near_duplicates': self.near_duplicates,
+                'exact_hits': self.exact_hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'bypassed': self.bypassed,
+                'evictions': self.evictions,
+                'hit_ratio': round((self.exact_hits + self.near_hits) / lookups, 4) if lookups else 0.0,
+                'completion_tokens_saved': self.tokens_saved
+            }
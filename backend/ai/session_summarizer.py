@@ -0,0 +1,210 @@
+"""
+CredNest AI - Rolling Session Summaries
+Keeps a compact running summary per chat session. Once a session has
+`every` unsummarized turns beyond the raw `window`, the older ones are
+folded into the summary in a background job and stored in
+chat_summaries. The prompt then carries the summary plus only the recent
+raw turns, so its size stays flat however long the session runs. A
+session's first fold starts from its oldest stored turn, so sessions that
+were already long before summaries existed don't lose their early turns.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from ai.context_builder import compress_answer, count_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and CredNest AI, "
+    "an Indian personal finance assistant. Merge the new exchanges into the current summary. "
+    "Keep every fact the user shared about themselves (income, loans, CIBIL score, goals, banks "
+    "considered), the figures and recommendations given, and any open questions. "
+    "Write terse bullet points, newest facts winning on conflicts. Reply with the summary only."
+)
+
+
+def extractive_summary(previous: str, turns: list, max_tokens: int) -> str:
+    """LLM-free fallback: one clipped line per exchange, oldest lines dropped first"""
+    lines = previous.splitlines() if previous else []
+    for turn in turns:
+        lines.append(f"- User: {compress_answer(turn['user'], 40)} | "
+                     f"Answer: {compress_answer(turn['assistant'] or '', 60)}")
+    while len(lines) > 1 and count_tokens('\n'.join(lines)) > max_tokens:
+        lines.pop(0)
+    return '\n'.join(lines)
+
+
+class SessionSummarizer:
+    """Schedules and stores rolling summaries for chat sessions"""
+
+    def __init__(self, app=None, every: int = 6, window: int = 8, max_summary_tokens: int = 300,
+                 background: bool = True, max_cached: int = 5000, backfill_batch: int = 40):
+        """
+        Args:
+            app: Flask app, for an app context in the background job
+            every: Unsummarized turns beyond the window that trigger a fold
+            window: Recent turns always sent raw
+            max_summary_tokens: Length cap for a summary
+            background: Fold in a worker thread (False runs inline)
+            max_cached: Summaries kept in memory so hot sessions skip the SELECT
+            backfill_batch: Turns per summarize call when a first fold catches up on older turns
+        """
+        self.app = app
+        self.every = every
+        self.window = window
+        self.max_summary_tokens = max_summary_tokens
+        self.max_cached = max_cached
+        self.backfill_batch = backfill_batch
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='session-summary') if background else None
+        self._cache = OrderedDict()  # (user_id, session_id) -> summary dict, or None for "no summary yet"
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    @property
+    def history_limit(self) -> int:
+        """Recent turns to load so a fold has turns to work with"""
+        return self.window + self.every
+
+    def _remember(self, key: tuple, record):
+        with self._lock:
+            self._cache[key] = record
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+    def get(self, user_id: int, session_id: str):
+        """Summary record for the session ({'summary', 'last_chat_id', 'turns_summarized'}) or None"""
+        key = (user_id, session_id)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        from database.models import ChatSummary
+        row = ChatSummary.query.filter_by(user_id=user_id, session_id=session_id).first()
+        record = {
+            'summary': row.summary,
+            'last_chat_id': row.last_chat_id,
+            'turns_summarized': row.turns_summarized
+        } if row else None
+        self._remember(key, record)
+        return record
+
+    def prepare(self, user_id: int, session_id: str, history: list, summarize_fn):
+        """
+        Split loaded history into (summary text, raw turns) for the prompt,
+        scheduling a fold when enough unsummarized turns have built up
+
+        Args:
+            summarize_fn: Callable (previous_summary, turns) -> new summary text
+        """
+        record = self.get(user_id, session_id)
+        if record:
+            history = [turn for turn in history if (turn.get('id') or 0) > record['last_chat_id']]
+
+        if len(history) >= self.window + self.every:
+            self.schedule(user_id, session_id, history[:-self.window], summarize_fn)
+
+        return (record['summary'] if record else None), history
+
+    def schedule(self, user_id: int, session_id: str, turns: list, summarize_fn):
+        """Fold `turns` into the session summary, in the background when enabled"""
+        key = (user_id, session_id)
+        with self._lock:
+            if key in self._in_flight:
+                return
+            self._in_flight.add(key)
+
+        if self._executor:
+            self._executor.submit(self._fold_in_context, user_id, session_id, turns, summarize_fn)
+        else:
+            self._fold_in_context(user_id, session_id, turns, summarize_fn)
+
+    def _fold_in_context(self, user_id: int, session_id: str, turns: list, summarize_fn):
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    self._fold(user_id, session_id, turns, summarize_fn)
+            else:
+                self._fold(user_id, session_id, turns, summarize_fn)
+        except Exception as e:
+            logger.error(f"Session summary failed for {session_id}: {e}")
+        finally:
+            with self._lock:
+                self._in_flight.discard((user_id, session_id))
+
+    def _fold(self, user_id: int, session_id: str, turns: list, summarize_fn):
+        from database.models import db, ChatSummary
+
+        row = ChatSummary.query.filter_by(user_id=user_id, session_id=session_id).first()
+        previous = row.summary if row else ''
+        last_chat_id = row.last_chat_id if row else 0
+        # Another worker may already have folded some of these turns
+        turns = [turn for turn in turns if (turn.get('id') or 0) > last_chat_id]
+        if not turns:
+            return
+        if row is None and turns[0].get('id'):
+            # First summary: the loaded window may start mid-session, so begin at the oldest stored turn
+            turns = self._older_turns(user_id, session_id, turns[0]['id']) + turns
+
+        summary = previous
+        for start in range(0, len(turns), self.backfill_batch):
+            summary = self._summarize_batch(summary, turns[start:start + self.backfill_batch], summarize_fn)
+
+        record = {
+            'summary': summary,
+            'last_chat_id': max(turn['id'] for turn in turns),
+            'turns_summarized': (row.turns_summarized if row else 0) + len(turns)
+        }
+        if row is None:
+            row = ChatSummary(user_id=user_id, session_id=session_id)
+            db.session.add(row)
+        row.summary = record['summary']
+        row.last_chat_id = record['last_chat_id']
+        row.turns_summarized = record['turns_summarized']
+        try:
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        self._remember((user_id, session_id), record)
+        logger.info(f"📝 Summarized {len(turns)} turns of {session_id} ({record['turns_summarized']} total)")
+
+    def _summarize_batch(self, previous: str, turns: list, summarize_fn) -> str:
+        try:
+            summary = summarize_fn(previous, turns)
+        except Exception as e:
+            logger.warning(f"LLM summary unavailable ({e}) - using extractive summary")
+            summary = None
+        return summary or extractive_summary(previous, turns, self.max_summary_tokens)
+
+    @staticmethod
+    def _older_turns(user_id: int, session_id: str, before_id: int) -> list:
+        """The session's stored turns before `before_id`, oldest first"""
+        from database.models import ChatHistory
+
+        chats = ChatHistory.query.filter(
+            ChatHistory.user_id == user_id,
+            ChatHistory.session_id == session_id,
+            ChatHistory.id < before_id
+        ).order_by(ChatHistory.id).all()
+        return [{'id': chat.id, 'user': chat.message, 'assistant': chat.response} for chat in chats]
+
+    def invalidate(self, user_id: int, session_id: str = None):
+        """Forget cached summaries after their rows are deleted"""
+        with self._lock:
+            if session_id is not None:
+                self._cache.pop((user_id, session_id), None)
+                return
+            for key in [k for k in self._cache if k[0] == user_id]:
+                del self._cache[key]
+
+    def shutdown(self):
+        if self._executor:
+            self._executor.shutdown(wait=True)
@@ -0,0 +1,137 @@
+"""
+CredNest AI - Tool Result Formatters
+Render structured tool output as chat-ready markdown so self-contained
+tool answers don't need a second LLM turn
+"""
+
+
+def _bullets(items, prefix='• '):
+    return "\n".join(f"{prefix}{item}" for item in items)
+
+
+def format_emi(result: dict) -> str:
+    lines = [
+        f"🧮 **EMI for ₹{result['loan_amount']:,.0f} at {result['interest_rate']}% for "
+        f"{result['tenure_months']} months ({result['tenure_years']} years)**\n",
+        f"• **Monthly EMI**: ₹{result['monthly_emi']:,.2f}",
+        f"• **Total interest**: ₹{result['total_interest']:,.2f} ({result['interest_percentage']}% of principal)",
+        f"• **Total amount payable**: ₹{result['total_amount_payable']:,.2f}\n",
+        "**Formula:** EMI = P × r × (1 + r)^n / ((1 + r)^n - 1), where r is the monthly rate and n the months\n"
+    ]
+
+    breakdown = result.get('yearly_breakdown', [])
+    if breakdown:
+        lines.append("**Year-wise breakdown:**\n")
+        lines.append("| Year | Principal | Interest | Closing balance |")
+        lines.append("|---|---|---|---|")
+        for row in breakdown:
+            lines.append(f"| {row['year']} | ₹{row['principal_paid']:,.0f} | ₹{row['interest_paid']:,.0f} "
+                         f"| ₹{row['closing_balance']:,.0f} |")
+        lines.append("")
+
+    lines.append("💡 **Tips:**")
+    lines.append(_bullets(result.get('tips', [])))
+    return "\n".join(lines)
+
+
+def _document_line(doc: dict) -> str:
+    details = [doc[key] for key in ('period', 'condition', 'why') if doc.get(key)]
+    label = f"**{doc['name']}**" + ("" if doc.get('required') else " (optional)")
+    return f"{label} - {'; '.join(details)}" if details else label
+
+
+def format_document_checklist(result: dict) -> str:
+    loan_type = (result.get('loan_type') or 'personal').replace('_', ' ')
+    employment = (result.get('employment_type') or 'salaried').replace('_', ' ')
+    summary = result['summary']
+    lines = [
+        f"📄 **Documents for a {loan_type} loan ({employment} applicant)**\n",
+        f"{summary['mandatory']} mandatory and {summary['optional']} optional documents:\n",
+        "**Identity & address:**",
+        _bullets(_document_line(d) for d in result['common_documents']),
+        "\n**Income & employment:**",
+        _bullets(_document_line(d) for d in result['employment_documents'])
+    ]
+    if result['loan_specific_documents']:
+        lines.append(f"\n**Specific to {loan_type} loans:**")
+        lines.append(_bullets(_document_line(d) for d in result['loan_specific_documents']))
+    lines.append("\n💡 **Pro tips:**")
+    lines.append(_bullets(result['pro_tips'], prefix=''))
+    if not result.get('employment_type'):
+        lines.append(f"\nI assumed you're **{employment}** - tell me if you're self-employed or run a business "
+                     "and I'll adjust the list.")
+    return "\n".join(lines)
+
+
+def format_loan_eligibility(result: dict) -> str:
+    status = "✅ **You look eligible**" if result['eligible'] else "⚠️ **Not eligible yet**"
+    lines = [
+        f"{status} for a ₹{result['requested_amount']:,.0f} {result['loan_type']} loan\n",
+        f"• **Risk level**: {result['risk_level']}",
+        f"• **Max eligible amount**: ₹{result['max_eligible_amount']:,.0f}",
+        f"• **Estimated EMI**: ₹{result['estimated_monthly_emi']:,.0f} "
+        f"({result['emi_to_income_ratio']}% of monthly income)\n",
+        "**Assessment:**",
+        _bullets(result['reasons'])
+    ]
+    if result.get('bank_offers'):
+        lines.append("\n**Best bank offers:**")
+        lines.append(_bullets(
+            f"{offer['bank_name']} - {offer['interest_rate']:.2f}%, EMI ₹{offer['emi']:,.0f} "
+            f"for {offer['tenure_months']} months" + ("" if offer['eligible'] else f" ({'; '.join(offer['declines'])})")
+            for offer in result['bank_offers'][:3]
+        ))
+    if result['suggestions']:
+        lines.append("\n**Suggestions:**")
+        lines.append(_bullets(result['suggestions']))
+    lines.append("\n**Next steps:**")
+    lines.append("\n".join(result['next_steps']))
+    return "\n".join(lines)
+
+
+def format_application_guidance(result: dict) -> str:
+    timeline = result['timeline']
+    lines = [
+        f"📝 **How to apply for a {result['loan_type']} loan**\n",
+        f"⏱️ Approval: {timeline['approval']} | Disbursement: {timeline['disbursement']} | "
+        f"Total: {timeline['total']}\n",
+        "**Steps:**"
+    ]
+    for step in result['steps']:
+        lines.append(f"{step['step']}. **{step['title']}** - {step['details']} ({step['time']})")
+    lines.append("\n**Pro tips:**")
+    lines.append(_bullets(result['pro_tips'], prefix=''))
+    lines.append("\n**Avoid these mistakes:**")
+    lines.append(_bullets(result['common_mistakes'], prefix=''))
+    return "\n".join(lines)
+
+
+def format_financial_tips(result: dict) -> str:
+    lines = [f"**{result['title']}**\n"]
+    if result.get('current_importance'):
+        lines.append(f"{result['current_importance']}\n")
+    lines.append(_bullets(result['tips'], prefix=''))
+    if result.get('quick_wins'):
+        lines.append("\n**Quick wins:**")
+        lines.append(_bullets(result['quick_wins']))
+    if result.get('timeline'):
+        lines.append(f"\n⏱️ {result['timeline']}")
+    return "\n".join(lines)
+
+
+# Tools whose output fully answers the question on its own
+TOOL_FORMATTERS = {
+    'calculate_emi': format_emi,
+    'get_document_checklist': format_document_checklist,
+    'check_loan_eligibility': format_loan_eligibility,
+    'get_application_guidance': format_application_guidance,
+    'get_financial_tips': format_financial_tips
+}
+
+
+def format_tool_result(name: str, result: dict):
+    """Render a tool result as markdown, or None if it needs the LLM to explain it"""
+    formatter = TOOL_FORMATTERS.get(name)
+    if not formatter or not isinstance(result, dict) or 'error' in result:
+        return None
+    return formatter(result)
@@ -3,6 +3,10 @@ CredNest AI - Tool Registry
 Defines all functions available to Groq AI
 """
 
+import inspect
+import json
+import re
+
 def get_tool_definitions():
     """
     Returns all tool definitions for Groq function calling
@@ -42,6 +46,14 @@ def get_tool_definitions():
                         "existing_loans": {
                             "type": "boolean",
                             "description": "Whether user has existing loans or EMIs"
+                        },
+                        "existing_emi": {
+                            "type": "number",
+                            "description": "Total monthly EMIs the user already pays, in INR, if known"
+                        },
+                        "tenure_months": {
+                            "type": "integer",
+                            "description": "Preferred loan tenure in months, if the user mentioned one"
                         }
                     },
                     "required": ["monthly_income", "loan_amount", "loan_type"]
@@ -138,3 +150,234 @@ def get_tool_definitions():
             }
         }
     ]
+
+
+def get_tool_functions():
+    """Map tool names to the in-process implementations in backend/tools"""
+    from tools import (
+        check_loan_eligibility,
+        calculate_emi,
+        get_application_guidance,
+        get_financial_tips,
+        get_document_checklist
+    )
+    return {
+        'check_loan_eligibility': check_loan_eligibility,
+        'calculate_emi': calculate_emi,
+        'get_application_guidance': get_application_guidance,
+        'get_financial_tips': get_financial_tips,
+        'get_document_checklist': get_document_checklist
+    }
+
+
+def execute_tool(name: str, arguments) -> dict:
+    """
+    Run a tool locally with model-supplied arguments
+    
+    Args:
+        name: Tool name from get_tool_definitions
+        arguments: Dict or JSON string of arguments
+    
+    Returns:
+        Tool result dict, or {'error': ...} if the call is invalid
+    """
+    functions = get_tool_functions()
+    if name not in functions:
+        return {'error': f"Unknown tool: {name}"}
+    
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments or '{}')
+        except json.JSONDecodeError:
+            return {'error': f"Invalid arguments for {name}"}
+    
+    func = functions[name]
+    accepted = inspect.signature(func).parameters
+    kwargs = {k: v for k, v in (arguments or {}).items() if k in accepted}
+    if name == 'calculate_emi' and 'tenure_months' in kwargs:
+        kwargs['tenure_months'] = int(kwargs['tenure_months'])
+    
+    try:
+        return func(**kwargs)
+    except (TypeError, ValueError, ZeroDivisionError) as e:
+        return {'error': f"{name} failed: {e}"}
+
+
+# ============================================================================
+# LOCAL ARGUMENT EXTRACTION
+# ============================================================================
+
+_AMOUNT_UNITS = {
+    'crore': 10_000_000, 'crores': 10_000_000, 'cr': 10_000_000,
+    'lakh': 100_000, 'lakhs': 100_000, 'lac': 100_000, 'lacs': 100_000, 'l': 100_000,
+    'thousand': 1_000, 'k': 1_000
+}
+
+_AMOUNT_PATTERN = re.compile(
+    r'(?:₹|rs\.?|inr)?\s*(\d[\d,]*(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|lac|l|thousand|k)?\b(?!\s*(?:%|percent|(?:years?|yrs?|months?|mos?)\b))'
+)
+_RATE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(?:%|percent|per\s*cent)')
+_TENURE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(years?|yrs?|months?|mos?)\b')
+
+_LOAN_TYPES = {
+    'home': ('home', 'housing', 'house', 'property', 'mortgage'),
+    'car': ('car', 'vehicle', 'auto'),
+    'education': ('education', 'student', 'study', 'studies'),
+    'business': ('business', 'msme'),
+    'personal': ('personal',)
+}
+_EMPLOYMENT_TYPES = {
+    'self_employed': ('self employed', 'self-employed', 'freelancer', 'professional'),
+    'business': ('business owner', 'own a business', 'businessman', 'proprietor'),
+    'salaried': ('salaried', 'salary', 'job', 'employee')
+}
+_INCOME_CONTEXT = re.compile(r'\b(income|salary|earn|earning|earnings|take home|per month|monthly|pm)\b')
+_EMI_CONTEXT = re.compile(r'\b(emis?|installments?|instalments?)\b')
+_EMI_GAP = 12
+_ANNUAL_CONTEXT = re.compile(r'\b(annual|annually|yearly|per annum|pa|a year|per year)\b')
+_CREDIT_SCORE_PATTERN = re.compile(
+    r'(?:cibil|credit score|credit)\D{0,15}([3-9]\d{2})\b|\b([3-9]\d{2})\s*(?:cibil|credit score)'
+)
+
+
+def _keyword_patterns(table: dict) -> list:
+    return [
+        (key, re.compile(r'\b(?:' + '|'.join(re.escape(w) for w in words) + r')\b'))
+        for key, words in table.items()
+    ]
+
+
+_LOAN_TYPE_PATTERNS = _keyword_patterns(_LOAN_TYPES)
+_EMPLOYMENT_PATTERNS = _keyword_patterns(_EMPLOYMENT_TYPES)
+
+
+def _find_amounts(text: str) -> list:
+    """All rupee amounts (>= ₹1,000) as (value, start, end), honouring lakh/crore/k units"""
+    amounts = []
+    for match in _AMOUNT_PATTERN.finditer(text):
+        number, unit = match.groups()
+        value = float(number.replace(',', '')) * _AMOUNT_UNITS.get(unit, 1)
+        if value >= 1000:
+            # The span stops at the number or its unit, not the whitespace the pattern swallows after it
+            amounts.append((value, match.start(1), match.end(2) if unit else match.end(1)))
+    return amounts
+
+
+def _parse_amount(text: str):
+    """Largest rupee amount mentioned"""
+    amounts = _find_amounts(text)
+    return max(value for value, _, _ in amounts) if amounts else None
+
+
+def _parse_tenure_months(text: str):
+    match = _TENURE_PATTERN.search(text)
+    if not match:
+        return None
+    value, unit = float(match.group(1)), match.group(2)
+    return int(round(value * 12)) if unit.startswith(('y', 'yr')) else int(value)
+
+
+def _find_keyword(text: str, patterns: list):
+    for key, pattern in patterns:
+        if pattern.search(text):
+            return key
+    return None
+
+
+def _extract_emi(text: str):
+    rate = _RATE_PATTERN.search(text)
+    tenure = _parse_tenure_months(text)
+    amount = _parse_amount(text)
+    if not (rate and tenure and amount):
+        return None
+    return {
+        'loan_amount': amount,
+        'interest_rate': float(rate.group(1)),
+        'tenure_months': tenure
+    }
+
+
+def _extract_documents(text: str):
+    loan_type = _find_keyword(text, _LOAN_TYPE_PATTERNS)
+    if not loan_type:
+        return None
+    # employment_type None falls back to the salaried checklist
+    return {
+        'loan_type': loan_type,
+        'employment_type': _find_keyword(text, _EMPLOYMENT_PATTERNS)
+    }
+
+
+def _distance(span: tuple, positions: list) -> int:
+    start, end = span
+    return min((max(p_start - end, start - p_end, 0) for p_start, p_end in positions), default=10 ** 6)
+
+
+def _extract_eligibility(text: str):
+    amounts = _find_amounts(text)
+    if len(amounts) < 2:
+        return None
+    
+    income_words = [m.span() for m in _INCOME_CONTEXT.finditer(text)]
+    if not income_words:
+        return None
+    
+    # An amount right next to "emi" is an EMI already being paid. If "emi" is
+    # mentioned but no single amount clearly belongs to it, leave it to the LLM
+    existing_emi = 0.0
+    emi_words = [m.span() for m in _EMI_CONTEXT.finditer(text)]
+    if emi_words:
+        emi_amounts = [a for a in amounts if _distance((a[1], a[2]), emi_words) <= _EMI_GAP]
+        if len(emi_amounts) != 1:
+            return None
+        emi = emi_amounts[0]
+        if _distance((emi[1], emi[2]), emi_words) >= _distance((emi[1], emi[2]), income_words):
+            return None
+        existing_emi = emi[0]
+        amounts = [a for a in amounts if a is not emi]
+    
+    # The amount nearest an income word is the income and exactly one other
+    # amount must be left for the loan - anything less clear goes to the LLM
+    if len(amounts) != 2:
+        return None
+    near, far = sorted(amounts, key=lambda a: _distance((a[1], a[2]), income_words))
+    if _distance((near[1], near[2]), income_words) == _distance((far[1], far[2]), income_words):
+        return None
+    value, start, end = near
+    window = text[max(0, start - 25):end + 25]
+    income = value / 12 if _ANNUAL_CONTEXT.search(window) else value
+    loan_amount = far[0]
+    
+    score = _CREDIT_SCORE_PATTERN.search(text)
+    employment_type = _find_keyword(text, _EMPLOYMENT_PATTERNS)
+    if employment_type == 'salaried' and 'salaried' not in text:
+        # "salary" here describes income, not the employment type
+        employment_type = None
+    return {
+        'monthly_income': income,
+        'loan_amount': loan_amount,
+        'loan_type': _find_keyword(text, _LOAN_TYPE_PATTERNS) or 'personal',
+        'credit_score': int(score.group(1) or score.group(2)) if score else None,
+        'employment_type': employment_type,
+        'existing_loans': existing_emi > 0,
+        'existing_emi': existing_emi
+    }
+
+
+_EXTRACTORS = {
+    'calculate_emi': _extract_emi,
+    'check_loan_eligibility': _extract_eligibility,
+    'get_document_checklist': _extract_documents
+}
+
+
+def extract_tool_arguments(name: str, message: str):
+    """
+    Pull tool arguments out of a message without the LLM
+    
+    Returns:
+        Arguments dict, or None if the message doesn't carry enough detail
+    """
+    extractor = _EXTRACTORS.get(name)
+    return extractor(message.lower()) if extractor else None
+
@@ -3,13 +3,15 @@ CredNest AI - Enhanced Backend Application
 Complete financial platform with improved chat history and AI response management
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+from flask import Flask, render_template, request, jsonify, redirect, url_for, Response, stream_with_context
 from flask_cors import CORS
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user, UserMixin
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, date
 import os
+import itertools
+import json
 import logging
 import sys
 import time
@@ -60,15 +62,74 @@ class Config:
     GROQ_API_KEY = os.getenv('GROQ_API_KEY', 'your-groq-api-key-here')
     AI_MODEL = 'llama-3.3-70b-versatile'
     
+    # Async LLM gateway (bounded concurrency to the provider)
+    ASYNC_LLM_ENABLED = os.getenv('ASYNC_LLM_ENABLED', 'true').lower() == 'true'
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))
+    LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '128'))
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '10'))
+    LLM_REQUEST_TIMEOUT = float(os.getenv('LLM_REQUEST_TIMEOUT', '60'))
+    
+    # Response cache for repeated, history-free questions
+    RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'true').lower() == 'true'
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2000'))
+    RESPONSE_CACHE_TTL = float(os.getenv('RESPONSE_CACHE_TTL', '21600'))  # 6 hours
+    RESPONSE_CACHE_NEAR_DUPLICATES = os.getenv('RESPONSE_CACHE_NEAR_DUPLICATES', 'false').lower() == 'true'
+    RESPONSE_CACHE_SIMILARITY = float(os.getenv('RESPONSE_CACHE_SIMILARITY', '0.85'))
+    
     # Chat Settings
     ENABLE_TYPING_DELAY = os.getenv('ENABLE_TYPING_DELAY', 'true').lower() == 'true'
     TYPING_DELAY_MIN = float(os.getenv('TYPING_DELAY_MIN', '0.5'))
     TYPING_DELAY_MAX = float(os.getenv('TYPING_DELAY_MAX', '3.0'))
     TYPING_WPM = int(os.getenv('TYPING_WPM', '200'))
+    # 'client' returns the computed delay for the browser to pace the reply,
+    # 'server' sleeps inside the request worker (legacy behaviour)
+    TYPING_DELAY_MODE = os.getenv('TYPING_DELAY_MODE', 'client').lower()
     MAX_MESSAGE_LENGTH = 2000
     DEFAULT_HISTORY_LIMIT = 8
     MAX_HISTORY_LIMIT = 50
     
+    # Per-session history ring buffers ('local' per worker, or 'redis' shared).
+    # 'local' is only safe with a single worker process: with several gunicorn
+    # workers each keeps its own copy and serves stale history after a write or
+    # delete on another, so multi-worker deployments need 'redis'
+    WEB_WORKERS = int(os.getenv('WEB_CONCURRENCY', '1'))
+    HISTORY_CACHE_ENABLED = os.getenv('HISTORY_CACHE_ENABLED', 'true').lower() == 'true'
+    HISTORY_CACHE_BACKEND = os.getenv('HISTORY_CACHE_BACKEND', 'local').lower()
+    HISTORY_CACHE_REDIS_URL = os.getenv('HISTORY_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    HISTORY_CACHE_TURNS = int(os.getenv('HISTORY_CACHE_TURNS', str(DEFAULT_HISTORY_LIMIT)))
+    HISTORY_CACHE_SESSIONS_PER_USER = int(os.getenv('HISTORY_CACHE_SESSIONS_PER_USER', '5'))
+    HISTORY_CACHE_MAX_MB = float(os.getenv('HISTORY_CACHE_MAX_MB', '64'))
+    
+    # Prompt token budget (system prompt + history + message)
+    CONTEXT_TOKEN_BUDGET = int(os.getenv('CONTEXT_TOKEN_BUDGET', '4000'))
+    CONTEXT_FULL_TURNS = int(os.getenv('CONTEXT_FULL_TURNS', '2'))
+    CONTEXT_OLD_ANSWER_TOKENS = int(os.getenv('CONTEXT_OLD_ANSWER_TOKENS', '150'))
+    
+    # Rolling session summaries: every N turns beyond the raw window are folded in
+    SESSION_SUMMARY_ENABLED = os.getenv('SESSION_SUMMARY_ENABLED', 'true').lower() == 'true'
+    SESSION_SUMMARY_EVERY = int(os.getenv('SESSION_SUMMARY_EVERY', '6'))
+    SESSION_SUMMARY_WINDOW = int(os.getenv('SESSION_SUMMARY_WINDOW', str(DEFAULT_HISTORY_LIMIT)))
+    SESSION_SUMMARY_MAX_TOKENS = int(os.getenv('SESSION_SUMMARY_MAX_TOKENS', '300'))
+    
+    # Bulk expense import (CSV/OFX/QIF): rows per INSERT + commit, row errors listed
+    EXPENSE_IMPORT_CHUNK_SIZE = int(os.getenv('EXPENSE_IMPORT_CHUNK_SIZE', '5000'))
+    EXPENSE_IMPORT_MAX_ERRORS = int(os.getenv('EXPENSE_IMPORT_MAX_ERRORS', '1000'))
+    
+    # Spending analytics: users whose expense arrays and reports stay in memory
+    SPENDING_ANALYTICS_CACHE_USERS = int(os.getenv('SPENDING_ANALYTICS_CACHE_USERS', '256'))
+    
+    # Batch EMI: loans per request, and loans that may ask for a monthly schedule
+    EMI_BATCH_MAX_LOANS = int(os.getenv('EMI_BATCH_MAX_LOANS', '10000'))
+    EMI_BATCH_MAX_SCHEDULES = int(os.getenv('EMI_BATCH_MAX_SCHEDULES', '200'))
+    
+    # EMI memo shared by the calculator, the AI tool and eligibility checks
+    EMI_CACHE_MAX_ENTRIES = int(os.getenv('EMI_CACHE_MAX_ENTRIES', '4096'))
+    
+    # Loan simulation: events per scenario, scenarios per comparison, points per prepayment sweep
+    LOAN_SIMULATION_MAX_EVENTS = int(os.getenv('LOAN_SIMULATION_MAX_EVENTS', '600'))
+    LOAN_SIMULATION_MAX_SCENARIOS = int(os.getenv('LOAN_SIMULATION_MAX_SCENARIOS', '20'))
+    LOAN_SIMULATION_MAX_SWEEP = int(os.getenv('LOAN_SIMULATION_MAX_SWEEP', '10000'))
+    
     # Pagination
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
@@ -88,8 +149,13 @@ app.config.from_object(Config)
 
 # Initialize extensions
 # Initialize extensions
-from database.models import db, User, ChatHistory, Budget, Expense, Income, Bank, InsuranceCompany, InvestmentFund
+from database.models import db, User, ChatHistory, ChatSession, ChatSummary, Budget, Expense, Income, MonthlyTotal, ExpenseRollup, DataVersion, Loan, Bank, InsuranceCompany, InvestmentFund
+from database.monthly_totals import add_to_month, get_month_totals, month_of
+from database.expense_rollups import add_expense_rollups, get_rollup_series, GRANULARITIES
+from database.data_versions import bump_expense_version
+from tools.emi_cache import emi_cache, cached_emi
 db.init_app(app)
+emi_cache.resize(Config.EMI_CACHE_MAX_ENTRIES)
 CORS(app)
 login_manager = LoginManager(app)
 login_manager.login_view = 'index'
@@ -113,7 +179,11 @@ from utils import (
     format_timestamp,
     calculate_response_time,
     validate_session_id,
-    truncate_history
+    truncate_history,
+    encode_cursor,
+    decode_cursor,
+    InvalidCursorError,
+    month_range
 )
 
 # ============================================================================
@@ -133,10 +203,12 @@ def load_user(user_id):
 # ============================================================================
 
 conversation_manager = None
+history_cache = None
+session_summarizer = None
 
 def init_finance_ai():
     """Initialize Finance Expert AI with error handling"""
-    global conversation_manager
+    global conversation_manager, history_cache, session_summarizer
     try:
         sys.path.insert(0, os.path.dirname(__file__))
         from ai.conversation_manager import ConversationManager
@@ -147,7 +219,65 @@ def init_finance_ai():
             logger.warning("⚠️  No valid Groq API key found - AI will be disabled")
             return False
         
-        conversation_manager = ConversationManager(api_key)
+        gateway = None
+        if Config.ASYNC_LLM_ENABLED:
+            from groq import AsyncGroq
+            from ai.llm_gateway import AsyncLLMGateway
+            gateway = AsyncLLMGateway(
+                lambda: AsyncGroq(api_key=api_key),
+                max_concurrency=Config.LLM_MAX_CONCURRENCY,
+                max_queue=Config.LLM_MAX_QUEUE,
+                queue_timeout=Config.LLM_QUEUE_TIMEOUT,
+                request_timeout=Config.LLM_REQUEST_TIMEOUT
+            ).start()
+        
+        cache = None
+        if Config.RESPONSE_CACHE_ENABLED:
+            from ai.response_cache import ResponseCache
+            cache = ResponseCache(
+                max_entries=Config.RESPONSE_CACHE_MAX_ENTRIES,
+                ttl=Config.RESPONSE_CACHE_TTL,
+                near_duplicates=Config.RESPONSE_CACHE_NEAR_DUPLICATES,
+                similarity_threshold=Config.RESPONSE_CACHE_SIMILARITY
+            )
+        
+        if Config.SESSION_SUMMARY_ENABLED:
+            from ai.session_summarizer import SessionSummarizer
+            session_summarizer = SessionSummarizer(
+                app,
+                every=Config.SESSION_SUMMARY_EVERY,
+                window=Config.SESSION_SUMMARY_WINDOW,
+                max_summary_tokens=Config.SESSION_SUMMARY_MAX_TOKENS
+            )
+        
+        if Config.HISTORY_CACHE_ENABLED:
+            from ai.history_cache import HistoryCache, LocalHistoryBackend, RedisHistoryBackend
+            backend = (RedisHistoryBackend(Config.HISTORY_CACHE_REDIS_URL)
+                       if Config.HISTORY_CACHE_BACKEND == 'redis' else LocalHistoryBackend())
+            if Config.HISTORY_CACHE_BACKEND != 'redis' and Config.WEB_WORKERS > 1:
+                logger.warning(f"⚠️ HISTORY_CACHE_BACKEND is '{Config.HISTORY_CACHE_BACKEND}' with "
+                               f"{Config.WEB_WORKERS} workers - each worker caches history separately "
+                               f"and can serve stale turns; set HISTORY_CACHE_BACKEND=redis")
+            history_cache = HistoryCache(
+                backend=backend,
+                # Room for the summary window plus the turns waiting to be folded
+                max_turns=max(Config.HISTORY_CACHE_TURNS,
+                              session_summarizer.history_limit if session_summarizer else 0),
+                max_sessions_per_user=Config.HISTORY_CACHE_SESSIONS_PER_USER,
+                max_bytes=int(Config.HISTORY_CACHE_MAX_MB * 1024 * 1024)
+            )
+        
+        from ai.context_builder import ContextBuilder
+        context_builder = ContextBuilder(
+            token_budget=Config.CONTEXT_TOKEN_BUDGET,
+            full_turns=Config.CONTEXT_FULL_TURNS,
+            old_answer_tokens=Config.CONTEXT_OLD_ANSWER_TOKENS
+        )
+        
+        conversation_manager = ConversationManager(api_key, gateway=gateway, cache=cache,
+                                                   history_cache=history_cache,
+                                                   context_builder=context_builder,
+                                                   summarizer=session_summarizer)
         logger.info("✓ Finance Expert AI initialized successfully")
         return True
         
@@ -166,62 +296,75 @@ def init_finance_ai():
 def get_session_metadata(session_id: str, user_id: int) -> dict:
     """Get metadata for a chat session"""
     try:
-        # Get first and last messages
-        first_msg = ChatHistory.query.filter_by(
-            session_id=session_id,
-            user_id=user_id
-        ).order_by(ChatHistory.created_at.asc()).first()
-        
-        last_msg = ChatHistory.query.filter_by(
-            session_id=session_id,
-            user_id=user_id
-        ).order_by(ChatHistory.created_at.desc()).first()
-        
-        # Get message count
-        count = ChatHistory.query.filter_by(
-            session_id=session_id,
-            user_id=user_id
-        ).count()
-        
-        if not first_msg:
-            return None
-        
-        return {
-            'session_id': session_id,
-            'title': get_session_title(first_msg.message),
-            'message_count': count,
-            'created_at': format_timestamp(first_msg.created_at),
-            'last_message_at': format_timestamp(last_msg.created_at) if last_msg else None,
-            'preview': first_msg.message[:100]
-        }
+        chat_session = db.session.get(ChatSession, (user_id, session_id))
+        return chat_session.to_dict() if chat_session else None
     except Exception as e:
         logger.error(f"Error getting session metadata: {e}")
         return None
 
 
+def save_chat_exchange(user_id: int, session_id: str, message: str, response: dict, response_time: float) -> int:
+    """
+    Persist a chat exchange and update its ChatSession counters in one transaction
+    
+    Returns:
+        The new ChatHistory id
+    """
+    from sqlalchemy.exc import IntegrityError
+    from ai.context_builder import count_tokens
+    
+    now = datetime.utcnow()
+    response_text = response.get('message', '')
+    usage = response.get('usage') or {}
+    prompt_tokens = usage.get('prompt_tokens') or usage.get('estimated_prompt_tokens') or 0
+    completion_tokens = usage.get('completion_tokens') or count_tokens(response_text)
+    
+    chat = ChatHistory(
+        user_id=user_id,
+        session_id=session_id,
+        message=message,
+        response=response_text,
+        tool_used=response.get('tool_used'),
+        response_time=response_time,
+        created_at=now
+    )
+    db.session.add(chat)
+    
+    counters = {
+        ChatSession.message_count: ChatSession.message_count + 1,
+        ChatSession.prompt_tokens: ChatSession.prompt_tokens + prompt_tokens,
+        ChatSession.completion_tokens: ChatSession.completion_tokens + completion_tokens,
+        ChatSession.last_message_at: now
+    }
+    session_query = ChatSession.query.filter_by(user_id=user_id, session_id=session_id)
+    if not session_query.update(counters, synchronize_session=False):
+        try:
+            with db.session.begin_nested():
+                db.session.add(ChatSession(
+                    user_id=user_id,
+                    session_id=session_id,
+                    title=get_session_title(message),
+                    preview=message[:100],
+                    message_count=1,
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=completion_tokens,
+                    first_message_at=now,
+                    last_message_at=now
+                ))
+        except IntegrityError:
+            # Another request opened the session first - count this message on its row
+            session_query.update(counters, synchronize_session=False)
+    
+    db.session.flush()
+    chat_id = chat.id  # Read before commit expires it (no refresh SELECT)
+    db.session.commit()
+    return chat_id
+
+
 def get_conversation_context(session_id: str, user_id: int, limit: int = 8) -> list:
     """Get conversation context for AI"""
-    try:
-        chats = ChatHistory.query.filter_by(
-            session_id=session_id,
-            user_id=user_id
-        ).order_by(ChatHistory.created_at.desc()).limit(limit).all()
-        
-        # Reverse to chronological order
-        chats = list(reversed(chats))
-        
-        context = []
-        for chat in chats:
-            context.append({
-                'user': chat.message,
-                'assistant': chat.response,
-                'timestamp': chat.created_at
-            })
-        
-        return context
-    except Exception as e:
-        logger.error(f"Error getting conversation context: {e}")
-        return []
+    from ai.chat_utils import get_session_history_from_db
+    return get_session_history_from_db(session_id, user_id, limit, history_cache)
 
 # ============================================================================
 # FRONTEND ROUTES
@@ -561,6 +704,7 @@ def api_create_budget():
             )
             db.session.add(budget)
             created_budgets.append(budget)
+            add_to_month(current_user.id, month, budget.category, planned=budget.planned_amount)
         
         db.session.commit()
         
@@ -581,33 +725,55 @@ def api_create_budget():
 def api_get_monthly_budget(month):
     """Get budget for a specific month"""
     try:
+        # Totals for every spending category and income source: one indexed read
+        totals = get_month_totals(current_user.id, month)
+        categories = totals['categories']
+        
         budgets = Budget.query.filter_by(
             user_id=current_user.id,
             month=month,
             is_active=True
         ).all()
         
-        # Get total income for the month
-        incomes = Income.query.filter_by(
-            user_id=current_user.id,
-            month=month
-        ).all()
+        # Income items are paged; continue with /api/income?month=...&cursor=
+        start_date, end_date = month_range(month)
+        incomes = paginate_query(
+            Income.query.filter(
+                Income.user_id == current_user.id,
+                Income.date >= start_date,
+                Income.date < end_date
+            ),
+            per_page=request.args.get('limit', Config.DEFAULT_PAGE_SIZE, type=int),
+            keyset=(Income.date, Income.id),
+            include_total=False
+        )
         
-        total_income = sum(inc.amount for inc in incomes)
-        total_planned = sum(b.planned_amount for b in budgets)
-        total_spent = sum(b.spent_amount for b in budgets)
+        budget_list = []
+        for b in budgets:
+            budget = b.to_dict()
+            spent = categories[b.category].spent if b.category in categories else 0.0
+            budget['spent_amount'] = round(spent, 2)
+            budget['remaining'] = round(b.planned_amount - spent, 2)
+            budget['percentage'] = round(spent / b.planned_amount * 100, 2) if b.planned_amount > 0 else 0
+            budget['is_over_budget'] = spent > b.planned_amount
+            budget_list.append(budget)
         
         return jsonify({
             'month': month,
-            'total_income': total_income,
-            'total_planned': total_planned,
-            'total_spent': total_spent,
-            'remaining': total_income - total_spent,
-            'savings': total_income - total_spent,
-            'budgets': [b.to_dict() for b in budgets],
-            'incomes': [inc.to_dict() for inc in incomes]
+            'total_income': totals['total_income'],
+            'total_planned': totals['total_planned'],
+            'total_spent': totals['total_spent'],
+            'remaining': round(totals['total_income'] - totals['total_spent'], 2),
+            'savings': round(totals['total_income'] - totals['total_spent'], 2),
+            'categories': [row.to_dict() for row in categories.values()],
+            'income_sources': [row.to_dict() for row in totals['income_sources'].values()],
+            'budgets': budget_list,
+            'incomes': [inc.to_dict() for inc in incomes['items']],
+            'incomes_pagination': incomes['pagination']
         }), 200
         
+    except ValueError:
+        return jsonify({'error': 'Month must be YYYY-MM'}), 400
     except Exception as e:
         logger.error(f"Monthly budget error: {e}")
         return jsonify({'error': 'Failed to load budget'}), 500
@@ -626,6 +792,7 @@ def api_update_budget(budget_id):
             return jsonify({'error': 'Budget not found'}), 404
         
         data = request.get_json()
+        old_planned = budget.planned_amount if budget.is_active else 0.0
         
         if 'planned_amount' in data:
             budget.planned_amount = float(data['planned_amount'])
@@ -638,6 +805,9 @@ def api_update_budget(budget_id):
         if 'is_active' in data:
             budget.is_active = data['is_active']
         
+        new_planned = budget.planned_amount if budget.is_active else 0.0
+        add_to_month(current_user.id, budget.month, budget.category, planned=new_planned - old_planned)
+        
         db.session.commit()
         
         return jsonify({
@@ -663,6 +833,8 @@ def api_delete_budget(budget_id):
         if not budget:
             return jsonify({'error': 'Budget not found'}), 404
         
+        if budget.is_active:
+            add_to_month(current_user.id, budget.month, budget.category, planned=-budget.planned_amount)
         db.session.delete(budget)
         db.session.commit()
         
@@ -700,16 +872,10 @@ def api_add_expense():
         
         db.session.add(expense)
         
-        # Update budget spent amount
-        month = expense.date.strftime('%Y-%m')
-        budget = Budget.query.filter_by(
-            user_id=current_user.id,
-            month=month,
-            category=expense.category
-        ).first()
-        
-        if budget:
-            budget.spent_amount += expense.amount
+        # Month/category totals and chart rollups move in the same transaction
+        add_to_month(current_user.id, month_of(expense.date), expense.category, spent=expense.amount, expenses=1)
+        add_expense_rollups(current_user.id, [(expense.date, expense.category, expense.amount, 1)])
+        bump_expense_version(current_user.id)
         
         db.session.commit()
         
@@ -725,6 +891,70 @@ def api_add_expense():
         logger.error(f"Expense add error: {e}")
         return jsonify({'error': 'Failed to add expense'}), 500
 
+@app.route('/api/expenses/import', methods=['POST'])
+@login_required
+def api_import_expenses():
+    """
+    Bulk import expenses from a bank statement
+    
+    Accepts a multipart upload ('file') or the raw file as the request body.
+    Optional: format (csv/ofx/qif, else from the filename), date_format
+    (strptime pattern), default_category.
+    
+    Only money going out becomes an expense; credits are skipped. CSVs give
+    it as debit/credit columns, an amount with a Dr/Cr type column, or a
+    signed amount where negative is a debit - the same convention as OFX
+    and QIF.
+    """
+    try:
+        from database.expense_import import import_expenses, detect_format, ImportFormatError
+        
+        upload = request.files.get('file')
+        if upload:
+            stream, filename = upload.stream, upload.filename
+        elif request.content_length:
+            stream, filename = request.stream, None
+        else:
+            return jsonify({'error': 'No file uploaded'}), 400
+        
+        fmt = (request.values.get('format') or detect_format(filename, request.mimetype)).lower()
+        
+        try:
+            result = import_expenses(
+                current_user.id,
+                stream,
+                fmt=fmt,
+                date_format=request.values.get('date_format'),
+                default_category=request.values.get('default_category') or 'Other',
+                chunk_size=Config.EXPENSE_IMPORT_CHUNK_SIZE,
+                max_errors=Config.EXPENSE_IMPORT_MAX_ERRORS
+            )
+        except ImportFormatError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        if result['aborted']:
+            logger.error(f"Expense import stopped at row {result['aborted']['row']} for {current_user.email} "
+                         f"({result['aborted']['detail']}) after {result['imported']} rows")
+            return jsonify({
+                'error': 'Import stopped partway',
+                'message': (f"Imported {result['imported']} expenses; "
+                            f"rows from {result['aborted']['row']} on were not imported"),
+                **result
+            }), 500
+        
+        logger.info(f"✓ Imported {result['imported']} expenses ({result['failed']} failed, "
+                    f"{result['skipped']} credits skipped) for {current_user.email} in {result['elapsed']}s")
+        
+        return jsonify({
+            'message': f"Imported {result['imported']} expenses",
+            **result
+        }), 201 if result['imported'] else 200
+        
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Expense import error: {e}")
+        return jsonify({'error': 'Failed to import expenses'}), 500
+
 @app.route('/api/expenses', methods=['GET'])
 @login_required
 def api_get_expenses():
@@ -735,6 +965,8 @@ def api_get_expenses():
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 50, type=int)
         
+        cursor = request.args.get('cursor')
+        
         query = Expense.query.filter_by(user_id=current_user.id)
         
         if month:
@@ -747,19 +979,56 @@ def api_get_expenses():
         if category:
             query = query.filter_by(category=category)
         
-        query = query.order_by(Expense.date.desc())
-        
-        result = paginate_query(query, page, limit)
+        if cursor is not None:
+            # Keyset mode: ?cursor= (empty) for the first page, then next_cursor
+            result = paginate_query(query, per_page=limit, keyset=(Expense.date, Expense.id), cursor=cursor,
+                                    include_total=request.args.get('include_total', 'false').lower() == 'true')
+        else:
+            query = query.order_by(Expense.date.desc(), Expense.id.desc())
+            result = paginate_query(query, page, limit)
         
         return jsonify({
             'expenses': [exp.to_dict() for exp in result['items']],
             'pagination': result['pagination']
         }), 200
         
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Expenses get error: {e}")
         return jsonify({'error': 'Failed to load expenses'}), 500
 
+@app.route('/api/expenses/rollup', methods=['GET'])
+@login_required
+def api_expense_rollup():
+    """
+    Spending series for charts from the pre-aggregated rollups
+    
+    Query: start/end (YYYY-MM-DD, default the last 12 months), granularity
+    (day/week/month, default picked from the range), category.
+    """
+    try:
+        today = datetime.utcnow().date()
+        end = datetime.strptime(request.args['end'], '%Y-%m-%d').date() if request.args.get('end') else today
+        if request.args.get('start'):
+            start = datetime.strptime(request.args['start'], '%Y-%m-%d').date()
+        else:
+            start = date(end.year - 1, end.month, 1)
+        
+        granularity = request.args.get('granularity')
+        if granularity and granularity not in GRANULARITIES:
+            return jsonify({'error': f"granularity must be one of {', '.join(GRANULARITIES)}"}), 400
+        
+        series = get_rollup_series(current_user.id, start, end, granularity=granularity,
+                                   category=request.args.get('category'))
+        return jsonify(series), 200
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Expense rollup error: {e}")
+        return jsonify({'error': 'Failed to load expense chart'}), 500
+
 @app.route('/api/expenses/<int:expense_id>', methods=['PUT', 'DELETE'])
 @login_required
 def api_manage_expense(expense_id):
@@ -774,16 +1043,10 @@ def api_manage_expense(expense_id):
             return jsonify({'error': 'Expense not found'}), 404
         
         if request.method == 'DELETE':
-            # Update budget
-            month = expense.date.strftime('%Y-%m')
-            budget = Budget.query.filter_by(
-                user_id=current_user.id,
-                month=month,
-                category=expense.category
-            ).first()
-            
-            if budget:
-                budget.spent_amount -= expense.amount
+            add_to_month(current_user.id, month_of(expense.date), expense.category,
+                         spent=-expense.amount, expenses=-1)
+            add_expense_rollups(current_user.id, [(expense.date, expense.category, -expense.amount, -1)])
+            bump_expense_version(current_user.id)
             
             db.session.delete(expense)
             db.session.commit()
@@ -810,27 +1073,15 @@ def api_manage_expense(expense_id):
             if 'notes' in data:
                 expense.notes = data['notes']
             
-            # Update budget if amount or category changed
-            month = expense.date.strftime('%Y-%m')
-            
+            # Move the amount between month/category totals and rollups if it changed
             if old_category != expense.category or old_amount != expense.amount:
-                # Remove from old budget
-                old_budget = Budget.query.filter_by(
-                    user_id=current_user.id,
-                    month=month,
-                    category=old_category
-                ).first()
-                if old_budget:
-                    old_budget.spent_amount -= old_amount
-                
-                # Add to new budget
-                new_budget = Budget.query.filter_by(
-                    user_id=current_user.id,
-                    month=month,
-                    category=expense.category
-                ).first()
-                if new_budget:
-                    new_budget.spent_amount += expense.amount
+                month = month_of(expense.date)
+                add_to_month(current_user.id, month, old_category, spent=-old_amount, expenses=-1)
+                add_to_month(current_user.id, month, expense.category, spent=expense.amount, expenses=1)
+                add_expense_rollups(current_user.id, [(expense.date, old_category, -old_amount, -1),
+                                                      (expense.date, expense.category, expense.amount, 1)])
+            # Any edit (a new description included) invalidates cached spending analytics
+            bump_expense_version(current_user.id)
             
             db.session.commit()
             
@@ -855,17 +1106,24 @@ def api_add_income():
     try:
         data = request.get_json()
         
+        if data.get('received_date'):
+            received = datetime.strptime(data.get('received_date'), '%Y-%m-%d').date()
+        elif data.get('month'):
+            received = datetime.strptime(f"{data.get('month')}-01", '%Y-%m-%d').date()
+        else:
+            received = datetime.utcnow().date()
+        
         income = Income(
             user_id=current_user.id,
-            month=data.get('month'),
             source=data.get('source'),
             amount=float(data.get('amount')),
             description=data.get('description', ''),
-            is_recurring=data.get('is_recurring', False),
-            received_date=datetime.strptime(data.get('received_date'), '%Y-%m-%d').date() if data.get('received_date') else None
+            date=received,
+            recurring=data.get('is_recurring', False)
         )
         
         db.session.add(income)
+        add_to_month(current_user.id, month_of(income.date), income.source, income=income.amount)
         db.session.commit()
         
         logger.info(f"✓ Income added: ₹{income.amount} - {income.source}")
@@ -883,24 +1141,52 @@ def api_add_income():
 @app.route('/api/income', methods=['GET'])
 @login_required
 def api_get_income():
-    """Get income records"""
+    """Get income records with totals (paginated)"""
     try:
         month = request.args.get('month')
+        page = request.args.get('page', 1, type=int)
+        limit = request.args.get('limit', Config.DEFAULT_PAGE_SIZE, type=int)
+        cursor = request.args.get('cursor')
         
-        query = Income.query.filter_by(user_id=current_user.id)
-        
+        filters = [Income.user_id == current_user.id]
         if month:
-            query = query.filter_by(month=month)
-        
-        query = query.order_by(Income.created_at.desc())
-        
-        incomes = query.all()
+            start_date, end_date = month_range(month)
+            filters += [Income.date >= start_date, Income.date < end_date]
+        
+        # Totals are computed by the database, not by loading every row
+        total, count = db.session.query(
+            db.func.coalesce(db.func.sum(Income.amount), 0.0),
+            db.func.count(Income.id)
+        ).filter(*filters).one()
+        
+        by_source = db.session.query(
+            Income.source,
+            db.func.sum(Income.amount).label('amount'),
+            db.func.count(Income.id).label('count')
+        ).filter(*filters).group_by(Income.source).order_by(db.desc('amount')).all()
+        
+        query = Income.query.filter(*filters)
+        if cursor is not None:
+            result = paginate_query(query, per_page=limit, keyset=(Income.date, Income.id), cursor=cursor, total=count)
+        else:
+            query = query.order_by(Income.date.desc(), Income.id.desc())
+            result = paginate_query(query, page, limit, total=count)
         
         return jsonify({
-            'incomes': [inc.to_dict() for inc in incomes],
-            'total': sum(inc.amount for inc in incomes)
+            'incomes': [inc.to_dict() for inc in result['items']],
+            'total': round(total, 2),
+            'count': count,
+            'by_source': [
+                {'source': source, 'amount': round(amount, 2), 'count': n}
+                for source, amount, n in by_source
+            ],
+            'pagination': result['pagination']
         }), 200
         
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
+    except ValueError:
+        return jsonify({'error': 'Month must be YYYY-MM'}), 400
     except Exception as e:
         logger.error(f"Income get error: {e}")
         return jsonify({'error': 'Failed to load income'}), 500
@@ -919,12 +1205,14 @@ def api_manage_income(income_id):
             return jsonify({'error': 'Income not found'}), 404
         
         if request.method == 'DELETE':
+            add_to_month(current_user.id, month_of(income.date), income.source, income=-income.amount)
             db.session.delete(income)
             db.session.commit()
             return jsonify({'message': 'Income deleted successfully'}), 200
         
         else:  # PUT
             data = request.get_json()
+            old_source, old_amount = income.source, income.amount
             
             if 'source' in data:
                 income.source = data['source']
@@ -933,7 +1221,12 @@ def api_manage_income(income_id):
             if 'description' in data:
                 income.description = data['description']
             if 'is_recurring' in data:
-                income.is_recurring = data['is_recurring']
+                income.recurring = data['is_recurring']
+            
+            if old_source != income.source or old_amount != income.amount:
+                month = month_of(income.date)
+                add_to_month(current_user.id, month, old_source, income=-old_amount)
+                add_to_month(current_user.id, month, income.source, income=income.amount)
             
             db.session.commit()
             
@@ -947,6 +1240,65 @@ def api_manage_income(income_id):
         logger.error(f"Income manage error: {e}")
         return jsonify({'error': 'Failed to manage income'}), 500
 
+# ============================================================================
+# API ROUTES - SPENDING ANALYTICS
+# ============================================================================
+
+spending_analytics = None
+
+@app.route('/api/analytics/spending', methods=['GET'])
+@login_required
+def api_spending_analytics():
+    """Monthly and category trends, recurring payments and anomalies"""
+    global spending_analytics
+    try:
+        months = min(max(request.args.get('months', 12, type=int), 1), 120)
+        
+        if spending_analytics is None:
+            from tools.spending_analytics import SpendingAnalytics
+            spending_analytics = SpendingAnalytics(max_cached=Config.SPENDING_ANALYTICS_CACHE_USERS)
+        
+        if request.args.get('refresh', 'false').lower() == 'true':
+            spending_analytics.invalidate(current_user.id)
+        
+        report = spending_analytics.report(current_user.id, months=months)
+        return jsonify(report), 200
+        
+    except ImportError as e:
+        logger.error(f"Spending analytics unavailable: {e}")
+        return jsonify({'error': 'Analytics not available'}), 503
+    except Exception as e:
+        logger.error(f"Spending analytics error: {e}")
+        return jsonify({'error': 'Failed to compute analytics'}), 500
+
+@app.route('/api/forecast/cashflow', methods=['GET'])
+@login_required
+def api_cashflow_forecast():
+    """
+    Month-by-month projected balance from recurring items and recent averages
+    
+    Query: months (1-120, default 12), balance (starting balance),
+    history_months (complete past months averaged, default 6).
+    """
+    try:
+        from tools.cashflow_forecast import forecast_cashflow, MAX_MONTHS
+        
+        months = request.args.get('months', 12, type=int)
+        if months < 1 or months > MAX_MONTHS:
+            return jsonify({'error': f'months must be between 1 and {MAX_MONTHS}'}), 400
+        balance = float(request.args.get('balance', 0))
+        history_months = min(max(request.args.get('history_months', 6, type=int), 1), 24)
+        
+        forecast = forecast_cashflow(current_user.id, months=months, starting_balance=balance,
+                                     history_months=history_months)
+        return jsonify(forecast), 200
+        
+    except ValueError:
+        return jsonify({'error': 'balance must be a number'}), 400
+    except Exception as e:
+        logger.error(f"Cash flow forecast error: {e}")
+        return jsonify({'error': 'Failed to compute forecast'}), 500
+
 # ============================================================================
 # API ROUTES - DATABASE VIEWER (ADMIN)
 # ============================================================================
@@ -985,6 +1337,7 @@ def api_get_table_data(table_name):
         page = request.args.get('page', 1, type=int)
         limit = request.args.get('limit', 50, type=int)
         user_id_filter = request.args.get('user_id', type=int)
+        cursor = request.args.get('cursor')
         
         # Map table names to models
         table_models = {
@@ -993,6 +1346,9 @@ def api_get_table_data(table_name):
             'expenses': Expense,
             'incomes': Income,
             'chat_history': ChatHistory,
+            'monthly_totals': MonthlyTotal,
+            'expense_rollups': ExpenseRollup,
+            'data_versions': DataVersion,
             'banks': Bank,
             'insurance_companies': InsuranceCompany,
             'investment_funds': InvestmentFund
@@ -1008,12 +1364,22 @@ def api_get_table_data(table_name):
         if user_id_filter and hasattr(model, 'user_id'):
             query = query.filter_by(user_id=user_id_filter)
         
-        # Get total count
-        total = query.count()
-        
-        # Paginate
-        offset = (page - 1) * limit
-        items = query.limit(limit).offset(offset).all()
+        # Paginate - keyset on the primary key when a cursor is given, so
+        # deep pages of large tables don't scan past every skipped row
+        next_cursor = None
+        if cursor is not None:
+            result = paginate_query(query, per_page=limit, keyset=model.__mapper__.primary_key, cursor=cursor,
+                                    descending=False, include_total=request.args.get('include_total', 'false').lower() == 'true')
+            items = result['items']
+            total = result['pagination']['total']
+            limit = result['pagination']['per_page']
+            next_cursor = result['pagination']['next_cursor']
+        else:
+            # Get total count
+            total = query.count()
+            
+            offset = (page - 1) * limit
+            items = query.limit(limit).offset(offset).all()
         
         # Convert to dict
         data = []
@@ -1036,9 +1402,12 @@ def api_get_table_data(table_name):
             'data': data,
             'total': total,
             'page': page,
-            'limit': limit
+            'limit': limit,
+            'next_cursor': next_cursor
         }), 200
         
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Table data error: {e}")
         return jsonify({'error': str(e)}), 500
@@ -1078,38 +1447,48 @@ def api_chat_message():
         # Get AI response
         logger.info(f"💬 User {current_user.email}: {message[:50]}...")
         
-        response = conversation_manager.process_message(message, current_user.id, session_id)
+        from ai.llm_gateway import LLMBusyError
+        try:
+            response = conversation_manager.process_message(message, current_user.id, session_id)
+        except LLMBusyError as e:
+            logger.warning(f"⏳ LLM backpressure: {e} (retry after {e.retry_after}s)")
+            return jsonify({
+                'error': 'AI Assistant is busy',
+                'message': 'Lots of people are chatting right now. Please try again in a moment.',
+                'retry_after': e.retry_after
+            }), 429, {'Retry-After': str(e.retry_after)}
         
         # Calculate typing delay
         response_text = response.get('message', '')
         typing_delay = 0.0
+        pacing = data.get('pacing', Config.TYPING_DELAY_MODE)
+        if pacing not in ('client', 'server'):
+            pacing = Config.TYPING_DELAY_MODE
         
         if Config.ENABLE_TYPING_DELAY:
-            typing_delay = simulate_typing_delay(
-                response_text,
-                enabled=True,
-                wpm=Config.TYPING_WPM,
-                min_delay=Config.TYPING_DELAY_MIN,
-                max_delay=Config.TYPING_DELAY_MAX
-            )
+            delay_kwargs = {
+                'wpm': Config.TYPING_WPM,
+                'min_delay': Config.TYPING_DELAY_MIN,
+                'max_delay': Config.TYPING_DELAY_MAX
+            }
+            if pacing == 'server':
+                typing_delay = simulate_typing_delay(response_text, enabled=True, **delay_kwargs)
+            else:
+                # Client paces the reply - don't hold the worker thread
+                typing_delay = calculate_typing_delay(response_text, **delay_kwargs)
         
         # Calculate total response time
         total_response_time = calculate_response_time(start_time)
         
         # Save to database
         try:
-            chat = ChatHistory(
-                user_id=current_user.id,
-                session_id=session_id,
-                message=message,
-                response=response_text,
-                tool_used=response.get('tool_used'),
-                response_time=total_response_time
-            )
-            db.session.add(chat)
-            db.session.commit()
+            chat_id = save_chat_exchange(current_user.id, session_id, message, response, total_response_time)
+            
+            if history_cache:
+                history_cache.append(current_user.id, session_id, message, response_text, chat_id=chat_id)
             
-            logger.info(f"✓ Chat saved - Tool: {response.get('tool_used', 'None')}, Time: {total_response_time}s, Delay: {typing_delay}s")
+            prompt_tokens = (response.get('usage') or {}).get('estimated_prompt_tokens')
+            logger.info(f"✓ Chat saved - Tool: {response.get('tool_used', 'None')}, Time: {total_response_time}s, Delay: {typing_delay}s, Prompt tokens: {prompt_tokens}")
             
         except Exception as e:
             logger.error(f"Failed to save chat: {e}")
@@ -1118,6 +1497,7 @@ def api_chat_message():
         # Add metadata to response
         response['response_time'] = total_response_time
         response['typing_delay'] = typing_delay
+        response['typing_delay_mode'] = pacing
         response['session_id'] = session_id
         
         return jsonify(response), 200
@@ -1129,6 +1509,109 @@ def api_chat_message():
             'message': 'I apologize, but I encountered an error. Please try again.'
         }), 500
 
+def sse_event(event: str, payload: dict) -> str:
+    """Format a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
+@app.route('/api/chat/stream', methods=['POST'])
+@login_required
+def api_chat_stream():
+    """Stream AI chat response as Server-Sent Events"""
+    start_time = time.time()
+    
+    if not conversation_manager:
+        return jsonify({
+            'error': 'AI Assistant is currently unavailable',
+            'message': 'The AI service is not initialized. Please contact support.'
+        }), 503
+    
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({'error': 'No data provided'}), 400
+    
+    message = sanitize_user_input(data.get('message', ''), Config.MAX_MESSAGE_LENGTH)
+    user_id = current_user.id
+    session_id = data.get('session_id', f'session_{user_id}_{int(datetime.utcnow().timestamp())}')
+    
+    if not message:
+        return jsonify({'error': 'Message cannot be empty'}), 400
+    
+    if not validate_session_id(session_id):
+        return jsonify({'error': 'Invalid session ID'}), 400
+    
+    logger.info(f"💬 User {current_user.email} (stream): {message[:50]}...")
+    
+    # The first event waits for an LLM slot, so backpressure can still be a 429 before the stream opens
+    from ai.llm_gateway import LLMBusyError
+    events = conversation_manager.stream_message(message, user_id, session_id)
+    try:
+        first_event = next(events)
+    except LLMBusyError as e:
+        logger.warning(f"⏳ LLM backpressure (stream): {e} (retry after {e.retry_after}s)")
+        return jsonify({
+            'error': 'AI Assistant is busy',
+            'message': 'Lots of people are chatting right now. Please try again in a moment.',
+            'retry_after': e.retry_after
+        }), 429, {'Retry-After': str(e.retry_after)}
+    
+    def generate():
+        yield sse_event('start', {'session_id': session_id})
+        first_token_time = None
+        response = None
+        
+        for kind, payload in itertools.chain([first_event], events):
+            if kind == 'token':
+                if first_token_time is None:
+                    first_token_time = calculate_response_time(start_time)
+                yield sse_event('token', {'content': payload})
+            else:
+                response = payload
+        
+        total_response_time = calculate_response_time(start_time)
+        
+        # Persist the finished exchange once the stream has closed
+        if response and response.get('status') == 'success':
+            try:
+                chat_id = save_chat_exchange(user_id, session_id, message, response, total_response_time)
+                if history_cache:
+                    history_cache.append(user_id, session_id, message, response['message'], chat_id=chat_id)
+                logger.info(f"✓ Streamed chat saved - Tool: {response.get('tool_used', 'None')}, TTFB: {first_token_time}s, Time: {total_response_time}s")
+            except Exception as e:
+                logger.error(f"Failed to save streamed chat: {e}")
+                db.session.rollback()
+        
+        response = response or {}
+        yield sse_event('done', {
+            'message': response.get('message', ''),
+            'tool_used': response.get('tool_used'),
+            'status': response.get('status', 'error'),
+            'session_id': session_id,
+            'time_to_first_token': first_token_time,
+            'response_time': total_response_time,
+            'usage': response.get('usage')
+        })
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/chat/cache/stats', methods=['GET'])
+@login_required
+def api_chat_cache_stats():
+    """Response cache hit/miss counters"""
+    if not conversation_manager or not conversation_manager.cache:
+        return jsonify({'enabled': False}), 200
+    
+    stats = conversation_manager.cache.stats()
+    stats['enabled'] = True
+    if history_cache:
+        stats['history_cache'] = history_cache.stats()
+    return jsonify(stats), 200
+
 @app.route('/api/chat/history', methods=['GET'])
 @login_required
 def api_chat_history():
@@ -1140,6 +1623,7 @@ def api_chat_history():
         per_page = min(per_page, Config.MAX_PAGE_SIZE)
         
         session_id = request.args.get('session_id')
+        cursor = request.args.get('cursor')
         
         # Build query
         query = ChatHistory.query.filter_by(user_id=current_user.id)
@@ -1147,10 +1631,14 @@ def api_chat_history():
         if session_id:
             query = query.filter_by(session_id=session_id)
         
-        query = query.order_by(ChatHistory.created_at.desc())
-        
-        # Paginate
-        result = paginate_query(query, page, per_page)
+        # Paginate - keyset when a cursor is given (empty for the first page)
+        if cursor is not None:
+            result = paginate_query(query, per_page=per_page, keyset=(ChatHistory.created_at, ChatHistory.id),
+                                    cursor=cursor,
+                                    include_total=request.args.get('include_total', 'false').lower() == 'true')
+        else:
+            query = query.order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc())
+            result = paginate_query(query, page, per_page)
         
         # Format response
         chats = [chat.to_dict() for chat in result['items']]
@@ -1160,6 +1648,8 @@ def api_chat_history():
             'pagination': result['pagination']
         }), 200
         
+    except InvalidCursorError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         logger.error(f"Chat history error: {e}")
         return jsonify({'error': 'Failed to load chat history'}), 500
@@ -1167,40 +1657,31 @@ def api_chat_history():
 @app.route('/api/chat/sessions', methods=['GET'])
 @login_required
 def api_chat_sessions():
-    """Get list of chat sessions with metadata"""
+    """Get list of chat sessions with metadata (cursor paginated)"""
     try:
-        # Get unique session IDs with aggregated data
-        sessions_query = db.session.query(
-            ChatHistory.session_id,
-            db.func.count(ChatHistory.id).label('message_count'),
-            db.func.min(ChatHistory.created_at).label('created_at'),
-            db.func.max(ChatHistory.created_at).label('last_message')
-        ).filter_by(user_id=current_user.id)\
-         .group_by(ChatHistory.session_id)\
-         .order_by(db.desc('last_message'))\
-         .limit(50)\
-         .all()
-        
-        sessions = []
-        for s in sessions_query:
-            # Get first message for preview
-            first_msg = ChatHistory.query.filter_by(
-                user_id=current_user.id,
-                session_id=s.session_id
-            ).order_by(ChatHistory.created_at.asc()).first()
-            
-            sessions.append({
-                'session_id': s.session_id,
-                'title': get_session_title(first_msg.message) if first_msg else 'New Conversation',
-                'message_count': s.message_count,
-                'created_at': format_timestamp(s.created_at),
-                'last_message_at': format_timestamp(s.last_message),
-                'preview': first_msg.message[:100] if first_msg else ''
-            })
+        from ai.chat_utils import list_chat_sessions
+        
+        limit = request.args.get('limit', 50, type=int)
+        limit = min(max(1, limit), Config.MAX_PAGE_SIZE)
+        
+        after = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            values = decode_cursor(cursor)
+            try:
+                after = (datetime.fromisoformat(values[0]), str(values[1]))
+            except (TypeError, ValueError, IndexError):
+                return jsonify({'error': 'Invalid cursor'}), 400
+        
+        rows, next_key = list_chat_sessions(current_user.id, limit, after)
+        
+        sessions = [chat_session.to_dict() for chat_session in rows]
         
         return jsonify({
             'sessions': sessions,
-            'total': len(sessions)
+            'total': len(sessions),
+            'has_more': next_key is not None,
+            'next_cursor': encode_cursor(*next_key) if next_key else None
         }), 200
         
     except Exception as e:
@@ -1220,9 +1701,16 @@ def api_delete_session(session_id):
             user_id=current_user.id,
             session_id=session_id
         ).delete()
+        ChatSession.query.filter_by(user_id=current_user.id, session_id=session_id).delete()
+        ChatSummary.query.filter_by(user_id=current_user.id, session_id=session_id).delete()
         
         db.session.commit()
         
+        if history_cache:
+            history_cache.invalidate(current_user.id, session_id)
+        if session_summarizer:
+            session_summarizer.invalidate(current_user.id, session_id)
+        
         logger.info(f"✓ Deleted session {session_id} for user {current_user.email} ({deleted} messages)")
         
         return jsonify({
@@ -1241,8 +1729,15 @@ def api_clear_history():
     """Clear all chat history for the current user"""
     try:
         deleted = ChatHistory.query.filter_by(user_id=current_user.id).delete()
+        ChatSession.query.filter_by(user_id=current_user.id).delete()
+        ChatSummary.query.filter_by(user_id=current_user.id).delete()
         db.session.commit()
         
+        if history_cache:
+            history_cache.invalidate(current_user.id)
+        if session_summarizer:
+            session_summarizer.invalidate(current_user.id)
+        
         logger.info(f"✓ Cleared all history for user {current_user.email} ({deleted} messages)")
         
         return jsonify({
@@ -1268,12 +1763,14 @@ def api_session_context(session_id):
         
         context = get_conversation_context(session_id, current_user.id, limit)
         metadata = get_session_metadata(session_id, current_user.id)
+        summary = ChatSummary.query.filter_by(user_id=current_user.id, session_id=session_id).first()
         
         return jsonify({
             'session_id': session_id,
             'metadata': metadata,
             'context': context,
-            'context_length': len(context)
+            'context_length': len(context),
+            'summary': summary.to_dict() if summary else None
         }), 200
         
     except Exception as e:
@@ -1294,15 +1791,14 @@ def api_calculate_emi():
         rate = float(data.get('rate', 0))
         tenure = float(data.get('tenure', 0))
         
-        if principal <= 0 or rate <= 0 or tenure <= 0:
-            return jsonify({'error': 'Invalid input values'}), 400
+        # The EMI is computed (and memoized) on whole months, so validate and echo the rounded tenure
+        tenure = int(round(tenure))
         
-        # EMI calculation
-        monthly_rate = rate / 12 / 100
-        emi = principal * monthly_rate * ((1 + monthly_rate) ** tenure) / (((1 + monthly_rate) ** tenure) - 1)
+        if principal <= 0 or rate <= 0 or tenure < 1:
+            return jsonify({'error': 'Invalid input values'}), 400
         
-        total_amount = emi * tenure
-        total_interest = total_amount - principal
+        # EMI calculation (memoized on paisa / basis points / whole months)
+        emi, total_amount, total_interest = cached_emi(principal, rate, tenure)
         
         return jsonify({
             'emi': round(emi, 2),
@@ -1313,12 +1809,316 @@ def api_calculate_emi():
             'tenure': tenure
         }), 200
         
-    except (ValueError, TypeError):
+    except (ValueError, TypeError, OverflowError):
         return jsonify({'error': 'Invalid input format'}), 400
     except Exception as e:
         logger.error(f"EMI calculation error: {e}")
         return jsonify({'error': 'Calculation failed'}), 500
 
+@app.route('/api/loans/emi-cache/stats', methods=['GET'])
+@login_required
+def api_emi_cache_stats():
+    """EMI memo hit/miss counters"""
+    return jsonify(emi_cache.stats()), 200
+
+@app.route('/api/loans/calculate-emi/batch', methods=['POST'])
+def api_calculate_emi_batch():
+    """
+    Calculate EMIs for many loans in one vectorized pass
+    
+    Body: either "loans": [{"principal", "rate", "tenure"}, ...] or a grid of
+    "principals", "rates" and "tenures" (every combination). Tenure is in
+    months. Optional "breakdown": "yearly" or "monthly".
+    """
+    try:
+        import numpy as np
+        from tools.emi_engine import batch_emi, yearly_breakdown, monthly_schedule, loan_rows, MAX_TENURE_MONTHS
+        
+        data = request.get_json() or {}
+        breakdown = data.get('breakdown')
+        if breakdown not in (None, 'yearly', 'monthly'):
+            return jsonify({'error': "breakdown must be 'yearly' or 'monthly'"}), 400
+        
+        # Size limits are checked before any array is built - a grid of a few
+        # hundred values per axis would otherwise allocate gigabytes first
+        if 'loans' in data:
+            loans = data['loans']
+            count = len(loans)
+        else:
+            axes = [np.asarray(data[key], dtype=float).ravel() for key in ('principals', 'rates', 'tenures')]
+            count = len(axes[0]) * len(axes[1]) * len(axes[2])
+        
+        if count == 0:
+            return jsonify({'error': 'No loans given'}), 400
+        if count > Config.EMI_BATCH_MAX_LOANS:
+            return jsonify({'error': f'At most {Config.EMI_BATCH_MAX_LOANS} loans per request'}), 400
+        if breakdown == 'monthly' and count > Config.EMI_BATCH_MAX_SCHEDULES:
+            return jsonify({'error': f'Monthly schedules for at most {Config.EMI_BATCH_MAX_SCHEDULES} loans'}), 400
+        
+        if 'loans' in data:
+            principal = np.array([float(loan['principal']) for loan in loans])
+            rate = np.array([float(loan['rate']) for loan in loans])
+            tenure = np.array([float(loan['tenure']) for loan in loans])
+        else:
+            principal, rate, tenure = (axis.ravel() for axis in np.meshgrid(*axes, indexing='ij'))
+        
+        invalid = ~np.isfinite(principal) | ~np.isfinite(rate) | (principal <= 0) | (rate <= 0) | \
+            (tenure < 1) | (tenure > MAX_TENURE_MONTHS) | (tenure != np.rint(tenure))
+        if invalid.any():
+            index = int(np.flatnonzero(invalid)[0])
+            return jsonify({'error': 'Invalid input values', 'index': index}), 400
+        
+        started = time.perf_counter()
+        if breakdown == 'yearly':
+            result = yearly_breakdown(principal, rate, tenure)
+        elif breakdown == 'monthly':
+            result = monthly_schedule(principal, rate, tenure)
+        else:
+            result = batch_emi(principal, rate, tenure)
+        computed = time.perf_counter()
+        
+        return jsonify({
+            'count': count,
+            'results': loan_rows(result, breakdown),
+            'compute_ms': round((computed - started) * 1000, 2)
+        }), 200
+        
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'error': 'Invalid input format'}), 400
+    except Exception as e:
+        logger.error(f"Batch EMI calculation error: {e}")
+        return jsonify({'error': 'Calculation failed'}), 500
+
+@app.route('/api/loans/schedule', methods=['GET'])
+def api_loan_schedule():
+    """
+    Stream a full month-by-month amortization schedule
+    
+    Query: principal, rate (annual %), tenure (months), start (first EMI
+    date, YYYY-MM-DD, optional), format (json or csv). Rows are generated
+    as they are sent, so a 30-year schedule never sits in memory.
+    """
+    try:
+        from tools.emi_engine import schedule_json, schedule_csv, MAX_TENURE_MONTHS
+        
+        principal = float(request.args.get('principal', 0))
+        rate = float(request.args.get('rate', 0))
+        tenure = int(request.args.get('tenure', 0))
+        first_payment = (datetime.strptime(request.args['start'], '%Y-%m-%d').date()
+                         if request.args.get('start') else None)
+        fmt = request.args.get('format', 'json').lower()
+        
+        if principal <= 0 or rate <= 0 or tenure <= 0 or tenure > MAX_TENURE_MONTHS:
+            return jsonify({'error': 'Invalid input values'}), 400
+        if fmt not in ('json', 'csv'):
+            return jsonify({'error': "format must be 'json' or 'csv'"}), 400
+        
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid input format'}), 400
+    
+    if fmt == 'csv':
+        return Response(
+            stream_with_context(schedule_csv(principal, rate, tenure, first_payment)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename=emi_schedule_{tenure}m.csv'}
+        )
+    return Response(stream_with_context(schedule_json(principal, rate, tenure, first_payment)),
+                    mimetype='application/json')
+
+def _simulation_terms(data: dict):
+    """
+    (principal, rate, tenure, first payment date) for the simulation routes
+    
+    Either the user's tracked loan ("loan_id", first EMI a month after its
+    start date) or explicit principal, rate (annual %), tenure (months) and
+    optional "start" (first EMI date, YYYY-MM-DD).
+    """
+    from tools.emi_engine import MAX_TENURE_MONTHS, add_months
+    
+    if data.get('loan_id') is not None:
+        if not current_user.is_authenticated:
+            raise PermissionError('Login required to simulate a saved loan')
+        loan = Loan.query.filter_by(id=int(data['loan_id']), user_id=current_user.id).first()
+        if not loan:
+            raise LookupError('Loan not found')
+        principal, rate, tenure = loan.loan_amount, loan.interest_rate or 0, loan.tenure_months or 0
+        first_payment = add_months(loan.start_date, 1) if loan.start_date else None
+    else:
+        principal = float(data.get('principal', 0))
+        rate = float(data.get('rate', 0))
+        tenure = int(data.get('tenure', 0))
+        first_payment = datetime.strptime(data['start'], '%Y-%m-%d').date() if data.get('start') else None
+    
+    if principal <= 0 or rate < 0 or tenure <= 0 or tenure > MAX_TENURE_MONTHS:
+        raise ValueError('Invalid input values')
+    return principal, rate, tenure, first_payment
+
+@app.route('/api/loans/simulate', methods=['POST'])
+def api_simulate_loan():
+    """
+    Simulate prepayments, rate resets and EMI changes on one loan
+    
+    Body: loan terms (see _simulation_terms), "events": [{"type":
+    "prepayment" | "rate_change" | "emi_change", "month" or "date", ...}]
+    and optional "schedule": "yearly" or "monthly".
+    """
+    try:
+        from tools.loan_simulator import LoanSimulation, SimulationError, summarize
+        
+        data = request.get_json() or {}
+        principal, rate, tenure, first_payment = _simulation_terms(data)
+        events = data.get('events') or []
+        schedule = data.get('schedule')
+        if schedule not in (None, 'yearly', 'monthly'):
+            return jsonify({'error': "schedule must be 'yearly' or 'monthly'"}), 400
+        if len(events) > Config.LOAN_SIMULATION_MAX_EVENTS:
+            return jsonify({'error': f'At most {Config.LOAN_SIMULATION_MAX_EVENTS} events per simulation'}), 400
+        
+        simulation = LoanSimulation(principal, rate, tenure, events, first_payment)
+        summary = simulation.summary()
+        baseline = summarize(principal, rate, tenure)
+        response = {
+            'principal': round(principal, 2),
+            'rate': rate,
+            'tenure': tenure,
+            'baseline': {key: round(value, 2) if isinstance(value, float) else value for key, value in baseline.items()},
+            'simulated': summary,
+            'interest_saved': round(baseline['total_interest'] - summary['total_interest'], 2),
+            'months_saved': baseline['months'] - summary['months'],
+            'events': simulation.applied_events()
+        }
+        if schedule == 'yearly':
+            response['schedule'] = simulation.yearly()
+        elif schedule == 'monthly':
+            response['schedule'] = {
+                'payment': [round(value, 2) for value in simulation.payment.tolist()],
+                'interest': [round(value, 2) for value in simulation.interest.tolist()],
+                'principal': [round(value, 2) for value in simulation.principal_paid.tolist()],
+                'balance': [round(value, 2) for value in simulation.balance.tolist()]
+            }
+        return jsonify(response), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except SimulationError as e:
+        return jsonify({'error': str(e)}), 400
+    except (KeyError, ValueError, TypeError):
+        return jsonify({'error': 'Invalid input format'}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Loan simulation error: {e}")
+        return jsonify({'error': 'Simulation failed'}), 500
+
+@app.route('/api/loans/simulate/compare', methods=['POST'])
+def api_compare_loan_scenarios():
+    """
+    Compare named event lists on one loan side by side
+    
+    Body: loan terms, "scenarios": {"name": [events], ...}. Optional
+    "sweep": {"months": [...], "amounts": [...], "reduce": "tenure" | "emi"}
+    adds every single-prepayment combination, computed in one pass.
+    """
+    try:
+        import numpy as np
+        from tools.loan_simulator import compare_scenarios, sweep_prepayments, SimulationError
+        
+        data = request.get_json() or {}
+        principal, rate, tenure, first_payment = _simulation_terms(data)
+        scenarios = data.get('scenarios') or {}
+        sweep = data.get('sweep')
+        if not isinstance(scenarios, dict) or (not scenarios and not sweep):
+            return jsonify({'error': 'Give "scenarios" as {"name": [events]} or a "sweep"'}), 400
+        if len(scenarios) > Config.LOAN_SIMULATION_MAX_SCENARIOS:
+            return jsonify({'error': f'At most {Config.LOAN_SIMULATION_MAX_SCENARIOS} scenarios per request'}), 400
+        if any(len(events or []) > Config.LOAN_SIMULATION_MAX_EVENTS for events in scenarios.values()):
+            return jsonify({'error': f'At most {Config.LOAN_SIMULATION_MAX_EVENTS} events per scenario'}), 400
+        
+        response = compare_scenarios(principal, rate, tenure, scenarios, first_payment)
+        
+        if sweep:
+            reduce = sweep.get('reduce', 'tenure')
+            if reduce not in ('tenure', 'emi'):
+                return jsonify({'error': "sweep reduce must be 'tenure' or 'emi'"}), 400
+            sweep_months = np.asarray(sweep['months'], dtype=np.int64).ravel()
+            sweep_amounts = np.asarray(sweep['amounts'], dtype=np.float64).ravel()
+            points = len(sweep_months) * len(sweep_amounts)
+            if points == 0 or points > Config.LOAN_SIMULATION_MAX_SWEEP:
+                return jsonify({'error': f'Sweep must have 1 to {Config.LOAN_SIMULATION_MAX_SWEEP} points'}), 400
+            if (sweep_months < 0).any() or (sweep_months >= tenure).any() or \
+                    not np.isfinite(sweep_amounts).all() or (sweep_amounts <= 0).any():
+                return jsonify({'error': f'Sweep months must be 0 to {tenure - 1} and amounts > 0'}), 400
+            
+            months, amounts = np.meshgrid(sweep_months, sweep_amounts, indexing='ij')
+            result = sweep_prepayments(principal, rate, tenure, months.ravel(), amounts.ravel(), reduce)
+            best = int(np.argmax(result['interest_saved'] / amounts.ravel()))
+            response['sweep'] = {
+                'reduce': reduce,
+                'months': months.ravel().tolist(),
+                'amounts': amounts.ravel().tolist(),
+                'tenure': result['months'].tolist(),
+                'total_interest': np.round(result['total_interest'], 2).tolist(),
+                'interest_saved': np.round(result['interest_saved'], 2).tolist(),
+                'emi': np.round(result['emi'], 2).tolist(),
+                'best_saving_per_rupee': {
+                    'month': int(months.ravel()[best]),
+                    'amount': float(amounts.ravel()[best]),
+                    'interest_saved': round(float(result['interest_saved'][best]), 2)
+                }
+            }
+        return jsonify(response), 200
+        
+    except PermissionError as e:
+        return jsonify({'error': str(e)}), 401
+    except SimulationError as e:
+        return jsonify({'error': str(e)}), 400
+    except (KeyError, ValueError, TypeError, AttributeError):
+        return jsonify({'error': 'Invalid input format'}), 400
+    except LookupError as e:
+        return jsonify({'error': str(e)}), 404
+    except Exception as e:
+        logger.error(f"Loan scenario comparison error: {e}")
+        return jsonify({'error': 'Comparison failed'}), 500
+
+@app.route('/api/loans/eligibility', methods=['POST'])
+def api_loan_eligibility():
+    """
+    Check loan eligibility against every bank
+    
+    Body: monthly_income, loan_amount, loan_type, and optionally
+    credit_score, employment_type, existing_emi, tenure_months.
+    """
+    try:
+        from tools.loan_eligibility import check_loan_eligibility
+        
+        data = request.get_json() or {}
+        monthly_income = float(data.get('monthly_income', 0))
+        loan_amount = float(data.get('loan_amount', 0))
+        existing_emi = float(data.get('existing_emi') or 0)
+        tenure_months = int(data['tenure_months']) if data.get('tenure_months') else None
+        credit_score = int(data['credit_score']) if data.get('credit_score') else None
+        
+        if monthly_income <= 0 or loan_amount <= 0 or existing_emi < 0 or (tenure_months is not None and tenure_months <= 0):
+            return jsonify({'error': 'Invalid input values'}), 400
+        if credit_score is not None and not 300 <= credit_score <= 900:
+            return jsonify({'error': 'credit_score must be between 300 and 900'}), 400
+        
+        result = check_loan_eligibility(
+            monthly_income, loan_amount, data.get('loan_type', 'personal'),
+            credit_score=credit_score,
+            employment_type=data.get('employment_type'),
+            existing_loans=existing_emi > 0 or bool(data.get('existing_loans')),
+            existing_emi=existing_emi,
+            tenure_months=tenure_months
+        )
+        return jsonify(result), 200
+        
+    except (ValueError, TypeError):
+        return jsonify({'error': 'Invalid input format'}), 400
+    except Exception as e:
+        logger.error(f"Loan eligibility error: {e}")
+        return jsonify({'error': 'Eligibility check failed'}), 500
+
 # ============================================================================
 # API ROUTES - BANKS DATA
 # ============================================================================
@@ -1531,7 +2331,7 @@ if __name__ == '__main__':
     # Display configuration
     print(f"⚙️   Typing Delay: {'✓ Enabled' if Config.ENABLE_TYPING_DELAY else '✗ Disabled'}")
     if Config.ENABLE_TYPING_DELAY:
-        print(f"    └─ Range: {Config.TYPING_DELAY_MIN}s - {Config.TYPING_DELAY_MAX}s @ {Config.TYPING_WPM} WPM")
+        print(f"    └─ Range: {Config.TYPING_DELAY_MIN}s - {Config.TYPING_DELAY_MAX}s @ {Config.TYPING_WPM} WPM ({Config.TYPING_DELAY_MODE}-paced)")
     
     print(f"🌐  Server: http://localhost:5000")
     print(f"📊  Status: {'✓ All systems operational' if db_status and ai_status else '⚠️  Partial functionality'}")
@@ -0,0 +1,99 @@
+"""
+Backfill the chat_sessions table from existing chat_history rows
+Safe to re-run: each user's sessions are rebuilt in one transaction
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+from collections import defaultdict
+
+from database.models import db, ChatHistory, ChatSession
+from ai.context_builder import count_tokens
+from utils import get_session_title
+
+
+def aggregate_user_sessions(user_id: int) -> list:
+    """Message count, first/last timestamps and opening message per session, in one query"""
+    grouped = db.session.query(
+        ChatHistory.session_id.label('session_id'),
+        db.func.count(ChatHistory.id).label('message_count'),
+        db.func.min(ChatHistory.created_at).label('first_message_at'),
+        db.func.max(ChatHistory.created_at).label('last_message_at'),
+        # Rows are appended in order, so the lowest id is the opening message
+        db.func.min(ChatHistory.id).label('first_id')
+    ).filter(ChatHistory.user_id == user_id).group_by(ChatHistory.session_id).subquery()
+
+    first = db.aliased(ChatHistory)
+    return db.session.query(grouped, first.message.label('first_message'))\
+        .join(first, first.id == grouped.c.first_id)\
+        .all()
+
+
+def backfill_chat_sessions(batch_size: int = 1000, verbose: bool = True) -> int:
+    """
+    Rebuild chat_sessions for every user with chat history
+
+    Prompt tokens weren't recorded for past turns, so only completion tokens
+    are backfilled (estimated from the stored responses).
+
+    Returns:
+        Number of sessions written
+    """
+    user_ids = [row[0] for row in db.session.query(ChatHistory.user_id).distinct().all()]
+    written = 0
+
+    for user_id in user_ids:
+        completion_tokens = defaultdict(int)
+        responses = db.session.query(ChatHistory.session_id, ChatHistory.response)\
+            .filter(ChatHistory.user_id == user_id)\
+            .yield_per(batch_size)
+        for session_id, response in responses:
+            completion_tokens[session_id] += count_tokens(response or '')
+
+        rows = [{
+            'user_id': user_id,
+            'session_id': s.session_id,
+            'title': get_session_title(s.first_message),
+            'preview': (s.first_message or '')[:100],
+            'message_count': s.message_count,
+            'prompt_tokens': 0,
+            'completion_tokens': completion_tokens[s.session_id],
+            'first_message_at': s.first_message_at,
+            'last_message_at': s.last_message_at
+        } for s in aggregate_user_sessions(user_id)]
+
+        try:
+            ChatSession.query.filter_by(user_id=user_id).delete()
+            db.session.bulk_insert_mappings(ChatSession, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        written += len(rows)
+        if verbose:
+            print(f"   ✓ User {user_id}: {len(rows)} sessions")
+
+    return written
+
+
+def main():
+    from app import app
+
+    print("=" * 70)
+    print("🗂️  BACKFILLING CHAT SESSIONS")
+    print("=" * 70)
+
+    with app.app_context():
+        db.create_all()  # Creates chat_sessions if it doesn't exist yet
+        written = backfill_chat_sessions()
+
+    print("\n" + "=" * 70)
+    print(f"✅ BACKFILL COMPLETE - {written} sessions")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
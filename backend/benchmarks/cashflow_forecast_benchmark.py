@@ -0,0 +1,133 @@
+"""
+CredNest AI - Cash Flow Forecast Benchmark
+Seeds a typical user (two years of expenses, recurring bills and salary
+entered every month, a few weekly/daily habits) and times
+tools.cashflow_forecast end to end against the 50 ms interactive budget.
+
+Usage:
+    python benchmarks/cashflow_forecast_benchmark.py [--months 120] [--runs 200]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from database.models import db, User, Expense, Income
+from tools.cashflow_forecast import forecast_cashflow, load_rules, historical_averages, project
+
+BUDGET_MS = 50
+TODAY = date(2026, 6, 15)
+
+# (description, category, amount, frequency) entered with is_recurring every time they were paid
+BILLS = [('Flat rent', 'Rent', 22000, 'monthly'), ('Home loan EMI', 'Loans', 18500, 'monthly'),
+         ('Electricity', 'Bills', 1800, 'monthly'), ('Broadband', 'Bills', 999, 'monthly'),
+         ('Netflix', 'Entertainment', 649, 'monthly'), ('SIP - index fund', 'Investments', 5000, 'monthly'),
+         ('Car insurance', 'Insurance', 14000, 'yearly'), ('Health insurance', 'Insurance', 9000, 'quarterly'),
+         ('Yoga class', 'Health', 500, 'weekly'), ('Milk', 'Food', 60, 'daily')]
+CATEGORIES = ['Food', 'Transport', 'Shopping', 'Entertainment', 'Health', 'Bills']
+
+
+def seed(user_id: int, months: int = 24, per_month: int = 40):
+    rng = random.Random(5)
+    start = date(TODAY.year - months // 12, TODAY.month, 1)
+    now = datetime.utcnow()
+    expenses, incomes = [], []
+
+    for m in range(months):
+        month = date(start.year + (start.month - 1 + m) // 12, (start.month - 1 + m) % 12 + 1, 1)
+        for description, category, amount, frequency in BILLS:
+            if frequency == 'monthly' or (frequency == 'quarterly' and m % 3 == 0) or (frequency == 'yearly' and m % 12 == 0):
+                expenses.append({'user_id': user_id, 'category': category, 'amount': amount, 'description': description,
+                                 'date': month + timedelta(days=4), 'is_recurring': True,
+                                 'recurring_frequency': frequency, 'created_at': now})
+        expenses.extend({'user_id': user_id, 'category': rng.choice(CATEGORIES), 'amount': rng.randint(50, 1500),
+                         'description': 'UPI payment', 'date': month + timedelta(days=rng.randrange(28)),
+                         'is_recurring': False, 'recurring_frequency': None, 'created_at': now}
+                        for _ in range(per_month))
+        incomes.append({'user_id': user_id, 'source': 'Salary', 'amount': 95000, 'description': 'Monthly salary',
+                        'date': month, 'recurring': True, 'created_at': now})
+        if m % 4 == 0:
+            incomes.append({'user_id': user_id, 'source': 'Freelance', 'amount': rng.randint(5000, 20000),
+                            'description': 'Project payment', 'date': month + timedelta(days=20),
+                            'recurring': False, 'created_at': now})
+
+    # Weekly and daily habits logged once as recurring
+    expenses.extend({'user_id': user_id, 'category': category, 'amount': amount, 'description': description,
+                     'date': TODAY - timedelta(days=3), 'is_recurring': True, 'recurring_frequency': frequency,
+                     'created_at': now}
+                    for description, category, amount, frequency in BILLS if frequency in ('weekly', 'daily'))
+    db.session.execute(Expense.__table__.insert(), expenses)
+    db.session.execute(Income.__table__.insert(), incomes)
+    db.session.commit()
+    return len(expenses), len(incomes)
+
+
+def timed(fn, runs: int) -> list:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cash flow forecast benchmark')
+    parser.add_argument('--months', type=int, default=120)
+    parser.add_argument('--runs', type=int, default=200)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(), 'forecast_benchmark.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_file}"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, email='forecast@example.com', password_hash='x', name='Forecast'))
+        db.session.commit()
+        expense_rows, income_rows = seed(1)
+
+        print("=" * 70)
+        print("🔮 Cash Flow Forecast Benchmark (SQLite)")
+        print("=" * 70)
+        print(f"{expense_rows:,} expenses and {income_rows} incomes, {args.months}-month horizon, {args.runs} runs\n")
+
+        forecast_cashflow(1, months=args.months, today=TODAY)  # Warm-up
+        rules = load_rules(1, TODAY)
+        averages = historical_averages(1, TODAY)
+        start = date(TODAY.year, TODAY.month + 1, 1) if TODAY.month < 12 else date(TODAY.year + 1, 1, 1)
+
+        rows = [
+            ('Load recurring rules (SQL)', timed(lambda: load_rules(1, TODAY), args.runs)),
+            ('Historical averages (SQL)', timed(lambda: historical_averages(1, TODAY), args.runs)),
+            ('Expand + project (generators)', timed(lambda: project(rules, averages, start, args.months), args.runs)),
+            ('forecast_cashflow() end to end',
+             timed(lambda: forecast_cashflow(1, months=args.months, today=TODAY), args.runs)),
+        ]
+
+        print(f"{'':<36} {'p50 ms':>9} {'p95 ms':>9}")
+        for label, samples in rows:
+            samples.sort()
+            print(f"{label:<36} {statistics.median(samples):>9.2f} {samples[int(len(samples) * 0.95) - 1]:>9.2f}")
+
+        result = forecast_cashflow(1, months=args.months, today=TODAY)
+        print(f"\n{len(result['recurring'])} recurring rules, ending balance ₹{result['ending_balance']:,.0f}")
+
+        end_to_end = sorted(rows[-1][1])
+        p95 = end_to_end[int(len(end_to_end) * 0.95) - 1]
+        print(f"{'✓' if p95 < BUDGET_MS else '✗'} p95 {p95:.1f} ms against the {BUDGET_MS} ms budget")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
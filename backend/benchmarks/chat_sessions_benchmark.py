@@ -0,0 +1,148 @@
+"""
+CredNest AI - Chat Sessions Listing Benchmark
+Compares the legacy /api/chat/sessions query pattern (GROUP BY + one query
+per session for the first message) with the chat_sessions table listing,
+for users with 1k+ sessions, and walks all pages with the cursor
+
+Usage:
+    python benchmarks/chat_sessions_benchmark.py [--sessions 1500] [--messages 6] [--users 20]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import event
+
+from database.models import db, User, ChatHistory
+from ai.chat_utils import list_chat_sessions
+from backfill_chat_sessions import backfill_chat_sessions
+
+
+def seed(users: int, sessions: int, messages: int):
+    """Users with `sessions` sessions of `messages` exchanges each"""
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for user_id in range(1, users + 1):
+        db.session.add(User(id=user_id, email=f"user{user_id}@example.com", password_hash='x', name=f"User {user_id}"))
+        for s in range(sessions):
+            session_id = f"session_{user_id}_{s}"
+            t = start + timedelta(minutes=rng.randint(0, 500_000))
+            for m in range(messages):
+                rows.append({
+                    'user_id': user_id,
+                    'session_id': session_id,
+                    'message': f"Question {m} about home loan rates for session {s} " * 3,
+                    'response': "Answer " * 80,
+                    'created_at': t + timedelta(seconds=30 * m)
+                })
+    db.session.commit()
+    db.session.bulk_insert_mappings(ChatHistory, rows)
+    db.session.commit()
+    return len(rows)
+
+
+def legacy_sessions(user_id: int):
+    """Query pattern of the original api_chat_sessions"""
+    sessions_query = db.session.query(
+        ChatHistory.session_id,
+        db.func.count(ChatHistory.id).label('message_count'),
+        db.func.min(ChatHistory.created_at).label('created_at'),
+        db.func.max(ChatHistory.created_at).label('last_message')
+    ).filter_by(user_id=user_id)\
+     .group_by(ChatHistory.session_id)\
+     .order_by(db.desc('last_message'))\
+     .limit(50)\
+     .all()
+
+    sessions = []
+    for s in sessions_query:
+        first_msg = ChatHistory.query.filter_by(
+            user_id=user_id,
+            session_id=s.session_id
+        ).order_by(ChatHistory.created_at.asc()).first()
+        sessions.append((s.session_id, first_msg.message if first_msg else ''))
+    return sessions
+
+
+def measure(fn, repeat: int):
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    timings = []
+    try:
+        for _ in range(repeat):
+            statements.clear()
+            db.session.expire_all()
+            start = time.perf_counter()
+            result = fn()
+            timings.append(time.perf_counter() - start)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', listener)
+    return result, len(statements), min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Chat sessions listing benchmark')
+    parser.add_argument('--sessions', type=int, default=1500, help='Sessions per user')
+    parser.add_argument('--messages', type=int, default=6, help='Exchanges per session')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(), 'sessions_benchmark.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_file}"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        total_rows = seed(args.users, args.sessions, args.messages)
+
+        print("=" * 70)
+        print("🗂️  Chat Sessions Listing Benchmark (SQLite)")
+        print("=" * 70)
+        print(f"{args.users} users × {args.sessions} sessions × {args.messages} exchanges = {total_rows:,} rows\n")
+
+        start = time.perf_counter()
+        backfilled = backfill_chat_sessions(verbose=False)
+        print(f"Backfilled {backfilled:,} chat_sessions rows in {time.perf_counter() - start:.2f}s\n")
+
+        legacy, legacy_queries, legacy_ms = measure(lambda: legacy_sessions(1), args.repeat)
+        (page, _), page_queries, page_ms = measure(lambda: list_chat_sessions(1, args.page_size), args.repeat)
+
+        def walk_all():
+            after, count, pages = None, 0, 0
+            while True:
+                rows, after = list_chat_sessions(1, args.page_size, after)
+                count += len(rows)
+                pages += 1
+                if after is None:
+                    return count, pages
+
+        (walked, pages), walk_queries, walk_ms = measure(walk_all, 1)
+
+        print(f"{'':<34} {'queries':>8} {'ms':>9}")
+        print(f"{'Legacy first page (N+1)':<34} {legacy_queries:>8} {legacy_ms:>9.1f}")
+        print(f"{'chat_sessions, first page':<34} {page_queries:>8} {page_ms:>9.1f}")
+        print(f"{'chat_sessions, all pages':<34} {walk_queries:>8} {walk_ms:>9.1f}   "
+              f"({walked} sessions / {pages} pages)")
+
+        same = [(s, m[:100]) for s, m in legacy] == [(r.session_id, r.preview) for r in page]
+        print(f"\n{'✓' if same else '✗'} First page matches the legacy listing")
+        print(f"✓ {legacy_ms / page_ms:.1f}x faster first page, "
+              f"{legacy_queries} → {page_queries} queries; cursor reaches all {walked} sessions")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
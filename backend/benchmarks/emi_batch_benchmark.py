@@ -0,0 +1,92 @@
+"""
+CredNest AI - Batch EMI Benchmark
+Times tools.emi_engine on random loans (default 1M) against the scalar
+paths it replaces: the inline formula of /api/loans/calculate-emi in a
+Python loop, and tools.emi_calculator.calculate_emi with its month-by-month
+yearly breakdown (measured on a sample and extrapolated).
+
+Usage:
+    python benchmarks/emi_batch_benchmark.py [--loans 1000000] [--sample 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from tools.emi_calculator import calculate_emi
+from tools.emi_engine import batch_emi, yearly_breakdown
+
+
+def random_loans(count: int):
+    rng = np.random.default_rng(7)
+    principal = rng.integers(50, 20_000, count) * 5000.0
+    rate = rng.choice(np.arange(6.5, 24.01, 0.05).round(2), count)
+    tenure = rng.choice([12, 24, 36, 60, 84, 120, 180, 240, 300, 360], count)
+    return principal, rate, tenure
+
+
+def scalar_emis(principal, rate, tenure) -> list:
+    """The inline formula from api_calculate_emi, one loan at a time"""
+    emis = []
+    for p, r, n in zip(principal, rate, tenure):
+        monthly_rate = r / 12 / 100
+        emis.append(p * monthly_rate * ((1 + monthly_rate) ** n) / (((1 + monthly_rate) ** n) - 1))
+    return emis
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch EMI benchmark')
+    parser.add_argument('--loans', type=int, default=1_000_000)
+    parser.add_argument('--sample', type=int, default=20_000, help='Loans for the calculate_emi baseline')
+    parser.add_argument('--chunk', type=int, default=50_000, help='Loans per yearly-breakdown batch')
+    args = parser.parse_args()
+
+    principal, rate, tenure = random_loans(args.loans)
+    as_lists = principal.tolist(), rate.tolist(), tenure.tolist()
+
+    print("=" * 70)
+    print("🧮 Batch EMI Benchmark")
+    print("=" * 70)
+    print(f"{args.loans:,} random loans (tenures 1-30 years)\n")
+
+    start = time.perf_counter()
+    scalar = scalar_emis(*as_lists)
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = batch_emi(principal, rate, tenure)
+    batch_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(args.sample):
+        calculate_emi(as_lists[0][i], as_lists[1][i], as_lists[2][i])
+    tool_time = (time.perf_counter() - start) / args.sample * args.loans
+
+    start = time.perf_counter()
+    for offset in range(0, args.loans, args.chunk):
+        window = slice(offset, offset + args.chunk)
+        yearly_breakdown(principal[window], rate[window], tenure[window])
+    yearly_time = time.perf_counter() - start
+
+    print(f"{'':<44} {'seconds':>9} {'loans/s':>13}")
+    for label, seconds in [
+        ('Scalar formula loop (api_calculate_emi)', scalar_time),
+        ('batch_emi (vectorized)', batch_time),
+        ('calculate_emi + yearly loop (extrapolated)', tool_time),
+        (f'yearly_breakdown (vectorized, {args.chunk:,}/batch)', yearly_time),
+    ]:
+        print(f"{label:<44} {seconds:>9.3f} {args.loans / seconds:>13,.0f}")
+
+    drift = np.max(np.abs(np.array(scalar) - result['emi']))
+    print(f"\n{'✓' if drift < 1e-6 else '✗'} Max EMI difference vs scalar: {drift:.2e}")
+    print(f"✓ EMI {scalar_time / batch_time:.0f}x faster, yearly breakdown {tool_time / yearly_time:.0f}x faster")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
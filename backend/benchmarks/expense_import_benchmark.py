@@ -0,0 +1,102 @@
+"""
+CredNest AI - Bulk Expense Import Benchmark
+Imports a generated bank-statement CSV through database.expense_import and
+compares it with the one-expense-per-request pattern of /api/expenses/add
+(ORM add + commit per row, measured on a sample and extrapolated)
+
+Usage:
+    python benchmarks/expense_import_benchmark.py [--rows 100000] [--chunk-size 5000]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from database.models import db, User, Expense
+from database.expense_import import import_expenses
+
+CATEGORIES = ['Food', 'Transport', 'Rent', 'Shopping', 'Bills', 'Health', 'Entertainment']
+MERCHANTS = ['UPI-SWIGGY', 'UPI-ZOMATO', 'POS AMAZON', 'NEFT RENT', 'ATM WDL', 'UPI-UBER', 'BBPS ELECTRICITY']
+
+
+def statement_csv(rows: int, bad_every: int = 1000) -> bytes:
+    """Debit/credit statement in the HDFC export layout, with a malformed row every `bad_every`"""
+    rng = random.Random(3)
+    start = date(2024, 4, 1)
+    out = io.StringIO()
+    out.write("Date,Narration,Category,Withdrawal Amt.,Deposit Amt.\n")
+    for i in range(rows):
+        day = (start + timedelta(days=rng.randint(0, 364))).strftime('%d/%m/%y')
+        if bad_every and i % bad_every == bad_every - 1:
+            out.write(f"{day},BROKEN ROW,,12x,\n")
+        elif i % 50 == 0:
+            out.write(f"{day},SALARY CREDIT,,,\"85,000.00\"\n")
+        else:
+            out.write(f"{day},{rng.choice(MERCHANTS)},{rng.choice(CATEGORIES)},\"{rng.randint(20, 25000):,}.00\",\n")
+    return out.getvalue().encode()
+
+
+def per_row_inserts(rows: int) -> float:
+    """What N calls to /api/expenses/add cost in the database: one commit each"""
+    start = time.perf_counter()
+    for i in range(rows):
+        db.session.add(Expense(user_id=2, category='Food', amount=100 + i, description='Txn', date=date(2025, 1, 1)))
+        db.session.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk expense import benchmark')
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--sample', type=int, default=2000, help='Rows for the per-row insert baseline')
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(), 'import_benchmark.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_file}"
+    db.init_app(app)
+
+    payload = statement_csv(args.rows)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([User(id=1, email='bulk@example.com', password_hash='x', name='Bulk'),
+                            User(id=2, email='rows@example.com', password_hash='x', name='Rows')])
+        db.session.commit()
+
+        print("=" * 70)
+        print("📥 Bulk Expense Import Benchmark (SQLite)")
+        print("=" * 70)
+        print(f"{args.rows:,} statement rows ({len(payload) / 1e6:.1f} MB), chunks of {args.chunk_size:,}\n")
+
+        start = time.perf_counter()
+        result = import_expenses(1, io.BytesIO(payload), fmt='csv', chunk_size=args.chunk_size)
+        bulk = time.perf_counter() - start
+
+        baseline = per_row_inserts(args.sample)
+        extrapolated = baseline / args.sample * result['imported']
+
+        stored = Expense.query.filter_by(user_id=1).count()
+        print(f"Imported {result['imported']:,}, skipped {result['skipped']:,} credits, "
+              f"{result['failed']:,} row errors, {len(result['totals'])} (month, category) totals")
+        print(f"\n{'':<38} {'seconds':>9} {'rows/s':>10}")
+        print(f"{'Bulk import (stream + executemany)':<38} {bulk:>9.2f} {result['imported'] / bulk:>10,.0f}")
+        print(f"{'Per-row add + commit (extrapolated)':<38} {extrapolated:>9.2f} {args.sample / baseline:>10,.0f}")
+
+        print(f"\n{'✓' if stored == result['imported'] else '✗'} {stored:,} expenses stored")
+        print(f"✓ {extrapolated / bulk:.0f}x faster than row-at-a-time inserts")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+"""
+CredNest AI - Intent Classifier Benchmark
+Accuracy and latency of the local IntentClassifier against the legacy
+keyword routing, on a labelled corpus (hand-labelled messages plus the
+fine-tuning questions in crednest-ai-v2/server/complete_financial_training.json)
+
+Usage:
+    python benchmarks/intent_classifier_benchmark.py [--iterations 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from ai.chat_utils import is_greeting_or_casual, is_finance_related
+from ai.intent_classifier import IntentClassifier
+
+TRAINING_FILE = os.path.join(BACKEND_DIR, '..', 'crednest-ai-v2', 'server', 'complete_financial_training.json')
+
+# Labels: greeting, off_topic, llm, or tool:<name>
+LABELLED_MESSAGES = [
+    ("hi", 'greeting'),
+    ("Hello there!", 'greeting'),
+    ("hey, good morning", 'greeting'),
+    ("namaste", 'greeting'),
+    ("how are you doing today?", 'greeting'),
+    ("thanks a lot", 'greeting'),
+    ("thank you so much, that was helpful", 'greeting'),
+    ("bye, take care", 'greeting'),
+    ("who are you?", 'greeting'),
+    ("what can you do for me", 'greeting'),
+    ("ok cool", 'greeting'),
+    ("awesome", 'greeting'),
+    ("what's the weather like in Mumbai tomorrow", 'off_topic'),
+    ("write me a poem about the ocean", 'off_topic'),
+    ("who won the cricket match yesterday", 'off_topic'),
+    ("this is a test of the support system with 4 items", 'off_topic'),
+    ("recommend a good movie to watch tonight", 'off_topic'),
+    ("how do I cook biryani at home for 6 people", 'off_topic'),
+    ("tell me a joke about programmers", 'off_topic'),
+    ("What is the capital of Australia", 'off_topic'),
+    ("what is a CIBIL score", 'llm'),
+    ("which bank has the lowest home loan rate", 'llm'),
+    ("Hi, what is the SBI home loan interest rate?", 'llm'),
+    ("should I prepay my home loan or invest in mutual funds", 'llm'),
+    ("how can I improve my credit score quickly", 'llm'),
+    ("explain the difference between FD and PPF", 'llm'),
+    ("what is the best SIP for 10 years", 'llm'),
+    ("how much tax will I pay on 12 lakh income", 'llm'),
+    ("compare HDFC and ICICI personal loans", 'llm'),
+    ("what is EMI", 'llm'),
+    ("what documents do I need", 'llm'),
+    ("am I eligible for a home loan", 'llm'),
+    ("this loan has hidden charges, what should I do", 'llm'),
+    ("is term insurance worth it", 'llm'),
+    ("calculate EMI for 50 lakh at 8.5% for 20 years", 'tool:calculate_emi'),
+    ("EMI on ₹5,00,000 at 10.5% interest for 60 months", 'tool:calculate_emi'),
+    ("what will my emi be for a 1.2 crore loan at 9% over 25 yrs", 'tool:calculate_emi'),
+    ("monthly payment for 8 lakh car loan 9 percent 7 years", 'tool:calculate_emi'),
+    ("emi for 3 lakh personal loan at 13% for 36 months", 'tool:calculate_emi'),
+    ("what documents are needed for a home loan", 'tool:get_document_checklist'),
+    ("documents required for car loan for self employed", 'tool:get_document_checklist'),
+    ("papers needed for an education loan", 'tool:get_document_checklist'),
+    ("KYC docs for personal loan as a salaried employee", 'tool:get_document_checklist'),
+    ("documents for business loan", 'tool:get_document_checklist'),
+    ("am I eligible for 20 lakh home loan with 60k monthly salary", 'tool:check_loan_eligibility'),
+    ("can I get a 5 lakh personal loan, my income is 35,000 per month", 'tool:check_loan_eligibility'),
+    ("eligible for 40 lakh loan with 15 lakh annual income and cibil 780", 'tool:check_loan_eligibility'),
+    ("my salary is 90000, will I get 30 lakh home loan", 'tool:check_loan_eligibility'),
+]
+
+TRAINING_LABELS = {
+    'Calculate EMI for a loan': 'tool:calculate_emi',
+    'Check loan eligibility': 'tool:check_loan_eligibility'
+}
+
+
+def load_corpus() -> list:
+    corpus = list(LABELLED_MESSAGES)
+    if os.path.exists(TRAINING_FILE):
+        with open(TRAINING_FILE, encoding='utf-8') as f:
+            for item in json.load(f):
+                corpus.append((item['input'], TRAINING_LABELS.get(item['instruction'], 'llm')))
+    return corpus
+
+
+def classify_new(classifier: IntentClassifier, message: str) -> str:
+    intent = classifier.classify(message)
+    return f"tool:{intent['tool']}" if intent['intent'] == 'tool' else intent['intent']
+
+
+def classify_legacy(message: str) -> str:
+    """Routing used by ConversationManager before the classifier"""
+    if is_greeting_or_casual(message):
+        return 'greeting'
+    return 'llm' if is_finance_related(message) else 'off_topic'
+
+
+def evaluate(name: str, predict, corpus: list, iterations: int):
+    errors = Counter()
+    correct = 0
+    for message, label in corpus:
+        predicted = predict(message)
+        if predicted == label:
+            correct += 1
+        else:
+            errors[(label, predicted)] += 1
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for message, _ in corpus:
+            predict(message)
+    per_message_us = (time.perf_counter() - start) / (iterations * len(corpus)) * 1e6
+
+    print(f"\n{name}")
+    print(f"  Accuracy: {correct}/{len(corpus)} ({correct / len(corpus):.1%})")
+    print(f"  Latency : {per_message_us:.1f} µs/message")
+    for (label, predicted), count in errors.most_common(5):
+        print(f"  ✗ {label:>30} → {predicted} ({count})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Intent classifier benchmark')
+    parser.add_argument('--iterations', type=int, default=20, help='Latency passes over the corpus')
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    classifier = IntentClassifier()
+
+    print("=" * 70)
+    print("🧭  Intent Classifier Benchmark")
+    print("=" * 70)
+    print(f"Labelled corpus: {len(corpus)} messages")
+
+    evaluate("Legacy keyword routing (greeting / finance / off-topic only)", classify_legacy, corpus, args.iterations)
+    evaluate("IntentClassifier (single keyword pass + tool extraction)",
+             lambda message: classify_new(classifier, message), corpus, args.iterations)
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+CredNest AI - Keyword Matcher Micro-Benchmark
+Compares the legacy per-call substring scans in is_greeting_or_casual /
+is_finance_related / generate_friendly_response with the precompiled
+single-pass matcher over 100k messages (best of --repeats runs, since
+single runs on a busy machine swing by +-30%)
+
+Usage:
+    python benchmarks/keyword_matcher_benchmark.py [--messages 100000] [--repeats 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.chat_utils import message_flags, is_greeting_or_casual, is_finance_related, generate_friendly_response
+
+SAMPLE_MESSAGES = [
+    "hi", "hello there", "thanks a lot", "bye", "how are you?",
+    "what is the SBI home loan interest rate for salaried employees",
+    "calculate EMI for 50 lakh at 8.5% for 20 years",
+    "how can I improve my CIBIL score from 650 to 750 in six months",
+    "which bank gives the best personal loan for a 35000 monthly salary",
+    "this is a test of the support system",
+    "write me a poem about the ocean and the stars at night",
+    "should I prepay my home loan or invest the money in mutual funds",
+    "what documents are needed for an education loan abroad",
+    "who won the cricket match yesterday in Mumbai",
+]
+
+
+def legacy_flags(message):
+    """The pre-compiled-matcher implementation: keyword lists rebuilt and substring-scanned per call"""
+    greetings = [
+        'hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening',
+        'how are you', 'how are u', 'whats up', "what's up", 'sup', 'howdy',
+        'greetings', 'hola', 'namaste', 'namaskar',
+        'how do you do', 'nice to meet you', 'pleasure to meet you'
+    ]
+    casual_phrases = [
+        'thank you', 'thanks', 'thank u', 'thnks', 'thnx', 'appreciate',
+        'great', 'awesome', 'cool', 'nice', 'perfect', 'excellent',
+        'bye', 'goodbye', 'see you', 'take care', 'later',
+        'who are you', 'what can you do', 'help me', 'what is your name'
+    ]
+    finance_keywords = [
+        'loan', 'emi', 'interest', 'bank', 'credit', 'cibil', 'score', 'mortgage',
+        'finance', 'financial', 'savings', 'investment', 'insurance', 'money', 'budget',
+        'debt', 'eligibility', 'document', 'rate', 'home loan', 'personal loan',
+        'car loan', 'education loan', 'repayment', 'tenure', 'processing fee',
+        'mutual fund', 'stock', 'equity', 'fd', 'fixed deposit', 'tax', 'deduction',
+        'sbi', 'hdfc', 'icici', 'axis', 'kotak', 'calculate', 'compare', 'apply',
+        'income', 'salary', 'expense', 'save', 'invest', 'payment', 'account',
+        'rupee', 'lakh', 'crore', 'how much', 'best bank', 'which bank', 'should i'
+    ]
+    message_lower = message.lower().strip()
+    casual = any(g in message_lower for g in greetings + casual_phrases) or (
+        len(message_lower.split()) <= 3 and not any(c.isdigit() for c in message_lower))
+    finance = any(k in message_lower for k in finance_keywords)
+    if casual:
+        # generate_friendly_response repeated the greeting scans
+        any(w in message_lower for w in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'])
+        any(w in message_lower for w in ['thank you', 'thanks', 'thank u', 'thnx', 'appreciate'])
+    return casual, finance
+
+
+def compiled_flags(message):
+    flags = message_flags(message)
+    if flags['casual']:
+        generate_friendly_response(message, flags['labels'])
+    return is_greeting_or_casual(message, flags), is_finance_related(message, flags)
+
+
+def run(name, fn, messages, repeats):
+    """Best of `repeats` timed passes over the messages"""
+    elapsed = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for message in messages:
+            fn(message)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"{name:<34} {elapsed:>8.3f}s {elapsed / len(messages) * 1e6:>9.2f} µs/msg")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Keyword matcher micro-benchmark')
+    parser.add_argument('--messages', type=int, default=100_000)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    messages = [rng.choice(SAMPLE_MESSAGES) for _ in range(args.messages)]
+
+    print("=" * 70)
+    print(f"🔎  Keyword Matcher Micro-Benchmark ({args.messages:,} messages)")
+    print("=" * 70)
+    legacy = run("Legacy substring scans", legacy_flags, messages, args.repeats)
+    compiled = run("Compiled single-pass matcher", compiled_flags, messages, args.repeats)
+    print(f"\n✓ Speed-up: {legacy / compiled:.2f}x")
+
+    print("\nSubstring misfires fixed by word boundaries:")
+    for message in ("this is a test of the support system", "which is the safest option"):
+        old_casual, _ = legacy_flags(message)
+        print(f"  '{message}': casual {old_casual} → {message_flags(message)['casual']}")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+"""
+CredNest AI - LLM Gateway Load Test
+Drives AsyncLLMGateway with 10/100/1000 concurrent users against a stubbed
+async provider and reports throughput, latency and 429 backpressure.
+--stream sends streamed completions (gateway.stream) instead.
+
+Usage:
+    python benchmarks/llm_gateway_load_test.py [--latency 0.2] [--concurrency 16] [--queue 128] [--stream]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.llm_gateway import AsyncLLMGateway, LLMBusyError
+
+
+class StubAsyncProvider:
+    """AsyncGroq stand-in with a fixed completion latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, stream: bool = False, **kwargs):
+        if stream:
+            return self._chunks()
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='ok'))])
+
+    async def _chunks(self, count: int = 10):
+        for _ in range(count):
+            await asyncio.sleep(self.latency / count)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content='ok '))])
+
+
+def user_session(gateway: AsyncLLMGateway, requests_per_user: int, stream: bool = False) -> list:
+    """One simulated user sending chats back to back from a Flask-like thread"""
+    results = []
+    messages = [{'role': 'user', 'content': 'emi for 5 lakh'}]
+    for _ in range(requests_per_user):
+        start = time.perf_counter()
+        try:
+            if stream:
+                for _chunk in gateway.stream(model='stub', messages=messages):
+                    pass
+            else:
+                gateway.complete(model='stub', messages=messages)
+            results.append(('ok', time.perf_counter() - start))
+        except LLMBusyError:
+            results.append(('429', time.perf_counter() - start))
+    return results
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='LLM gateway load test')
+    parser.add_argument('--latency', type=float, default=0.2, help='Stub provider latency in seconds')
+    parser.add_argument('--concurrency', type=int, default=16, help='LLM_MAX_CONCURRENCY')
+    parser.add_argument('--queue', type=int, default=128, help='LLM_MAX_QUEUE')
+    parser.add_argument('--queue-timeout', type=float, default=10.0, help='LLM_QUEUE_TIMEOUT')
+    parser.add_argument('--requests-per-user', type=int, default=3)
+    parser.add_argument('--stream', action='store_true', help='Streamed completions through gateway.stream()')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("🚦  LLM Gateway Load Test (stubbed provider)")
+    print("=" * 70)
+    print(f"Provider latency: {args.latency}s | Concurrency cap: {args.concurrency} | Queue: {args.queue}"
+          f"{' | streamed' if args.stream else ''}")
+    print(f"\n{'users':>6} {'ok/s':>9} {'429s':>7} {'p50 ms':>9} {'p95 ms':>9}")
+
+    for users in (10, 100, 1000):
+        gateway = AsyncLLMGateway(
+            lambda: StubAsyncProvider(args.latency),
+            max_concurrency=args.concurrency,
+            max_queue=args.queue,
+            queue_timeout=args.queue_timeout
+        ).start()
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=users) as pool:
+            sessions = list(pool.map(lambda _: user_session(gateway, args.requests_per_user, args.stream),
+                                     range(users)))
+        elapsed = time.perf_counter() - start
+        gateway.stop()
+
+        results = [r for session in sessions for r in session]
+        ok = [t for status, t in results if status == 'ok']
+        rejected = len(results) - len(ok)
+        print(f"{users:>6} {len(ok) / elapsed:>9.1f} {rejected:>7} "
+              f"{percentile(ok, 0.5) * 1000:>9.1f} {percentile(ok, 0.95) * 1000:>9.1f}")
+
+    print(f"\n✓ Ceiling: {args.concurrency / args.latency:.0f} ok/s "
+          f"(concurrency / latency); excess load is shed as 429 + Retry-After")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
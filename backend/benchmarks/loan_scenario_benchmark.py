@@ -0,0 +1,118 @@
+"""
+CredNest AI - Loan Scenario Benchmark
+Sweeps single lump-sum prepayments (month x amount, default 10k scenarios)
+over one home loan and times tools.loan_simulator against a month-by-month
+loop: closed-form summarize() per scenario, the vectorized
+sweep_prepayments(), and LoanSimulation.add_event() (tail recompute)
+against rebuilding the whole schedule.
+
+Usage:
+    python benchmarks/loan_scenario_benchmark.py [--scenarios 10000] [--sample 500]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from tools.loan_simulator import LoanSimulation, normalize_events, summarize, sweep_prepayments
+
+PRINCIPAL, RATE, TENURE = 7_500_000, 8.75, 300
+
+
+def month_by_month(principal: float, rate: float, tenure: int, month: int, amount: float) -> float:
+    """Total interest with one prepayment (reduce tenure), iterating every payment"""
+    monthly_rate = rate / 12 / 100
+    growth = (1 + monthly_rate) ** tenure
+    emi = principal * monthly_rate * growth / (growth - 1)
+    balance, interest = principal, 0.0
+    for paid in range(tenure):
+        if paid == month:
+            balance = max(balance - amount, 0.0)
+        if balance <= 1e-9:
+            break
+        charge = balance * monthly_rate
+        interest += charge
+        balance -= min(emi, balance + charge) - charge
+    return interest
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Loan scenario benchmark')
+    parser.add_argument('--scenarios', type=int, default=10_000)
+    parser.add_argument('--sample', type=int, default=500, help='Scenarios for the slow baselines')
+    args = parser.parse_args()
+
+    amounts_axis = np.linspace(25_000, 2_500_000, max(1, -(-args.scenarios // TENURE))).round(-3)
+    months, amounts = (axis.ravel()[:args.scenarios] for axis in
+                       np.meshgrid(np.arange(TENURE), amounts_axis, indexing='ij'))
+    count = len(months)
+    sample = np.linspace(0, count - 1, min(args.sample, count)).astype(int)
+    events = [[{'type': 'prepayment', 'month': int(m), 'amount': float(a)}] for m, a in zip(months, amounts)]
+
+    print("=" * 70)
+    print("🏦 Loan Scenario Benchmark")
+    print("=" * 70)
+    print(f"₹{PRINCIPAL:,} at {RATE}% for {TENURE} months, {count:,} prepayment scenarios\n")
+
+    start = time.perf_counter()
+    loop = [month_by_month(PRINCIPAL, RATE, TENURE, int(months[i]), float(amounts[i])) for i in sample]
+    loop_time = (time.perf_counter() - start) / len(sample) * count
+
+    start = time.perf_counter()
+    for i in sample:
+        LoanSimulation(PRINCIPAL, RATE, TENURE, events[i])
+    schedule_time = (time.perf_counter() - start) / len(sample) * count
+
+    start = time.perf_counter()
+    summaries = [summarize(PRINCIPAL, RATE, TENURE, normalize_events(scenario)) for scenario in events]
+    summarize_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sweep = sweep_prepayments(PRINCIPAL, RATE, TENURE, months, amounts)
+    sweep_time = time.perf_counter() - start
+
+    print(f"{'':<44} {'seconds':>9} {'scenarios/s':>13}")
+    for label, seconds in [
+        ('Month-by-month loop (extrapolated)', loop_time),
+        ('LoanSimulation schedule (extrapolated)', schedule_time),
+        ('summarize() per scenario', summarize_time),
+        ('sweep_prepayments (vectorized)', sweep_time),
+    ]:
+        print(f"{label:<44} {seconds:>9.3f} {count / seconds:>13,.0f}")
+
+    # Incremental edits: a rate reset added late in a loan that already has yearly prepayments
+    yearly = [{'type': 'prepayment', 'month': 12 * year, 'amount': 100_000} for year in range(1, 21)]
+    late = [{'type': 'rate_change', 'month': month, 'rate': 9.5} for month in range(120, 180)]
+    simulation = LoanSimulation(PRINCIPAL, RATE, TENURE, yearly)
+    start = time.perf_counter()
+    recomputed = 0
+    for event in late:
+        simulation.add_event(event)
+        recomputed += simulation.recomputed_months
+        simulation.remove_event(simulation.events.index(normalize_events([event])[0]))
+    incremental_time = (time.perf_counter() - start) / (2 * len(late)) * 1000
+
+    start = time.perf_counter()
+    for event in late:
+        LoanSimulation(PRINCIPAL, RATE, TENURE, yearly + [event])
+    rebuild_time = (time.perf_counter() - start) / len(late) * 1000
+    print(f"\nadd/remove_event (tail, avg {recomputed / len(late):.0f} of {simulation.months} months) "
+          f"{incremental_time:.3f} ms vs full rebuild {rebuild_time:.3f} ms")
+
+    loop_drift = max(abs(loop[j] - summaries[i]['total_interest']) for j, i in enumerate(sample))
+    sweep_drift = float(np.max(np.abs(sweep['total_interest'] - [s['total_interest'] for s in summaries])))
+    tenure_match = bool((sweep['months'] == [s['months'] for s in summaries]).all())
+    ok = loop_drift < 0.05 and sweep_drift < 0.01 and tenure_match
+    print(f"\n{'✓' if ok else '✗'} Interest vs month-by-month loop within ₹{loop_drift:.4f}, "
+          f"sweep vs summarize within ₹{sweep_drift:.2e}, tenures {'match' if tenure_match else 'differ'}")
+    print(f"✓ Sweep {loop_time / sweep_time:,.0f}x faster than looping every month")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+"""
+CredNest AI - Query Plan Check
+Runs EXPLAIN on the hot chat history, expense and income queries and fails
+(exit code 1) if any of them falls back to a full table scan or an
+unindexed sort. Meant to run in CI after schema changes.
+
+Uses a seeded temporary SQLite database by default; pass --database-url to
+check an existing SQLite/MySQL database (e.g. after add_composite_indexes.py)
+
+Usage:
+    python benchmarks/query_plan_check.py [--database-url mysql+pymysql://...]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy import select, text
+
+from database.models import db, User, ChatHistory, Expense, ExpenseRollup, Income
+from utils import _after_key
+
+MONTH_START, MONTH_END = date(2025, 3, 1), date(2025, 3, 31)
+
+
+def query_shapes():
+    """The access paths used by the chat and finance endpoints"""
+    return {
+        'chat history for a session (prompt context)': select(ChatHistory)
+            .where(ChatHistory.user_id == 1, ChatHistory.session_id == 'session_1_3')
+            .order_by(ChatHistory.created_at.desc()).limit(10),
+        '/api/chat/history': select(ChatHistory)
+            .where(ChatHistory.user_id == 1)
+            .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(50).offset(0),
+        '/api/chat/history?session_id=': select(ChatHistory)
+            .where(ChatHistory.user_id == 1, ChatHistory.session_id == 'session_1_3')
+            .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(50).offset(0),
+        '/api/expenses': select(Expense)
+            .where(Expense.user_id == 1)
+            .order_by(Expense.date.desc(), Expense.id.desc()).limit(50).offset(0),
+        '/api/expenses?month=': select(Expense)
+            .where(Expense.user_id == 1, Expense.date >= MONTH_START, Expense.date <= MONTH_END)
+            .order_by(Expense.date.desc(), Expense.id.desc()).limit(50).offset(0),
+        '/api/expenses?month=&category=': select(Expense)
+            .where(Expense.user_id == 1, Expense.date >= MONTH_START, Expense.date <= MONTH_END,
+                   Expense.category == 'Food')
+            .order_by(Expense.date.desc(), Expense.id.desc()).limit(50).offset(0),
+        '/api/expenses?cursor= (keyset seek)': select(Expense)
+            .where(Expense.user_id == 1, _after_key([Expense.date, Expense.id], [MONTH_END, 5000], True))
+            .order_by(Expense.date.desc(), Expense.id.desc()).limit(51),
+        '/api/chat/history?cursor= (keyset seek)': select(ChatHistory)
+            .where(ChatHistory.user_id == 1,
+                   _after_key([ChatHistory.created_at, ChatHistory.id], [datetime(2025, 3, 1), 5000], True))
+            .order_by(ChatHistory.created_at.desc(), ChatHistory.id.desc()).limit(51),
+        'income for a month': select(Income)
+            .where(Income.user_id == 1, Income.date >= MONTH_START, Income.date <= MONTH_END)
+            .order_by(Income.date.desc()),
+        '/api/expenses/rollup (5 years by month)': select(ExpenseRollup)
+            .where(ExpenseRollup.user_id == 1, ExpenseRollup.granularity == 'month',
+                   ExpenseRollup.bucket >= date(2021, 1, 1), ExpenseRollup.bucket <= MONTH_END),
+        '/api/expenses/rollup?category=': select(ExpenseRollup)
+            .where(ExpenseRollup.user_id == 1, ExpenseRollup.granularity == 'week',
+                   ExpenseRollup.bucket >= date(2024, 1, 1), ExpenseRollup.bucket <= MONTH_END,
+                   ExpenseRollup.category == 'Food'),
+    }
+
+
+def explain(stmt):
+    """
+    Plan problems for a statement: full scans and sorts not served by an index
+
+    Returns:
+        Tuple of (plan lines, problems)
+    """
+    dialect = db.engine.dialect
+    sql = str(stmt.compile(dialect=dialect, compile_kwargs={'literal_binds': True}))
+
+    if dialect.name == 'sqlite':
+        rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+        lines = [row[-1] for row in rows]
+        problems = [line for line in lines
+                    if (line.startswith('SCAN ') and 'INDEX' not in line) or 'TEMP B-TREE' in line]
+        return lines, problems
+
+    if dialect.name == 'mysql':
+        rows = db.session.execute(text(f"EXPLAIN {sql}")).mappings().fetchall()
+        lines = [f"{row['table']}: type={row['type']} key={row['key']} extra={row['Extra']}" for row in rows]
+        problems = [line for line, row in zip(lines, rows)
+                    if row['type'] == 'ALL' or 'filesort' in (row['Extra'] or '')]
+        return lines, problems
+
+    raise SystemExit(f"EXPLAIN check not supported for {dialect.name}")
+
+
+def seed(users: int, rows_per_user: int):
+    """Enough rows per user that the planner prefers the indexes it is offered"""
+    rng = random.Random(11)
+    start = datetime(2025, 1, 1)
+    chats, expenses, incomes = [], [], []
+    for user_id in range(1, users + 1):
+        db.session.add(User(id=user_id, email=f"user{user_id}@example.com", password_hash='x', name=f"User {user_id}"))
+        for i in range(rows_per_user):
+            when = start + timedelta(minutes=rng.randint(0, 260_000))
+            chats.append({
+                'user_id': user_id,
+                'session_id': f"session_{user_id}_{i % 40}",
+                'message': 'What is the EMI for a 20 lakh home loan?',
+                'response': 'Your EMI would be ...',
+                'created_at': when
+            })
+            expenses.append({
+                'user_id': user_id,
+                'category': rng.choice(['Food', 'Transport', 'Rent', 'Shopping', 'Bills']),
+                'amount': rng.randint(50, 5000),
+                'date': when.date()
+            })
+            if i % 10 == 0:
+                incomes.append({'user_id': user_id, 'source': 'Salary', 'amount': 85000, 'date': when.date()})
+    db.session.commit()
+    db.session.bulk_insert_mappings(ChatHistory, chats)
+    db.session.bulk_insert_mappings(Expense, expenses)
+    db.session.bulk_insert_mappings(Income, incomes)
+    db.session.commit()
+    db.session.execute(text("ANALYZE"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='EXPLAIN-based index regression check')
+    parser.add_argument('--database-url', help='Check an existing database instead of a seeded SQLite copy')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rows', type=int, default=500, help='Chat/expense rows per user when seeding')
+    parser.add_argument('--verbose', action='store_true', help='Print every plan line')
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = args.database_url or \
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'query_plan_check.db')}"
+    db.init_app(app)
+
+    with app.app_context():
+        if not args.database_url:
+            db.create_all()
+            seed(args.users, args.rows)
+
+        print("=" * 70)
+        print(f"🔍 Query Plan Check ({db.engine.dialect.name})")
+        print("=" * 70)
+
+        failures = 0
+        for name, stmt in query_shapes().items():
+            lines, problems = explain(stmt)
+            failures += bool(problems)
+            print(f"{'✗' if problems else '✓'} {name}")
+            for line in (lines if args.verbose else problems):
+                print(f"      {line}")
+
+        print("=" * 70)
+        if failures:
+            print(f"❌ {failures} query shape(s) without a usable index")
+            print("=" * 70)
+            sys.exit(1)
+        print("✅ Every query shape is served by an index")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+CredNest AI - Spending Analytics Benchmark
+Generates one user with a long expense history (default 1M rows), then
+times tools.spending_analytics: loading the arrays, the vectorized report,
+a cached repeat and a row-by-row Python version of the same aggregates.
+
+Usage:
+    python benchmarks/spending_analytics_benchmark.py [--expenses 1000000] [--years 10]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from flask import Flask
+
+from database.models import db, User, Expense
+from database.monthly_totals import rebuild_monthly_totals
+from tools.spending_analytics import ExpenseArrays, SpendingAnalytics, analyze
+
+CATEGORIES = {'Food': 350, 'Transport': 180, 'Shopping': 1400, 'Bills': 900, 'Health': 700, 'Entertainment': 450}
+SUBSCRIPTIONS = [('Netflix', 'Entertainment', 649), ('Spotify', 'Entertainment', 119),
+                 ('Airtel Postpaid', 'Bills', 799), ('Gym membership', 'Health', 1500)]
+MERCHANTS = ['UPI-SWIGGY', 'UPI-ZOMATO', 'POS AMAZON', 'UPI-UBER', 'POS DMART', 'UPI-OLA', 'BBPS']
+
+
+def generate(user_id: int, expenses: int, years: int, batch: int = 50000):
+    """Random day-to-day spending plus monthly subscriptions and rare large outliers"""
+    rng = random.Random(11)
+    start = date.today().replace(day=1) - timedelta(days=365 * years)
+    days = 365 * years
+    insert = Expense.__table__.insert()
+    now = datetime.utcnow()
+    names = list(CATEGORIES)
+
+    rows = []
+    for month in range(years * 12):
+        for name, category, amount in SUBSCRIPTIONS:
+            when = date(start.year + (start.month - 1 + month) // 12, (start.month - 1 + month) % 12 + 1, 5)
+            rows.append({'user_id': user_id, 'category': category, 'amount': amount,
+                         'description': f"{name} {when:%b %Y}", 'date': when, 'created_at': now})
+
+    for i in range(expenses - len(rows)):
+        category = rng.choice(names)
+        amount = round(rng.lognormvariate(math.log(CATEGORIES[category]), 0.5), 2)
+        if i % 20000 == 0:
+            amount *= 60
+        rows.append({'user_id': user_id, 'category': category, 'amount': amount,
+                     'description': f"{rng.choice(MERCHANTS)}/{rng.randint(100000, 999999)}",
+                     'date': start + timedelta(days=rng.randrange(days)), 'created_at': now})
+        if len(rows) >= batch:
+            db.session.execute(insert, rows)
+            rows = []
+    if rows:
+        db.session.execute(insert, rows)
+    db.session.commit()
+
+
+def python_report(user_id: int) -> dict:
+    """The same monthly/category/anomaly aggregates, one Python loop per pass"""
+    rows = db.session.query(Expense.date, Expense.amount, Expense.category)\
+        .filter(Expense.user_id == user_id).all()
+    monthly = defaultdict(float)
+    by_category = defaultdict(float)
+    logs = defaultdict(list)
+    for day, amount, category in rows:
+        month = f"{day.year}-{day.month:02d}"
+        monthly[month] += amount
+        by_category[(month, category)] += amount
+        logs[category].append(math.log1p(amount))
+
+    stats = {}
+    for category, values in logs.items():
+        mean = sum(values) / len(values)
+        stats[category] = (mean, math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)))
+    anomalies = [(day, amount) for day, amount, category in rows
+                 if stats[category][1] and (math.log1p(amount) - stats[category][0]) / stats[category][1] > 3]
+    return {'months': len(monthly), 'anomalies': len(anomalies)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Spending analytics benchmark')
+    parser.add_argument('--expenses', type=int, default=1_000_000)
+    parser.add_argument('--years', type=int, default=10)
+    args = parser.parse_args()
+
+    db_file = os.path.join(tempfile.mkdtemp(), 'analytics_benchmark.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{db_file}"
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id=1, email='analytics@example.com', password_hash='x', name='Analytics'))
+        db.session.commit()
+
+        print("=" * 70)
+        print("📈 Spending Analytics Benchmark (SQLite)")
+        print("=" * 70)
+
+        start = time.perf_counter()
+        generate(1, args.expenses, args.years)
+        rebuild_monthly_totals(1)
+        print(f"Generated {args.expenses:,} expenses over {args.years} years "
+              f"in {time.perf_counter() - start:.1f}s\n")
+
+        start = time.perf_counter()
+        data = ExpenseArrays.load(1)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = analyze(data)
+        compute = time.perf_counter() - start
+
+        engine = SpendingAnalytics()
+        engine.report(1)
+        start = time.perf_counter()
+        cached = engine.report(1)
+        hit = time.perf_counter() - start
+
+        start = time.perf_counter()
+        baseline = python_report(1)
+        python_time = time.perf_counter() - start
+
+        print(f"{'':<40} {'ms':>10}")
+        print(f"{'Load into arrays':<40} {load * 1000:>10.1f}")
+        print(f"{'Vectorized report':<40} {compute * 1000:>10.1f}")
+        print(f"{'Cached report (version check)':<40} {hit * 1000:>10.2f}")
+        print(f"{'Python loops (load + 3 aggregates)':<40} {python_time * 1000:>10.1f}")
+
+        print(f"\n{len(report['monthly'])} months shown, {len(report['categories'])} categories, "
+              f"{len(report['recurring'])} recurring, {len(report['anomalies'])} anomalies listed")
+        for item in report['recurring']:
+            print(f"   • {item['description']:<28} {item['frequency']:<8} ₹{item['amount']:>8,.0f}")
+
+        print(f"\n{'✓' if cached['cached'] else '✗'} Repeat request served from cache")
+        months = len(np.unique(data.days.astype('datetime64[M]')))
+        print(f"{'✓' if baseline['months'] == months else '✗'} Month count matches the Python version ({months})")
+        print(f"✓ Vectorized compute {python_time / compute:.0f}x faster than the Python loops "
+              f"({(load + compute) / python_time:.2f}x their time including the load)")
+        print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+CredNest AI - Streaming Time-To-First-Byte Benchmark
+Compares blocking process_message against stream_message using a local
+fake Groq client that yields chunks at a fixed token rate
+
+Usage:
+    python benchmarks/streaming_ttfb_benchmark.py [--tokens 800] [--token-latency 0.002]
+"""
+
+import argparse
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai.conversation_manager import ConversationManager
+
+
+class FakeGroqClient:
+    """Groq-compatible stand-in: `client.chat.completions.create(...)`"""
+
+    def __init__(self, tokens: int = 800, token_latency: float = 0.002, first_token_latency: float = 0.2):
+        self.tokens = tokens
+        self.token_latency = token_latency
+        self.first_token_latency = first_token_latency
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _chunks(self):
+        time.sleep(self.first_token_latency)
+        for i in range(self.tokens):
+            if i:
+                time.sleep(self.token_latency)
+            delta = SimpleNamespace(content=f"tok{i} ")
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    def create(self, stream: bool = False, **kwargs):
+        if stream:
+            return self._chunks()
+        content = ''.join(chunk.choices[0].delta.content for chunk in self._chunks())
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Streaming TTFB benchmark')
+    parser.add_argument('--tokens', type=int, default=800, help='Tokens in the fake answer')
+    parser.add_argument('--token-latency', type=float, default=0.002, help='Seconds between tokens')
+    args = parser.parse_args()
+
+    manager = ConversationManager(None, client=FakeGroqClient(args.tokens, args.token_latency))
+    question = "Compare SBI and HDFC home loan interest rates for a 50 lakh loan"
+
+    print("=" * 70)
+    print("📡  Streaming Chat TTFB Benchmark")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    blocking = manager.process_message(question)
+    blocking_total = time.perf_counter() - start
+    print(f"  blocking : first byte {blocking_total * 1000:8.1f} ms | total {blocking_total * 1000:8.1f} ms")
+
+    start = time.perf_counter()
+    first_token = None
+    final = None
+    for kind, payload in manager.stream_message(question):
+        if kind == 'token' and first_token is None:
+            first_token = time.perf_counter() - start
+        elif kind == 'done':
+            final = payload
+    stream_total = time.perf_counter() - start
+    print(f"  streaming: first byte {first_token * 1000:8.1f} ms | total {stream_total * 1000:8.1f} ms")
+
+    assert final['message'] == blocking['message'], "Streamed and blocking answers differ"
+    print(f"\n✓ TTFB improvement: {blocking_total / first_token:.1f}x (identical final message)")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
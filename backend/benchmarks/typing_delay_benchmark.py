@@ -0,0 +1,68 @@
+"""
+CredNest AI - Typing Delay Benchmark
+Compares chat throughput with server-side pacing (sleep in the worker)
+against client-side pacing (delay returned to the browser)
+
+Usage:
+    python benchmarks/typing_delay_benchmark.py [--workers 16] [--requests 200]
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import calculate_typing_delay, simulate_typing_delay
+
+# Typical answer length for a finance question (~300 words)
+SAMPLE_RESPONSE = ("Based on your profile, the SBI home loan at 8.50% p.a. works out to "
+                   "an EMI of about ₹43,391 per month for ₹50 lakh over 20 years. ") * 20
+
+
+def handle_chat(pacing: str, llm_latency: float, delay_kwargs: dict) -> float:
+    """Simulate one /api/chat/message request inside a worker thread"""
+    time.sleep(llm_latency)  # Stubbed LLM round-trip
+    if pacing == 'server':
+        return simulate_typing_delay(SAMPLE_RESPONSE, enabled=True, **delay_kwargs)
+    return calculate_typing_delay(SAMPLE_RESPONSE, **delay_kwargs)
+
+
+def run(pacing: str, workers: int, requests: int, llm_latency: float, delay_kwargs: dict) -> float:
+    """Push `requests` chats through a fixed worker pool, return requests/sec"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda _: handle_chat(pacing, llm_latency, delay_kwargs), range(requests)))
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Typing delay pacing benchmark')
+    parser.add_argument('--workers', type=int, default=16, help='Worker threads (Flask/gunicorn threads)')
+    parser.add_argument('--requests', type=int, default=200, help='Chat requests per run')
+    parser.add_argument('--llm-latency', type=float, default=0.05, help='Stubbed LLM latency in seconds')
+    parser.add_argument('--max-delay', type=float, default=3.0, help='TYPING_DELAY_MAX in seconds')
+    args = parser.parse_args()
+
+    delay_kwargs = {'wpm': 200, 'min_delay': 0.5, 'max_delay': args.max_delay}
+    delay = calculate_typing_delay(SAMPLE_RESPONSE, **delay_kwargs)
+
+    print("=" * 70)
+    print("⏱️  Typing Delay Pacing Benchmark")
+    print("=" * 70)
+    print(f"Workers: {args.workers} | Requests: {args.requests} | "
+          f"LLM latency: {args.llm_latency}s | Typing delay: {delay}s")
+
+    results = {}
+    for pacing in ('server', 'client'):
+        results[pacing] = run(pacing, args.workers, args.requests, args.llm_latency, delay_kwargs)
+        print(f"  {pacing:>6}-paced: {results[pacing]:8.1f} req/s")
+
+    print(f"\n✓ Client pacing speedup: {results['client'] / results['server']:.1f}x")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
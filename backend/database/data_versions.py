@@ -0,0 +1,37 @@
+"""
+CredNest AI - Data Versions
+Per-user counters in data_versions, bumped by an atomic
+UPDATE ... SET expenses = expenses + 1 in the writer's transaction. Cached
+reports (spending analytics) compare the counter instead of fingerprinting
+the data, so an edit that leaves every total unchanged - a new description,
+two edits in the same second - still moves the version.
+"""
+
+from sqlalchemy.exc import IntegrityError
+
+from database.models import db, DataVersion
+
+
+def bump_expense_version(user_id: int):
+    """
+    Mark the user's expenses as changed
+
+    Runs in the caller's transaction and does not commit, so the version
+    moves together with the expense write.
+    """
+    version_query = DataVersion.query.filter_by(user_id=user_id)
+    if version_query.update({DataVersion.expenses: DataVersion.expenses + 1}, synchronize_session=False):
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(DataVersion(user_id=user_id, expenses=1))
+    except IntegrityError:
+        # Another request created the row first - bump it
+        version_query.update({DataVersion.expenses: DataVersion.expenses + 1}, synchronize_session=False)
+
+
+def get_expense_version(user_id: int) -> int:
+    """The user's expense write counter (0 before the first write)"""
+    version = db.session.query(DataVersion.expenses).filter(DataVersion.user_id == user_id).scalar()
+    return version or 0
@@ -0,0 +1,372 @@
+"""
+CredNest AI - Bulk Expense Import
+Streams CSV, OFX and QIF bank exports row by row, validates each row and
+inserts the valid ones in chunked executemany transactions. Credits
+(salary, refunds) are skipped - only money going out becomes an expense.
+"""
+
+import csv
+import io
+import re
+import time
+from collections import defaultdict
+from datetime import datetime
+from functools import lru_cache
+
+from database.models import db, Expense
+from database.monthly_totals import add_expense_totals
+from database.expense_rollups import add_expense_rollups
+from database.data_versions import bump_expense_version
+
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_MAX_ERRORS = 1000
+
+# Day-first formats used by Indian bank statements, plus ISO
+CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y', '%d.%m.%Y',
+                    '%d-%b-%Y', '%d %b %Y', '%d-%b-%y', '%d %b %y')
+# Quicken writes month first, with an apostrophe before 2-digit years (1/31'25)
+QIF_DATE_FORMATS = ('%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d', '%d/%m/%Y')
+
+# Header aliases, lower-cased
+CSV_COLUMNS = {
+    'date': ('date', 'transaction date', 'txn date', 'value date', 'posting date'),
+    'amount': ('amount', 'amount (inr)', 'transaction amount'),
+    'debit': ('debit', 'withdrawal', 'withdrawal amt.', 'withdrawal amount', 'debit amount', 'dr'),
+    'credit': ('credit', 'deposit', 'deposit amt.', 'deposit amount', 'credit amount', 'cr'),
+    'type': ('type', 'dr/cr', 'cr/dr', 'transaction type'),
+    'description': ('description', 'narration', 'particulars', 'remarks', 'details', 'payee'),
+    'category': ('category',),
+    'payment_method': ('payment_method', 'payment method', 'mode'),
+}
+
+_AMOUNT_NOISE = re.compile(r'[₹,\s]|INR|Rs\.?', re.IGNORECASE)
+_OFX_TAG = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+
+
+class ImportFormatError(ValueError):
+    """Upload that can't be read as the requested format at all"""
+
+
+@lru_cache(maxsize=8192)
+def _parse_date(value: str, formats: tuple):
+    # Statements repeat the same few hundred dates, so this is mostly cache hits
+    for fmt in formats:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date '{value}'")
+
+
+def _parse_amount(value: str):
+    """Signed amount from a statement cell; a trailing Cr/Dr marks the direction"""
+    text = _AMOUNT_NOISE.sub('', value)
+    sign = 1
+    if text[-2:].lower() in ('cr', 'dr'):
+        sign = -1 if text[-2:].lower() == 'cr' else 1
+        text = text[:-2]
+    if text.startswith('(') and text.endswith(')'):  # Accounting-style negative
+        text = '-' + text[1:-1]
+    try:
+        return sign * float(text)
+    except ValueError:
+        raise ValueError(f"Invalid amount '{value}'")
+
+
+# ============================================================================
+# PARSERS - each yields (row number, fields) with a signed 'amount' where
+# positive means money out, or (row number, error message)
+# ============================================================================
+
+def iter_csv(stream, date_formats=CSV_DATE_FORMATS):
+    """
+    CSV with a header row; either debit/credit columns, or one amount column
+
+    A single amount column follows its type column (Dr/Cr) when there is
+    one; otherwise it is signed the way bank exports, OFX and QIF are:
+    negative is a debit (money out), positive a credit.
+    """
+    reader = csv.reader(stream)
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise ImportFormatError('File is empty')
+
+    names = [h.strip().lower() for h in header]
+    index = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in names:
+                index[field] = names.index(alias)
+                break
+    if 'date' not in index or not ({'amount', 'debit'} & index.keys()):
+        raise ImportFormatError('CSV needs a date column and an amount or debit column')
+
+    width = max(index.values()) + 1
+    positions = [(field, index.get(field)) for field in CSV_COLUMNS]
+    has_debit = 'debit' in index
+
+    for row_no, row in enumerate(reader, start=2):
+        if not any(row):
+            continue
+        if len(row) < width:
+            row = row + [''] * (width - len(row))
+        cell = {field: (row[i].strip() if i is not None else '') for field, i in positions}
+        try:
+            when = _parse_date(cell['date'], date_formats)
+            if has_debit and cell['debit']:
+                amount = abs(_parse_amount(cell['debit']))
+            elif has_debit and not cell['amount']:
+                # Credit-only row of a debit/credit statement
+                amount = -abs(_parse_amount(cell['credit'] or '0'))
+            else:
+                amount = _parse_amount(cell['amount'])
+                direction = cell['type'].lower()
+                if direction in ('cr', 'credit', 'c'):
+                    amount = -abs(amount)
+                elif direction in ('dr', 'debit', 'd'):
+                    amount = abs(amount)
+                else:
+                    # Signed amount, bank-statement style like OFX/QIF: negative is money out
+                    amount = -amount
+        except ValueError as e:
+            yield row_no, str(e)
+            continue
+        yield row_no, {
+            'date': when,
+            'amount': amount,
+            'description': cell['description'],
+            'category': cell['category'],
+            'payment_method': cell['payment_method']
+        }
+
+
+def iter_ofx(stream, chunk_size: int = 65536):
+    """OFX 1.x (SGML, unclosed tags) or 2.x (XML); transactions are STMTTRN blocks"""
+    transaction, number, buffer = None, 0, ''
+    while True:
+        chunk = stream.read(chunk_size)
+        buffer += chunk
+        # Keep a possibly cut-off trailing tag for the next chunk
+        cut = max(buffer.rfind('<'), 0) if chunk else len(buffer)
+        parsed, buffer = buffer[:cut], buffer[cut:]
+
+        for closing, tag, value in _OFX_TAG.findall(parsed):
+            tag = tag.upper()
+            if tag == 'STMTTRN':
+                if not closing:
+                    transaction = {}
+                    number += 1
+                    continue
+                if transaction is not None:
+                    yield number, _ofx_fields(transaction)
+                transaction = None
+            elif transaction is not None and not closing:
+                transaction[tag] = value.strip()
+
+        if not chunk:
+            if not number:
+                raise ImportFormatError('No OFX transactions found')
+            return
+
+
+def _ofx_fields(transaction: dict):
+    try:
+        posted = transaction.get('DTPOSTED', '')[:8]
+        if not posted.isdigit() or len(posted) != 8:
+            raise ValueError(f"Unrecognised date '{posted}'")
+        when = _parse_date(posted, ('%Y%m%d',))
+        amount = -float(transaction.get('TRNAMT', ''))  # OFX debits are negative
+    except ValueError as e:
+        return f"Invalid transaction: {e}"
+    return {
+        'date': when,
+        'amount': amount,
+        'description': transaction.get('NAME') or transaction.get('MEMO', ''),
+        'category': '',
+        'payment_method': transaction.get('TRNTYPE', '').title()
+    }
+
+
+def iter_qif(stream, date_formats=QIF_DATE_FORMATS):
+    """QIF bank register: one field per line (D date, T amount, P payee, M memo, L category), ^ ends a record"""
+    record, number = {}, 0
+    for line in stream:
+        line = line.rstrip('\r\n')
+        if not line or line.startswith('!'):
+            continue
+        code, value = line[0], line[1:].strip()
+        if code != '^':
+            record.setdefault(code, value)
+            continue
+
+        number += 1
+        try:
+            when = _parse_date(record.get('D', '').replace("'", '/'), date_formats)
+            amount = -_parse_amount(record.get('T') or record.get('U', ''))  # Payments are negative
+        except ValueError as e:
+            yield number, str(e)
+        else:
+            yield number, {
+                'date': when,
+                'amount': amount,
+                'description': record.get('P') or record.get('M', ''),
+                'category': record.get('L', '').split(':')[0],
+                'payment_method': ''
+            }
+        record = {}
+
+
+PARSERS = {'csv': iter_csv, 'ofx': iter_ofx, 'qif': iter_qif}
+
+
+def detect_format(filename: str = None, content_type: str = None) -> str:
+    """Format from the file extension or content type, defaulting to CSV"""
+    name = (filename or '').lower()
+    for fmt in ('ofx', 'qfx', 'qif'):
+        if name.endswith('.' + fmt) or fmt in (content_type or ''):
+            return 'ofx' if fmt == 'qfx' else fmt
+    return 'csv'
+
+
+def import_expenses(user_id: int, stream, fmt: str = 'csv', date_format: str = None,
+                    default_category: str = 'Other', chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    max_errors: int = DEFAULT_MAX_ERRORS) -> dict:
+    """
+    Stream an uploaded statement into the expenses table
+
+    Rows are read and validated one at a time and inserted with one
+    executemany per `chunk_size` rows, each chunk in its own transaction
+    together with one monthly_totals increment per (month, category) it
+    touches and its day/week/month rollups, so memory stays flat and a bad
+    row never rolls back good ones. If a chunk can't be saved (or the file
+    can't be read further) after earlier chunks were committed, the import
+    stops and the report says how far it got instead of raising.
+
+    Args:
+        user_id: Owner of the expenses
+        stream: Binary file-like object (upload or request body)
+        fmt: 'csv', 'ofx' or 'qif'
+        date_format: strptime format to use instead of auto-detection
+        default_category: Category for rows without one
+        chunk_size: Rows per INSERT/commit
+        max_errors: Row errors listed in the result (all are counted)
+
+    Returns:
+        Dict with imported/skipped/failed counts, row errors, totals per
+        (month, category) of what was imported, and 'aborted' - None, or
+        {'row', 'error'} with the first row that was not imported when the
+        import stopped partway
+
+    Raises:
+        ImportFormatError: If the upload can't be parsed as `fmt`
+        Exception: Whatever stopped the import before any chunk was committed
+    """
+    if fmt not in PARSERS:
+        raise ImportFormatError(f"Unsupported format '{fmt}'")
+
+    started = time.perf_counter()
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', errors='replace', newline='')
+    if date_format and fmt != 'ofx':
+        rows = PARSERS[fmt](text, (date_format,))
+    else:
+        rows = PARSERS[fmt](text)
+
+    # Core insert on the table: one executemany per chunk, no ORM bookkeeping
+    insert = Expense.__table__.insert()
+    now = datetime.utcnow()
+    chunk, errors = [], []
+    imported = skipped = failed = 0
+    chunk_start = last_row = 0
+    saving = False
+    aborted = None
+    totals = defaultdict(lambda: [0.0, 0])
+    chunk_totals = defaultdict(lambda: [0.0, 0])
+    chunk_days = defaultdict(lambda: [0.0, 0])
+
+    def flush():
+        nonlocal imported
+        try:
+            db.session.connection().execute(insert, chunk)
+            add_expense_totals(user_id, {
+                (f"{year}-{month:02d}", category): values
+                for (year, month, category), values in chunk_totals.items()
+            })
+            add_expense_rollups(user_id, ((day, category, amount, count)
+                                          for (day, category), (amount, count) in chunk_days.items()))
+            bump_expense_version(user_id)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        imported += len(chunk)
+        for key, (amount, count) in chunk_totals.items():
+            totals[key][0] += amount
+            totals[key][1] += count
+        chunk.clear()
+        chunk_totals.clear()
+        chunk_days.clear()
+
+    try:
+        for row_no, fields in rows:
+            last_row = row_no
+            if isinstance(fields, str):
+                failed += 1
+                if len(errors) < max_errors:
+                    errors.append({'row': row_no, 'error': fields})
+                continue
+            if fields['amount'] <= 0:
+                skipped += 1  # Credit or zero-value row
+                continue
+
+            category = (fields['category'] or default_category)[:100]
+            amount = round(fields['amount'], 2)
+            if not chunk:
+                chunk_start = row_no
+            chunk.append({
+                'user_id': user_id,
+                'category': category,
+                'amount': amount,
+                'description': fields['description'],
+                'date': fields['date'],
+                'payment_method': fields['payment_method'][:50] or None,
+                'created_at': now
+            })
+            total = chunk_totals[(fields['date'].year, fields['date'].month, category)]
+            total[0] += amount
+            total[1] += 1
+            day_total = chunk_days[(fields['date'], category)]
+            day_total[0] += amount
+            day_total[1] += 1
+
+            if len(chunk) >= chunk_size:
+                saving = True
+                flush()
+                saving = False
+
+        if chunk:
+            saving = True
+            flush()
+    except Exception as e:
+        if not imported:
+            raise  # Nothing was committed - fail the whole import
+        # Earlier chunks are committed: report them and where to resume rather than a bare failure
+        resume = chunk_start if chunk else last_row + 1
+        aborted = {
+            'row': resume,
+            'error': f"Could not save rows from {resume} on" if saving else f"Could not read the file after row {last_row}",
+            'detail': type(e).__name__
+        }
+
+    return {
+        'imported': imported,
+        'skipped': skipped,
+        'failed': failed,
+        'errors': errors,
+        'totals': [
+            {'month': f"{year}-{month:02d}", 'category': category, 'amount': round(amount, 2), 'count': count}
+            for (year, month, category), (amount, count) in sorted(totals.items())
+        ],
+        'aborted': aborted,
+        'elapsed': round(time.perf_counter() - started, 3)
+    }
@@ -0,0 +1,252 @@
+"""
+CredNest AI - Expense Rollups
+Spent and count per (user, granularity, bucket, category) for day, week and
+month buckets, kept in expense_rollups by atomic increments in the same
+transaction as the expense write. Chart ranges read a few hundred rollup
+rows by primary-key range instead of scanning expenses;
+rebuild_expense_rollups() recomputes everything from the raw rows.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+
+from database.models import db, Expense, ExpenseRollup
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# Most buckets one range request may return
+MAX_BUCKETS = 1200
+
+
+def bucket_of(day: date, granularity: str) -> date:
+    """Start of the bucket holding `day`: the day itself, its week's Monday or its month's 1st"""
+    if granularity == 'day':
+        return day
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    raise ValueError(f"Unknown granularity '{granularity}'")
+
+
+def next_bucket(bucket: date, granularity: str) -> date:
+    if granularity == 'day':
+        return bucket + timedelta(days=1)
+    if granularity == 'week':
+        return bucket + timedelta(days=7)
+    return date(bucket.year + bucket.month // 12, bucket.month % 12 + 1, 1)
+
+
+def pick_granularity(start: date, end: date) -> str:
+    """Finest granularity that keeps a chart readable"""
+    days = (end - start).days + 1
+    if days <= 92:
+        return 'day'
+    if days <= 731:
+        return 'week'
+    return 'month'
+
+
+def _expand(changes) -> dict:
+    """{(granularity, bucket, category): [amount, count]} for (day, category, amount, count) changes"""
+    deltas = defaultdict(lambda: [0.0, 0])
+    for day, category, amount, count in changes:
+        for granularity in GRANULARITIES:
+            delta = deltas[(granularity, bucket_of(day, granularity), category)]
+            delta[0] += amount
+            delta[1] += count
+    return {key: values for key, values in deltas.items() if values[0] or values[1]}
+
+
+def _add_rollup(user_id: int, granularity: str, bucket: date, category: str, amount: float, count: int):
+    """Add to one rollup row, creating it if needed"""
+    increments = {
+        ExpenseRollup.amount: ExpenseRollup.amount + amount,
+        ExpenseRollup.expense_count: ExpenseRollup.expense_count + count,
+        ExpenseRollup.updated_at: datetime.utcnow()
+    }
+    rollup_query = ExpenseRollup.query.filter_by(user_id=user_id, granularity=granularity,
+                                                 bucket=bucket, category=category)
+    if rollup_query.update(increments, synchronize_session=False):
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(ExpenseRollup(user_id=user_id, granularity=granularity, bucket=bucket,
+                                         category=category, amount=amount, expense_count=count))
+    except IntegrityError:
+        # Another request created the row first - add onto it
+        rollup_query.update(increments, synchronize_session=False)
+
+
+def add_expense_rollups(user_id: int, changes):
+    """
+    Apply expense changes to the day, week and month rollups
+
+    Runs in the caller's transaction and does not commit. Three statements
+    however many rows the changes touch: look up which exist, create the
+    missing ones, then one executemany increment.
+
+    Args:
+        user_id: Owner of the expenses
+        changes: Iterable of (date, category, amount, count) - negative to remove
+    """
+    deltas = _expand(changes)
+    if not deltas:
+        return
+
+    table = ExpenseRollup.__table__
+    now = datetime.utcnow()
+    buckets = [bucket for _, bucket, _ in deltas]
+    existing = set(db.session.query(ExpenseRollup.granularity, ExpenseRollup.bucket, ExpenseRollup.category).filter(
+        ExpenseRollup.user_id == user_id,
+        ExpenseRollup.granularity.in_({granularity for granularity, _, _ in deltas}),
+        ExpenseRollup.bucket >= min(buckets),
+        ExpenseRollup.bucket <= max(buckets)
+    ).all())
+
+    missing = [key for key in deltas if key not in existing]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert(), [
+                    {'user_id': user_id, 'granularity': granularity, 'bucket': bucket, 'category': category,
+                     'amount': 0.0, 'expense_count': 0, 'updated_at': now}
+                    for granularity, bucket, category in missing
+                ])
+        except IntegrityError:
+            # A concurrent writer created some of them - go row by row instead
+            for (granularity, bucket, category), (amount, count) in deltas.items():
+                _add_rollup(user_id, granularity, bucket, category, amount, count)
+            return
+
+    increment = table.update().where(
+        table.c.user_id == bindparam('b_user_id'),
+        table.c.granularity == bindparam('b_granularity'),
+        table.c.bucket == bindparam('b_bucket'),
+        table.c.category == bindparam('b_category')
+    ).values(
+        amount=table.c.amount + bindparam('b_amount'),
+        expense_count=table.c.expense_count + bindparam('b_count'),
+        updated_at=now
+    )
+    db.session.execute(increment, [
+        {'b_user_id': user_id, 'b_granularity': granularity, 'b_bucket': bucket, 'b_category': category,
+         'b_amount': amount, 'b_count': count}
+        for (granularity, bucket, category), (amount, count) in deltas.items()
+    ])
+
+
+def get_rollup_series(user_id: int, start: date, end: date, granularity: str = None, category: str = None) -> dict:
+    """
+    Zero-filled spending series for a date range from the rollups
+
+    Args:
+        user_id: Owner of the expenses
+        start: First day of the range
+        end: Last day of the range
+        granularity: 'day', 'week' or 'month' (picked from the range length when None)
+        category: Only this category
+
+    Returns:
+        Dict with the buckets, total series, per-category series and rows read
+
+    Raises:
+        ValueError: On an unknown granularity, a reversed range or too many buckets
+    """
+    if end < start:
+        raise ValueError('end must not be before start')
+    granularity = granularity or pick_granularity(start, end)
+    first = bucket_of(start, granularity)
+
+    buckets = []
+    bucket = first
+    while bucket <= end:
+        buckets.append(bucket)
+        if len(buckets) > MAX_BUCKETS:
+            raise ValueError(f"Range has more than {MAX_BUCKETS} {granularity} buckets - use a coarser granularity")
+        bucket = next_bucket(bucket, granularity)
+
+    query = db.session.query(ExpenseRollup.bucket, ExpenseRollup.category,
+                             ExpenseRollup.amount, ExpenseRollup.expense_count).filter(
+        ExpenseRollup.user_id == user_id,
+        ExpenseRollup.granularity == granularity,
+        ExpenseRollup.bucket >= first,
+        ExpenseRollup.bucket <= end
+    )
+    if category:
+        query = query.filter(ExpenseRollup.category == category)
+    rows = query.all()
+
+    position = {bucket: i for i, bucket in enumerate(buckets)}
+    amounts = [0.0] * len(buckets)
+    counts = [0] * len(buckets)
+    by_category = defaultdict(lambda: [0.0] * len(buckets))
+    for bucket, row_category, amount, count in rows:
+        if not count and not amount:
+            continue
+        i = position[bucket]
+        amounts[i] += amount
+        counts[i] += count
+        by_category[row_category][i] += amount
+
+    return {
+        'granularity': granularity,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'buckets': [bucket.isoformat() for bucket in buckets],
+        'series': [{'bucket': bucket.isoformat(), 'amount': round(amount, 2), 'count': count}
+                   for bucket, amount, count in zip(buckets, amounts, counts)],
+        'categories': {name: [round(amount, 2) for amount in values]
+                       for name, values in sorted(by_category.items(), key=lambda item: -sum(item[1]))},
+        'total': round(sum(amounts), 2),
+        'expense_count': sum(counts),
+        'rows_read': len(rows)
+    }
+
+
+def rebuild_expense_rollups(user_id: int = None, verbose: bool = False) -> int:
+    """
+    Recompute expense_rollups from the expenses table
+
+    Args:
+        user_id: Only rebuild this user's rollups (all users when None)
+
+    Returns:
+        Number of rollup rows written
+    """
+    daily = db.session.query(Expense.user_id, Expense.date, Expense.category,
+                             db.func.sum(Expense.amount), db.func.count(Expense.id))
+    if user_id is not None:
+        daily = daily.filter(Expense.user_id == user_id)
+    daily = daily.group_by(Expense.user_id, Expense.date, Expense.category)
+
+    # Week and month buckets are summed from the daily groups, not from raw rows again
+    per_user = defaultdict(list)
+    for uid, day, category, amount, count in daily:
+        per_user[uid].append((day, category, amount or 0.0, count))
+
+    now = datetime.utcnow()
+    rows = [{'user_id': uid, 'granularity': granularity, 'bucket': bucket, 'category': category,
+             'amount': amount, 'expense_count': count, 'updated_at': now}
+            for uid, changes in per_user.items()
+            for (granularity, bucket, category), (amount, count) in _expand(changes).items()]
+
+    try:
+        delete = ExpenseRollup.query
+        if user_id is not None:
+            delete = delete.filter_by(user_id=user_id)
+        delete.delete(synchronize_session=False)
+        if rows:
+            db.session.execute(ExpenseRollup.__table__.insert(), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if verbose:
+        print(f"   ✓ {len(rows)} rollup rows for {len(per_user)} users")
+    return len(rows)
@@ -111,14 +111,21 @@ class User(UserMixin, db.Model):
 class ChatHistory(db.Model):
     """AI chat conversation history"""
     __tablename__ = 'chat_history'
+    __table_args__ = (
+        # Session history: filter (user_id, session_id), newest first
+        db.Index('ix_chat_history_user_session_created', 'user_id', 'session_id', 'created_at'),
+        # All of a user's history, newest first
+        db.Index('ix_chat_history_user_created', 'user_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    session_id = db.Column(db.String(100), nullable=False, index=True)
+    session_id = db.Column(db.String(100), nullable=False)
     message = db.Column(db.Text, nullable=False)
     response = db.Column(db.Text, nullable=False)
     tool_used = db.Column(db.String(50))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    response_time = db.Column(db.Float)  # Response time in seconds
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
         return {
@@ -128,37 +135,102 @@ class ChatHistory(db.Model):
             'message': self.message,
             'response': self.response,
             'tool_used': self.tool_used,
+            'response_time': self.response_time,
             'created_at': format_timestamp(self.created_at)
         }
 
 
+class ChatSession(db.Model):
+    """Per-session metadata, kept in step with chat_history on every write"""
+    __tablename__ = 'chat_sessions'
+    __table_args__ = (db.Index('ix_chat_sessions_user_last_message', 'user_id', 'last_message_at'),)
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    session_id = db.Column(db.String(100), primary_key=True)
+    title = db.Column(db.String(100), nullable=False, default='New Conversation')
+    preview = db.Column(db.String(100), nullable=False, default='')
+    message_count = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.Integer, nullable=False, default=0)
+    completion_tokens = db.Column(db.Integer, nullable=False, default=0)
+    first_message_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_message_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'title': self.title,
+            'message_count': self.message_count,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'created_at': format_timestamp(self.first_message_at),
+            'last_message_at': format_timestamp(self.last_message_at),
+            'preview': self.preview
+        }
+
+
+class ChatSummary(db.Model):
+    """Rolling summary of a chat session's older turns"""
+    __tablename__ = 'chat_summaries'
+    __table_args__ = (db.UniqueConstraint('user_id', 'session_id', name='uq_chat_summary_session'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    session_id = db.Column(db.String(100), nullable=False)
+    summary = db.Column(db.Text, nullable=False, default='')
+    last_chat_id = db.Column(db.Integer, nullable=False, default=0)  # Newest ChatHistory.id folded in
+    turns_summarized = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'session_id': self.session_id,
+            'summary': self.summary,
+            'last_chat_id': self.last_chat_id,
+            'turns_summarized': self.turns_summarized,
+            'updated_at': format_timestamp(self.updated_at)
+        }
+
+
 class Budget(db.Model):
-    """Budget categories and limits"""
+    """Planned spend per category for a month"""
     __tablename__ = 'budgets'
+    __table_args__ = (db.Index('ix_budgets_user_month', 'user_id', 'month'),)
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # Format: YYYY-MM
     category = db.Column(db.String(100), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
-    period = db.Column(db.String(20), default='monthly')
-    start_date = db.Column(db.Date)
-    end_date = db.Column(db.Date)
+    planned_amount = db.Column(db.Float, nullable=False, default=0.0)
+    icon = db.Column(db.String(10), default='📦')
+    color = db.Column(db.String(7), default='#95A5A6')
+    notes = db.Column(db.Text)
+    is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     def to_dict(self):
+        # Spent amounts live in monthly_totals and are merged in by the budget views
         return {
             'id': self.id,
+            'month': self.month,
             'category': self.category,
-            'amount': self.amount,
-            'period': self.period,
-            'start_date': self.start_date.isoformat() if self.start_date else None,
-            'end_date': self.end_date.isoformat() if self.end_date else None
+            'planned_amount': self.planned_amount,
+            'icon': self.icon,
+            'color': self.color,
+            'notes': self.notes,
+            'is_active': self.is_active,
+            'created_at': format_timestamp(self.created_at),
+            'updated_at': format_timestamp(self.updated_at)
         }
 
 
 class Expense(db.Model):
     """Expense tracking"""
     __tablename__ = 'expenses'
+    __table_args__ = (
+        db.Index('ix_expenses_user_date', 'user_id', 'date'),
+        db.Index('ix_expenses_user_category_date', 'user_id', 'category', 'date'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -167,6 +239,11 @@ class Expense(db.Model):
     description = db.Column(db.Text)
     date = db.Column(db.Date, nullable=False)
     payment_method = db.Column(db.String(50))
+    location = db.Column(db.String(150))
+    tags = db.Column(db.String(255))  # Comma-separated tags
+    notes = db.Column(db.Text)
+    is_recurring = db.Column(db.Boolean, default=False)
+    recurring_frequency = db.Column(db.String(20))  # daily, weekly, monthly
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
@@ -176,13 +253,19 @@ class Expense(db.Model):
             'amount': self.amount,
             'description': self.description,
             'date': self.date.isoformat(),
-            'payment_method': self.payment_method
+            'payment_method': self.payment_method,
+            'location': self.location,
+            'tags': self.tags,
+            'notes': self.notes,
+            'is_recurring': self.is_recurring,
+            'recurring_frequency': self.recurring_frequency
         }
 
 
 class Income(db.Model):
     """Income tracking"""
     __tablename__ = 'incomes'
+    __table_args__ = (db.Index('ix_incomes_user_date', 'user_id', 'date'),)
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -204,6 +287,63 @@ class Income(db.Model):
         }
 
 
+class MonthlyTotal(db.Model):
+    """Materialized spent/planned/income per (user, month, kind, category), kept by atomic increments"""
+    __tablename__ = 'monthly_totals'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # Format: YYYY-MM
+    kind = db.Column(db.String(6), primary_key=True)  # 'spend' (expenses, budgets) or 'income'
+    category = db.Column(db.String(100), primary_key=True)  # Expense/budget category, or income source
+    spent = db.Column(db.Float, nullable=False, default=0.0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    planned = db.Column(db.Float, nullable=False, default=0.0)
+    income = db.Column(db.Float, nullable=False, default=0.0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'month': self.month,
+            'kind': self.kind,
+            'category': self.category,
+            'spent': round(self.spent, 2),
+            'expense_count': self.expense_count,
+            'planned': round(self.planned, 2),
+            'income': round(self.income, 2)
+        }
+
+
+class ExpenseRollup(db.Model):
+    """Spent per (user, granularity, bucket, category) for charts; bucket is the day, week's Monday or month's 1st"""
+    __tablename__ = 'expense_rollups'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    granularity = db.Column(db.String(5), primary_key=True)  # day, week or month
+    bucket = db.Column(db.Date, primary_key=True)
+    category = db.Column(db.String(100), primary_key=True)
+    amount = db.Column(db.Float, nullable=False, default=0.0)
+    expense_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'granularity': self.granularity,
+            'bucket': self.bucket.isoformat(),
+            'category': self.category,
+            'amount': round(self.amount, 2),
+            'expense_count': self.expense_count
+        }
+
+
+class DataVersion(db.Model):
+    """Per-user write counters that version cached reports; bumped in the same transaction as the write"""
+    __tablename__ = 'data_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    expenses = db.Column(db.Integer, nullable=False, default=0)  # Every expense add, edit, delete or import
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
 class Feedback(db.Model):
     """User feedback and suggestions"""
     __tablename__ = 'feedback'
@@ -0,0 +1,204 @@
+"""
+CredNest AI - Materialized Monthly Totals
+Spent, planned and income per (user, month, kind, category) in
+monthly_totals. Spend rows (kind 'spend') are keyed by expense/budget
+category and income rows (kind 'income') by income source, so a "Salary"
+source never shows up among the spending categories. Every expense,
+budget and income write adds its delta with an atomic
+UPDATE ... SET x = x + :delta in the caller's transaction, so concurrent
+writes never lose an update and nothing is read back first. The budget
+views read a month with one primary-key range scan; rebuild_monthly_totals()
+recomputes everything from the raw rows.
+"""
+
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+
+from database.models import db, Budget, Expense, Income, MonthlyTotal
+
+SPEND = 'spend'
+INCOME = 'income'
+
+
+def month_of(day) -> str:
+    """'YYYY-MM' for a date"""
+    return f"{day.year}-{day.month:02d}"
+
+
+def add_to_month(user_id: int, month: str, category: str, spent: float = 0.0, expenses: int = 0,
+                 planned: float = 0.0, income: float = 0.0):
+    """
+    Add deltas to one (user, month, kind, category) total
+
+    Income deltas go to the income row for `category` (the source), the
+    others to its spend row. Runs in the caller's transaction and does not
+    commit, so the total moves together with the row that caused it.
+    """
+    if not (spent or expenses or planned or income):
+        return
+    if income and (spent or expenses or planned):
+        raise ValueError('Income and spend deltas belong to different totals')
+    kind = INCOME if income else SPEND
+
+    increments = {
+        MonthlyTotal.spent: MonthlyTotal.spent + spent,
+        MonthlyTotal.expense_count: MonthlyTotal.expense_count + expenses,
+        MonthlyTotal.planned: MonthlyTotal.planned + planned,
+        MonthlyTotal.income: MonthlyTotal.income + income,
+        MonthlyTotal.updated_at: datetime.utcnow()
+    }
+    total_query = MonthlyTotal.query.filter_by(user_id=user_id, month=month, kind=kind, category=category)
+    if total_query.update(increments, synchronize_session=False):
+        return
+
+    try:
+        with db.session.begin_nested():
+            db.session.add(MonthlyTotal(
+                user_id=user_id,
+                month=month,
+                kind=kind,
+                category=category,
+                spent=spent,
+                expense_count=expenses,
+                planned=planned,
+                income=income
+            ))
+    except IntegrityError:
+        # Another request created the row first - add onto it
+        total_query.update(increments, synchronize_session=False)
+
+
+def add_expense_totals(user_id: int, totals: dict):
+    """
+    Apply {(month, category): (amount, count)} from a batch of expenses
+
+    Three statements however many totals the batch touches: look up which
+    rows exist, create the missing ones, then one executemany increment.
+    """
+    if not totals:
+        return
+
+    table = MonthlyTotal.__table__
+    now = datetime.utcnow()
+    existing = set(db.session.query(MonthlyTotal.month, MonthlyTotal.category).filter(
+        MonthlyTotal.user_id == user_id,
+        MonthlyTotal.month.in_({month for month, _ in totals}),
+        MonthlyTotal.kind == SPEND
+    ).all())
+
+    missing = [key for key in totals if key not in existing]
+    if missing:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(table.insert(), [
+                    {'user_id': user_id, 'month': month, 'kind': SPEND, 'category': category, 'spent': 0.0,
+                     'expense_count': 0, 'planned': 0.0, 'income': 0.0, 'updated_at': now}
+                    for month, category in missing
+                ])
+        except IntegrityError:
+            # A concurrent writer created some of them - go row by row instead
+            for (month, category), (amount, count) in totals.items():
+                add_to_month(user_id, month, category, spent=amount, expenses=count)
+            return
+
+    increment = table.update().where(
+        table.c.user_id == bindparam('b_user_id'),
+        table.c.month == bindparam('b_month'),
+        table.c.kind == SPEND,
+        table.c.category == bindparam('b_category')
+    ).values(
+        spent=table.c.spent + bindparam('b_spent'),
+        expense_count=table.c.expense_count + bindparam('b_count'),
+        updated_at=now
+    )
+    db.session.execute(increment, [
+        {'b_user_id': user_id, 'b_month': month, 'b_category': category, 'b_spent': amount, 'b_count': count}
+        for (month, category), (amount, count) in totals.items()
+    ])
+
+
+def get_month_totals(user_id: int, month: str) -> dict:
+    """
+    All totals for a month in one indexed read
+
+    Returns:
+        Dict with total_spent, total_planned, total_income, expense_count,
+        'categories' (spend rows keyed by category) and 'income_sources'
+        (income rows keyed by source)
+    """
+    rows = MonthlyTotal.query.filter_by(user_id=user_id, month=month).all()
+    spend = [r for r in rows if r.kind == SPEND]
+    income = [r for r in rows if r.kind == INCOME]
+    return {
+        'total_spent': round(sum(r.spent for r in spend), 2),
+        'total_planned': round(sum(r.planned for r in spend), 2),
+        'total_income': round(sum(r.income for r in income), 2),
+        'expense_count': sum(r.expense_count for r in spend),
+        'categories': {r.category: r for r in spend},
+        'income_sources': {r.category: r for r in income}
+    }
+
+
+def _month_column(column):
+    """SQL expression for 'YYYY-MM' of a date column"""
+    if db.engine.dialect.name == 'mysql':
+        return db.func.date_format(column, '%Y-%m')
+    return db.func.strftime('%Y-%m', column)
+
+
+def rebuild_monthly_totals(user_id: int = None, verbose: bool = False) -> int:
+    """
+    Recompute monthly_totals from expenses, active budgets and incomes
+
+    Args:
+        user_id: Only rebuild this user's totals (all users when None)
+
+    Returns:
+        Number of total rows written
+    """
+    totals = defaultdict(lambda: {'spent': 0.0, 'expense_count': 0, 'planned': 0.0, 'income': 0.0})
+
+    def grouped(model, month, category, *aggregates, where=()):
+        query = db.session.query(model.user_id, month.label('month'), category.label('category'), *aggregates)\
+            .filter(*where)
+        if user_id is not None:
+            query = query.filter(model.user_id == user_id)
+        return query.group_by(model.user_id, month, category).all()
+
+    expense_month = _month_column(Expense.date)
+    for uid, month, category, spent, count in grouped(
+            Expense, expense_month, Expense.category, db.func.sum(Expense.amount), db.func.count(Expense.id)):
+        totals[(uid, month, SPEND, category)].update(spent=spent or 0.0, expense_count=count)
+
+    for uid, month, category, planned in grouped(
+            Budget, Budget.month, Budget.category, db.func.sum(Budget.planned_amount),
+            where=(Budget.is_active.is_(True),)):
+        totals[(uid, month, SPEND, category)]['planned'] = planned or 0.0
+
+    income_month = _month_column(Income.date)
+    for uid, month, source, amount in grouped(
+            Income, income_month, Income.source, db.func.sum(Income.amount)):
+        totals[(uid, month, INCOME, source)]['income'] = amount or 0.0
+
+    now = datetime.utcnow()
+    rows = [{'user_id': uid, 'month': month, 'kind': kind, 'category': category, 'updated_at': now, **values}
+            for (uid, month, kind, category), values in totals.items()]
+
+    try:
+        delete = MonthlyTotal.query
+        if user_id is not None:
+            delete = delete.filter_by(user_id=user_id)
+        delete.delete(synchronize_session=False)
+        if rows:
+            db.session.execute(MonthlyTotal.__table__.insert(), rows)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    if verbose:
+        print(f"   ✓ {len(rows)} monthly totals for {len({r['user_id'] for r in rows})} users")
+    return len(rows)
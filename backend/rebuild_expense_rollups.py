@@ -0,0 +1,42 @@
+"""
+Rebuild the expense_rollups chart table from raw expenses
+Creates the table on older databases. Safe to re-run.
+
+Usage:
+    python rebuild_expense_rollups.py [--user-id 42]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+
+from database.models import db, ExpenseRollup
+from database.expense_rollups import rebuild_expense_rollups
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild day/week/month expense rollups')
+    parser.add_argument('--user-id', type=int, help='Only rebuild this user')
+    args = parser.parse_args()
+
+    from app import app
+
+    print("=" * 70)
+    print("📈 REBUILDING EXPENSE ROLLUPS")
+    print("=" * 70)
+
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[ExpenseRollup.__table__])
+
+        print("\n🧮 Aggregating expenses by day, week and month...")
+        written = rebuild_expense_rollups(args.user_id, verbose=True)
+
+    print("\n" + "=" * 70)
+    print(f"✅ REBUILD COMPLETE - {written} rollup rows")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Rebuild the monthly_totals table from raw expenses, budgets and incomes
+Also brings older databases up to the current expenses/budgets/totals schema.
+Safe to re-run.
+
+Usage:
+    python rebuild_monthly_totals.py [--user-id 42]
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(__file__))
+
+import argparse
+
+from sqlalchemy import inspect, text
+
+from database.models import db, Budget, Expense
+from database.monthly_totals import rebuild_monthly_totals
+
+
+def migrate_finance_schema(engine):
+    """Add expense columns the API writes, and move a pre-month budgets table aside"""
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+
+    if 'budgets' in tables:
+        columns = {c['name'] for c in inspector.get_columns('budgets')}
+        if 'month' not in columns:
+            # Old date-range budgets can't be mapped onto months; keep them for reference
+            with engine.begin() as conn:
+                conn.execute(text("ALTER TABLE budgets RENAME TO budgets_legacy"))
+            print("   ✓ Renamed old budgets table to budgets_legacy")
+
+    if 'expenses' in tables:
+        existing = {c['name'] for c in inspector.get_columns('expenses')}
+        for column in Expense.__table__.columns:
+            if column.name in existing:
+                continue
+            ddl = column.type.compile(dialect=engine.dialect)
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE expenses ADD COLUMN {column.name} {ddl}"))
+            print(f"   ✓ Added expenses.{column.name}")
+
+    if 'monthly_totals' in tables:
+        columns = {c['name'] for c in inspector.get_columns('monthly_totals')}
+        if 'kind' not in columns:
+            # Derived data keyed without kind - drop it, the rebuild below refills it
+            with engine.begin() as conn:
+                conn.execute(text("DROP TABLE monthly_totals"))
+            print("   ✓ Dropped monthly_totals to re-key it by kind (spend / income)")
+
+    db.metadata.create_all(engine, tables=[Budget.__table__, db.metadata.tables['monthly_totals']])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild materialized monthly totals')
+    parser.add_argument('--user-id', type=int, help='Only rebuild this user')
+    args = parser.parse_args()
+
+    from app import app
+
+    print("=" * 70)
+    print("📊 REBUILDING MONTHLY TOTALS")
+    print("=" * 70)
+
+    with app.app_context():
+        print("\n🔧 Checking schema...")
+        migrate_finance_schema(db.engine)
+
+        print("\n🧮 Recomputing from expenses, budgets and incomes...")
+        written = rebuild_monthly_totals(args.user_id, verbose=True)
+
+    print("\n" + "=" * 70)
+    print(f"✅ REBUILD COMPLETE - {written} monthly totals")
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
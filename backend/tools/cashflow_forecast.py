@@ -0,0 +1,270 @@
+"""
+Cash Flow Forecast Tool
+Projects a user's month-by-month balance: recurring expenses and incomes
+are expanded into dated occurrences lazily (one generator per rule, merged
+in date order) and combined with the average non-recurring spending and
+income of recent months.
+"""
+
+import heapq
+import re
+from collections import namedtuple
+from datetime import date, timedelta
+from itertools import count, islice
+
+from tools.emi_engine import add_months
+
+MAX_MONTHS = 120
+DEFAULT_HISTORY_MONTHS = 6
+UPCOMING = 10
+STALE_PERIODS = 2
+
+# Step per frequency: ('days', n) or ('months', n). Unknown values are treated as monthly
+FREQUENCIES = {
+    'daily': ('days', 1),
+    'weekly': ('days', 7),
+    'biweekly': ('days', 14),
+    'fortnightly': ('days', 14),
+    'monthly': ('months', 1),
+    'quarterly': ('months', 3),
+    'half-yearly': ('months', 6),
+    'yearly': ('months', 12),
+    'annually': ('months', 12),
+}
+
+RecurringRule = namedtuple('RecurringRule', 'kind label category amount anchor frequency')
+
+_SPACES = re.compile(r'\s+')
+
+
+def _month_index(day: date) -> int:
+    return day.year * 12 + day.month - 1
+
+
+def occurrences(anchor: date, frequency: str, start: date, end: date):
+    """
+    Dates a rule falls due in [start, end], generated one at a time
+
+    Jumps straight to the first occurrence on or after `start`, so a daily
+    rule anchored years ago costs nothing for the past.
+    """
+    unit, step = FREQUENCIES.get((frequency or 'monthly').lower(), FREQUENCIES['monthly'])
+
+    if unit == 'days':
+        skip = max(0, -(-(start - anchor).days // step))
+        day = anchor + timedelta(days=skip * step)
+        while day <= end:
+            yield day
+            day += timedelta(days=step)
+        return
+
+    n = max(0, (_month_index(start) - _month_index(anchor)) // step)
+    day = add_months(anchor, n * step)
+    while day <= end:
+        if day >= start:
+            yield day
+        n += 1
+        day = add_months(anchor, n * step)
+
+
+def cash_flow_stream(rules, start: date, end: date):
+    """
+    All recurring cash flows between start and end in date order
+
+    Yields:
+        (date, signed amount, rule) - income positive, expenses negative
+    """
+    tie = count()  # Keeps heap entries comparable without comparing rules
+
+    def expand(rule):
+        sign = 1 if rule.kind == 'income' else -1
+        for day in occurrences(rule.anchor, rule.frequency, start, end):
+            yield day, next(tie), sign * rule.amount, rule
+
+    for day, _, amount, rule in heapq.merge(*(expand(rule) for rule in rules)):
+        yield day, amount, rule
+
+
+def _is_stale(rule: RecurringRule, today: date) -> bool:
+    """True when the rule's latest entry is more than STALE_PERIODS periods before today"""
+    unit, step = FREQUENCIES.get(rule.frequency, FREQUENCIES['monthly'])
+    cutoff = add_months(rule.anchor, STALE_PERIODS * (step if unit == 'months' else 1))
+    if unit == 'days':
+        # Daily and weekly habits are usually logged once, so they get at least the monthly grace
+        cutoff = max(cutoff, rule.anchor + timedelta(days=STALE_PERIODS * step))
+    return cutoff < today
+
+
+def load_rules(user_id: int, today: date = None) -> list:
+    """
+    Recurring expenses and incomes as rules
+
+    A bill entered every month with is_recurring set is one rule, not one
+    per entry: rows are grouped by (category or source, description,
+    frequency) and the latest row gives the amount and the anchor date.
+
+    A rule whose latest entry is more than STALE_PERIODS periods before
+    `today` (and at least STALE_PERIODS months for daily and weekly rules)
+    is treated as ended - a cancelled subscription, a paid-off loan - and
+    left out, so old bills aren't projected for years.
+    """
+    from database.models import db, Expense, Income
+
+    latest = {}
+    expenses = db.session.query(Expense.category, Expense.description, Expense.amount,
+                                Expense.date, Expense.recurring_frequency)\
+        .filter(Expense.user_id == user_id, Expense.is_recurring.is_(True))
+    for category, description, amount, day, frequency in expenses:
+        frequency = (frequency or 'monthly').lower()
+        key = ('expense', category, _SPACES.sub(' ', (description or '').lower()).strip(), frequency)
+        if key not in latest or day >= latest[key].anchor:
+            latest[key] = RecurringRule('expense', description or category, category, amount, day, frequency)
+
+    incomes = db.session.query(Income.source, Income.description, Income.amount, Income.date)\
+        .filter(Income.user_id == user_id, Income.recurring.is_(True))
+    for source, description, amount, day in incomes:
+        key = ('income', source, _SPACES.sub(' ', (description or '').lower()).strip(), 'monthly')
+        if key not in latest or day >= latest[key].anchor:
+            latest[key] = RecurringRule('income', description or source, source, amount, day, 'monthly')
+
+    today = today or date.today()
+    return [rule for rule in latest.values() if not _is_stale(rule, today)]
+
+
+def historical_averages(user_id: int, today: date, history_months: int = DEFAULT_HISTORY_MONTHS) -> dict:
+    """
+    Average monthly non-recurring spending (per category) and income
+
+    Uses the last `history_months` complete months, or fewer if the user's
+    records start later.
+    """
+    from database.models import db, Expense, Income
+
+    window_end = today.replace(day=1)
+    window_start = add_months(window_end, -history_months)
+
+    spending = db.session.query(Expense.category, db.func.sum(Expense.amount), db.func.min(Expense.date))\
+        .filter(Expense.user_id == user_id, Expense.date >= window_start, Expense.date < window_end,
+                db.or_(Expense.is_recurring.is_(False), Expense.is_recurring.is_(None)))\
+        .group_by(Expense.category).all()
+    income, income_first = db.session.query(db.func.sum(Income.amount), db.func.min(Income.date))\
+        .filter(Income.user_id == user_id, Income.date >= window_start, Income.date < window_end,
+                db.or_(Income.recurring.is_(False), Income.recurring.is_(None))).one()
+
+    firsts = [first for _, _, first in spending if first] + ([income_first] if income_first else [])
+    months = _month_index(window_end) - _month_index(min(firsts)) if firsts else history_months
+    months = max(1, min(history_months, months))
+
+    by_category = {category: (total or 0.0) / months for category, total, _ in spending}
+    return {
+        'months': months,
+        'spending': sum(by_category.values()),
+        'spending_by_category': by_category,
+        'income': (income or 0.0) / months
+    }
+
+
+def project(rules: list, averages: dict, start: date, months: int, starting_balance: float = 0.0) -> list:
+    """
+    Month-by-month projection from rules and historical averages
+
+    Args:
+        rules: RecurringRule list
+        averages: historical_averages() result
+        start: First projected month (any day in it)
+        months: Number of months
+        starting_balance: Balance before the first month
+
+    Returns:
+        List of per-month dicts with income, expenses and running balance
+    """
+    first = start.replace(day=1)
+    end = add_months(first, months) - timedelta(days=1)
+    base = _month_index(first)
+
+    # Monthly sums don't need date order, so each rule's generator is drained on its own
+    recurring_income = [0.0] * months
+    recurring_expenses = [0.0] * months
+    for rule in rules:
+        totals = recurring_income if rule.kind == 'income' else recurring_expenses
+        for day in occurrences(rule.anchor, rule.frequency, first, end):
+            totals[(day.year * 12 + day.month - 1) - base] += rule.amount
+
+    variable_income = averages['income']
+    variable_expenses = averages['spending']
+    balance = starting_balance
+    projection = []
+    for i in range(months):
+        income = recurring_income[i] + variable_income
+        expenses = recurring_expenses[i] + variable_expenses
+        balance += income - expenses
+        month = add_months(first, i)
+        projection.append({
+            'month': f"{month.year}-{month.month:02d}",
+            'income': round(income, 2),
+            'expenses': round(expenses, 2),
+            'recurring_income': round(recurring_income[i], 2),
+            'recurring_expenses': round(recurring_expenses[i], 2),
+            'variable_income': round(variable_income, 2),
+            'variable_expenses': round(variable_expenses, 2),
+            'net': round(income - expenses, 2),
+            'balance': round(balance, 2)
+        })
+    return projection
+
+
+def forecast_cashflow(user_id: int, months: int = 12, starting_balance: float = 0.0,
+                      history_months: int = DEFAULT_HISTORY_MONTHS, today: date = None) -> dict:
+    """
+    Project a user's cash flow from next month on
+
+    Args:
+        user_id: User to forecast
+        months: Months to project (up to 120)
+        starting_balance: Current balance to start from
+        history_months: Complete past months averaged for non-recurring flows
+        today: Reference date (defaults to today)
+
+    Returns:
+        Dictionary with the rules used, the averages and the monthly projection
+    """
+    months = max(1, min(months, MAX_MONTHS))
+    today = today or date.today()
+
+    rules = load_rules(user_id, today)
+    averages = historical_averages(user_id, today, history_months)
+    projection = project(rules, averages, add_months(today.replace(day=1), 1), months, starting_balance)
+
+    # Only the first few flows are generated from the ordered stream
+    upcoming = islice(cash_flow_stream(rules, today + timedelta(days=1), today + timedelta(days=366)), UPCOMING)
+
+    lowest = min(projection, key=lambda month: month['balance'])
+    return {
+        'months': months,
+        'starting_balance': round(starting_balance, 2),
+        'ending_balance': projection[-1]['balance'],
+        'lowest_balance': {'month': lowest['month'], 'balance': lowest['balance']},
+        'first_negative_month': next((m['month'] for m in projection if m['balance'] < 0), None),
+        'recurring': [{
+            'type': rule.kind,
+            'label': rule.label,
+            'category': rule.category,
+            'amount': round(rule.amount, 2),
+            'frequency': rule.frequency,
+            'last_date': rule.anchor.isoformat()
+        } for rule in sorted(rules, key=lambda r: (r.kind, -r.amount))],
+        'upcoming': [{
+            'date': day.isoformat(),
+            'amount': round(amount, 2),
+            'label': rule.label,
+            'type': rule.kind
+        } for day, amount, rule in upcoming],
+        'averages': {
+            'history_months': averages['months'],
+            'monthly_spending': round(averages['spending'], 2),
+            'monthly_income': round(averages['income'], 2),
+            'spending_by_category': {category: round(amount, 2) for category, amount in
+                                     sorted(averages['spending_by_category'].items(), key=lambda item: -item[1])}
+        },
+        'projection': projection
+    }
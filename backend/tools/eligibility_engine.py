@@ -0,0 +1,238 @@
+"""
+Loan Eligibility Engine
+Evaluates one applicant against every bank at once. The bank table is held
+in memory as a snapshot of NumPy columns (rates per product, minimum CIBIL
+score, loan limits, maximum tenure), so an evaluation is a handful of array
+operations: the exact EMI at each bank's rate, and the largest affordable
+loan from the EMI formula solved for the principal,
+P = EMI x ((1 + r)^n - 1) / (r (1 + r)^n).
+"""
+
+import threading
+import time
+
+import numpy as np
+
+PRODUCTS = ('home', 'personal', 'car', 'education', 'business')
+
+# Bank has no business-loan column; business loans are priced off the personal loan rate
+RATE_COLUMNS = {
+    'home': 'home_loan_rate',
+    'personal': 'personal_loan_rate',
+    'car': 'car_loan_rate',
+    'education': 'education_loan_rate',
+    'business': 'personal_loan_rate',
+}
+
+# Longest tenure offered per product, further capped by each bank's max_tenure_years
+PRODUCT_MAX_TENURE_YEARS = {'home': 30, 'personal': 5, 'car': 7, 'education': 15, 'business': 5}
+
+# Used when the bank table is empty or unavailable (business follows personal, as above)
+TYPICAL_RATES = {'home': 8.5, 'personal': 11.0, 'car': 9.0, 'education': 9.5}
+
+# All EMIs together may take at most this share of monthly income (FOIR)
+MAX_EMI_SHARE = 0.5
+
+# Banks without min_cibil_score get the general minimum
+DEFAULT_MIN_CIBIL = 600
+
+SNAPSHOT_TTL = 300  # Seconds before the bank table is read again
+
+
+class BankSnapshot:
+    """The bank table as columns: one row per bank, rates as (banks x products)"""
+
+    __slots__ = ('ids', 'names', 'rates', 'min_cibil', 'min_loan', 'max_loan', 'max_tenure_years',
+                 'processing_fee', 'rating', 'loaded_at')
+
+    def __init__(self, ids, names, rates, min_cibil, min_loan, max_loan, max_tenure_years, processing_fee, rating):
+        self.ids = ids
+        self.names = names
+        self.rates = rates
+        self.min_cibil = min_cibil
+        self.min_loan = min_loan
+        self.max_loan = max_loan
+        self.max_tenure_years = max_tenure_years
+        self.processing_fee = processing_fee
+        self.rating = rating
+        self.loaded_at = time.monotonic()
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Args:
+            rows: (id, name, home, personal, car, education rate, min_cibil_score,
+                min_loan_amount, max_loan_amount, max_tenure_years, processing_fee, rating)
+        """
+        columns = list(zip(*rows)) if rows else [()] * 12
+
+        def floats(values, missing):
+            return np.array([missing if value is None else value for value in values], dtype=np.float64)
+
+        by_column = {
+            'home_loan_rate': floats(columns[2], np.nan),
+            'personal_loan_rate': floats(columns[3], np.nan),
+            'car_loan_rate': floats(columns[4], np.nan),
+            'education_loan_rate': floats(columns[5], np.nan),
+        }
+        rates = np.column_stack([by_column[RATE_COLUMNS[product]] for product in PRODUCTS]) \
+            if rows else np.empty((0, len(PRODUCTS)))
+        return cls(
+            ids=np.array(columns[0], dtype=np.int64),
+            names=list(columns[1]),
+            rates=rates,
+            min_cibil=floats(columns[6], DEFAULT_MIN_CIBIL),
+            min_loan=floats(columns[7], 0.0),
+            max_loan=floats(columns[8], np.inf),
+            max_tenure_years=floats(columns[9], max(PRODUCT_MAX_TENURE_YEARS.values())),
+            processing_fee=floats(columns[10], 0.0),
+            rating=floats(columns[11], 0.0)
+        )
+
+    @classmethod
+    def load(cls):
+        """Read the whole bank table (one query)"""
+        from database.models import db, Bank
+
+        rows = db.session.execute(db.select(
+            Bank.id, Bank.name, Bank.home_loan_rate, Bank.personal_loan_rate, Bank.car_loan_rate,
+            Bank.education_loan_rate, Bank.min_cibil_score, Bank.min_loan_amount, Bank.max_loan_amount,
+            Bank.max_tenure_years, Bank.processing_fee, Bank.rating
+        ).order_by(Bank.id)).all()
+        return cls.from_rows(rows)
+
+    @classmethod
+    def typical(cls):
+        """A single 'typical market rate' row for when no bank data is available"""
+        return cls.from_rows([(0, 'Typical market rate', TYPICAL_RATES['home'], TYPICAL_RATES['personal'],
+                               TYPICAL_RATES['car'], TYPICAL_RATES['education'], None, None, None, None, None, None)])
+
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+def bank_snapshot(max_age: float = SNAPSHOT_TTL) -> BankSnapshot:
+    """
+    The shared in-memory bank table, reloaded when older than max_age
+
+    Needs an app context for the (re)load; an empty table gives an empty
+    snapshot.
+    """
+    global _snapshot
+    snapshot = _snapshot
+    if snapshot is not None and time.monotonic() - snapshot.loaded_at < max_age:
+        return snapshot
+    with _snapshot_lock:
+        if _snapshot is None or time.monotonic() - _snapshot.loaded_at >= max_age:
+            _snapshot = BankSnapshot.load()
+        return _snapshot
+
+
+def invalidate_bank_snapshot():
+    """Drop the snapshot so the next evaluation reads the bank table again"""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def _emi_and_capacity(monthly_rate: np.ndarray, tenure: np.ndarray, principal: float, max_emi: float):
+    """EMI for `principal` and the principal `max_emi` can repay, per bank"""
+    growth = np.power(1 + monthly_rate, tenure)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = np.where(monthly_rate > 0, (growth - 1) / (monthly_rate * growth), tenure)
+    return principal / annuity, max_emi * annuity
+
+
+def evaluate(snapshot: BankSnapshot, monthly_income: float, loan_amount: float, loan_type: str,
+             credit_score: int = None, existing_emi: float = 0.0, tenure_months: int = None) -> dict:
+    """
+    Exact EMI, maximum eligible amount and eligibility at every bank
+
+    Args:
+        snapshot: BankSnapshot to evaluate against
+        monthly_income: Monthly income in INR
+        loan_amount: Requested amount in INR
+        loan_type: One of PRODUCTS (unknown types are treated as personal)
+        credit_score: CIBIL score; None skips the score check
+        existing_emi: EMIs already being paid per month
+        tenure_months: Preferred tenure, capped per bank (longest allowed when None)
+
+    Returns:
+        Dictionary of per-bank arrays (rate, tenure, emi, max_amount, the
+        individual checks and eligible) plus `order`, the bank indices
+        ranked best first: eligible banks by rate, then processing fee and
+        rating; the rest by how much they would lend. (Total cost isn't
+        used to rank - it mostly rewards banks with shorter tenure caps.)
+    """
+    product = loan_type if loan_type in PRODUCTS else 'personal'
+    rate = snapshot.rates[:, PRODUCTS.index(product)]
+
+    longest = np.minimum(snapshot.max_tenure_years, PRODUCT_MAX_TENURE_YEARS[product]) * 12
+    tenure = np.minimum(longest, tenure_months) if tenure_months else longest
+    max_emi = max(monthly_income * MAX_EMI_SHARE - existing_emi, 0.0)
+
+    offered = ~np.isnan(rate) & (tenure > 0)
+    monthly_rate = np.where(offered, rate, 0.0) / 12 / 100
+    tenure = np.where(offered, tenure, 1)
+    emi, affordable = _emi_and_capacity(monthly_rate, tenure, loan_amount, max_emi)
+
+    score_ok = np.full(len(snapshot), True) if credit_score is None else credit_score >= snapshot.min_cibil
+    amount_ok = (loan_amount >= snapshot.min_loan) & (loan_amount <= snapshot.max_loan)
+    emi_ok = emi <= max_emi
+    max_amount = np.where(offered & score_ok, np.minimum(affordable, snapshot.max_loan), 0.0)
+    eligible = offered & score_ok & amount_ok & emi_ok
+
+    total_interest = emi * tenure - loan_amount
+    fee = loan_amount * snapshot.processing_fee / 100
+    total_cost = total_interest + fee
+
+    # np.lexsort sorts by the last key first
+    order = np.lexsort((-snapshot.rating, fee, np.where(eligible, rate, -max_amount), ~eligible, ~offered))
+    return {
+        'product': product,
+        'rate': rate,
+        'tenure': tenure,
+        'emi': emi,
+        'max_emi': max_emi,
+        'max_amount': max_amount,
+        'total_interest': total_interest,
+        'processing_fee': fee,
+        'total_cost': total_cost,
+        'offered': offered,
+        'score_ok': score_ok,
+        'amount_ok': amount_ok,
+        'emi_ok': emi_ok,
+        'eligible': eligible,
+        'order': order[offered[order]]
+    }
+
+
+def ranked_offers(snapshot: BankSnapshot, result: dict, limit: int = None) -> list:
+    """JSON-ready offers in rank order, with the reasons a bank would decline"""
+    offers = []
+    for rank, i in enumerate(result['order'][:limit].tolist(), start=1):
+        declines = []
+        if not result['score_ok'][i]:
+            declines.append(f"Needs CIBIL {snapshot.min_cibil[i]:.0f}+")
+        if not result['amount_ok'][i]:
+            declines.append(f"Lends ₹{snapshot.min_loan[i]:,.0f} to ₹{snapshot.max_loan[i]:,.0f}")
+        if not result['emi_ok'][i]:
+            declines.append(f"EMI above {MAX_EMI_SHARE:.0%} of income")
+        offers.append({
+            'rank': rank,
+            'bank_id': int(snapshot.ids[i]),
+            'bank_name': snapshot.names[i],
+            'interest_rate': float(result['rate'][i]),
+            'tenure_months': int(result['tenure'][i]),
+            'emi': round(float(result['emi'][i]), 2),
+            'total_interest': round(float(result['total_interest'][i]), 2),
+            'processing_fee': round(float(result['processing_fee'][i]), 2),
+            'max_eligible_amount': round(float(result['max_amount'][i]), 2),
+            'eligible': bool(result['eligible'][i]),
+            'declines': declines
+        })
+    return offers
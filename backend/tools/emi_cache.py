@@ -0,0 +1,121 @@
+"""
+EMI Cache
+Shared memo for EMI and amortization results. The calculator, the AI tool
+path and eligibility checks keep asking for the same bank rates x common
+amounts x standard tenures, so results are keyed on the inputs quantized
+to paisa, basis points and whole months and kept in one bounded,
+thread-safe LRU.
+"""
+
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+def quantize(principal: float, rate: float, tenure: float) -> tuple:
+    """(paise, basis points, months) - the cache key of a loan"""
+    return int(round(principal * 100)), int(round(rate * 100)), int(round(tenure))
+
+
+def emi_formula(principal: float, rate: float, tenure: int) -> tuple:
+    """(emi, total amount, total interest) from P x r x (1 + r)^n / ((1 + r)^n - 1)"""
+    monthly_rate = rate / 12 / 100
+    if monthly_rate == 0:
+        emi = principal / tenure
+    else:
+        growth = (1 + monthly_rate) ** tenure
+        emi = principal * monthly_rate * growth / (growth - 1)
+    total_amount = emi * tenure
+    return emi, total_amount, total_amount - principal
+
+
+class EMICache:
+    """Thread-safe bounded LRU of loan computations, with hit/miss counters per kind of result"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Results kept (all kinds together) before LRU eviction
+        """
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # (kind, paise, basis points, months) -> result
+        self._lock = threading.Lock()
+
+        self.hits = {}
+        self.misses = {}
+        self.evictions = 0
+
+    def get_or_compute(self, kind: str, principal: float, rate: float, tenure: float, compute):
+        """
+        Cached compute(principal, rate, tenure) for the quantized inputs
+
+        compute() receives the quantized values (rupees, percent, months)
+        and runs outside the lock; two threads missing the same key just
+        compute it twice. Results are shared between callers, so they
+        must be immutable (tuples, numbers).
+        """
+        key = (kind,) + quantize(principal, rate, tenure)
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+                return result
+            self.misses[kind] = self.misses.get(kind, 0) + 1
+
+        result = compute(key[1] / 100, key[2] / 100, key[3])
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return result
+
+    def resize(self, max_entries: int):
+        with self._lock:
+            self.max_entries = max_entries
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Entries, evictions and hit ratios, overall and per kind of result"""
+        with self._lock:
+            kinds = {}
+            for kind in sorted(set(self.hits) | set(self.misses)):
+                hits, misses = self.hits.get(kind, 0), self.misses.get(kind, 0)
+                kinds[kind] = {'hits': hits, 'misses': misses, 'hit_ratio': round(hits / (hits + misses), 4)}
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': hits,
+                'misses': misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                'by_kind': kinds
+            }
+
+
+# One cache for the whole process, shared by every EMI path
+emi_cache = EMICache()
+
+
+def cached_emi(principal: float, rate: float, tenure: float) -> tuple:
+    """
+    (emi, total amount, total interest), memoized
+
+    Args:
+        principal: Loan amount in INR (quantized to paisa)
+        rate: Annual interest rate in percent (quantized to basis points)
+        tenure: Tenure in months (rounded to whole months)
+    """
+    return emi_cache.get_or_compute('emi', principal, rate, tenure, emi_formula)
@@ -2,35 +2,17 @@
 EMI Calculator Tool
 """
 
-def calculate_emi(loan_amount: float, interest_rate: float, tenure_months: int) -> dict:
-    """
-    Calculate EMI using standard formula
-    
-    Args:
-        loan_amount: Principal amount in INR
-        interest_rate: Annual interest rate (e.g., 10.5 for 10.5%)
-        tenure_months: Loan tenure in months
-    
-    Returns:
-        Dictionary with EMI and breakdown
-    """
-    
-    # Monthly interest rate
+from tools.emi_cache import cached_emi, emi_cache, emi_formula
+
+YEARLY_COLUMNS = ('year', 'opening_balance', 'principal_paid', 'interest_paid', 'total_paid', 'closing_balance')
+
+
+def _yearly_rows(loan_amount: float, interest_rate: float, tenure_months: int) -> tuple:
+    """Year-wise breakdown as tuples in YEARLY_COLUMNS order (immutable, so it can be cached)"""
     monthly_rate = interest_rate / 12 / 100
+    emi = emi_formula(loan_amount, interest_rate, tenure_months)[0]
     
-    # EMI Formula: P × r × (1 + r)^n / ((1 + r)^n - 1)
-    if monthly_rate == 0:
-        emi = loan_amount / tenure_months
-    else:
-        emi = loan_amount * monthly_rate * ((1 + monthly_rate) ** tenure_months) / (
-            ((1 + monthly_rate) ** tenure_months) - 1
-        )
-    
-    total_amount = emi * tenure_months
-    total_interest = total_amount - loan_amount
-    
-    # Year-wise breakdown
-    yearly_breakdown = []
+    rows = []
     remaining_principal = loan_amount
     
     for year in range(1, (tenure_months // 12) + 2):
@@ -51,14 +33,37 @@ def calculate_emi(loan_amount: float, interest_rate: float, tenure_months: int)
             year_principal += month_principal
             remaining_principal -= month_principal
         
-        yearly_breakdown.append({
-            "year": year,
-            "opening_balance": round(remaining_principal + year_principal, 2),
-            "principal_paid": round(year_principal, 2),
-            "interest_paid": round(year_interest, 2),
-            "total_paid": round(year_principal + year_interest, 2),
-            "closing_balance": round(max(0, remaining_principal), 2)
-        })
+        rows.append((
+            year,
+            round(remaining_principal + year_principal, 2),
+            round(year_principal, 2),
+            round(year_interest, 2),
+            round(year_principal + year_interest, 2),
+            round(max(0, remaining_principal), 2)
+        ))
+    
+    return tuple(rows)
+
+
+def calculate_emi(loan_amount: float, interest_rate: float, tenure_months: int) -> dict:
+    """
+    Calculate EMI using standard formula
+    
+    EMI and the yearly breakdown come from the shared EMI cache, keyed on
+    the amount in paisa, the rate in basis points and whole months.
+    
+    Args:
+        loan_amount: Principal amount in INR
+        interest_rate: Annual interest rate (e.g., 10.5 for 10.5%)
+        tenure_months: Loan tenure in months
+    
+    Returns:
+        Dictionary with EMI and breakdown
+    """
+    
+    emi, total_amount, total_interest = cached_emi(loan_amount, interest_rate, tenure_months)
+    yearly_breakdown = [dict(zip(YEARLY_COLUMNS, row)) for row in
+                        emi_cache.get_or_compute('yearly', loan_amount, interest_rate, tenure_months, _yearly_rows)]
     
     return {
         "loan_amount": round(loan_amount, 2),
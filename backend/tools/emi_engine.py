@@ -0,0 +1,237 @@
+"""
+Batch EMI Engine
+Vectorized EMI, totals and amortization for arrays of loans. Balances come
+from the closed form B_k = P(1+r)^k - EMI((1+r)^k - 1)/r, so a yearly
+breakdown needs only the balances at year boundaries and a monthly
+schedule is one broadcast over (loans x months) - no per-month Python loop.
+Single schedules can also be generated lazily row by row for streaming.
+"""
+
+import calendar
+from datetime import date
+
+import numpy as np
+
+MAX_TENURE_MONTHS = 600
+
+SCHEDULE_COLUMNS = ('month', 'date', 'emi', 'interest', 'principal', 'balance')
+
+
+def _as_arrays(principal, rate, tenure):
+    """float64 principal and annual rate, int64 tenure in months, broadcast to one shape"""
+    principal, rate, tenure = np.broadcast_arrays(
+        np.asarray(principal, dtype=np.float64),
+        np.asarray(rate, dtype=np.float64),
+        np.rint(np.asarray(tenure, dtype=np.float64)).astype(np.int64)
+    )
+    return principal.ravel(), rate.ravel(), tenure.ravel()
+
+
+def _balance_after(principal, monthly_rate, emi, months):
+    """Outstanding balance after `months` payments (months broadcast against the loans)"""
+    growth = np.power(1 + monthly_rate, months)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        balance = principal * growth - emi * (growth - 1) / monthly_rate
+    # Interest-free loans: straight-line repayment
+    balance = np.where(monthly_rate == 0, principal - emi * months, balance)
+    return np.maximum(balance, 0.0)
+
+
+def batch_emi(principal, rate, tenure) -> dict:
+    """
+    EMI and totals for many loans at once
+
+    Args:
+        principal: Loan amounts in INR (scalar or array)
+        rate: Annual interest rates in percent (e.g. 10.5)
+        tenure: Tenures in months
+
+    Returns:
+        Dictionary of float64 arrays: emi, total_amount, total_interest
+        (plus the broadcast principal, rate and tenure)
+    """
+    principal, rate, tenure = _as_arrays(principal, rate, tenure)
+    monthly_rate = rate / 12 / 100
+
+    growth = np.power(1 + monthly_rate, tenure)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = principal * monthly_rate * growth / (growth - 1)
+    emi = np.where(monthly_rate == 0, principal / tenure, emi)
+
+    total_amount = emi * tenure
+    return {
+        'principal': principal,
+        'rate': rate,
+        'tenure': tenure,
+        'emi': emi,
+        'total_amount': total_amount,
+        'total_interest': total_amount - principal
+    }
+
+
+def yearly_breakdown(principal, rate, tenure) -> dict:
+    """
+    Per-year principal and interest for many loans
+
+    Returns:
+        batch_emi() arrays plus (loans x years) arrays opening_balance,
+        principal_paid, interest_paid, total_paid, closing_balance and a
+        boolean `valid` mask for years within each loan's tenure
+    """
+    result = batch_emi(principal, rate, tenure)
+    principal, tenure, emi = result['principal'], result['tenure'], result['emi']
+    monthly_rate = (result['rate'] / 12 / 100)[:, None]
+
+    years = int(-(-tenure.max() // 12)) if len(tenure) else 0
+    boundaries = np.minimum(np.arange(years + 1) * 12, tenure[:, None])  # Payments made by each year end
+    balances = _balance_after(principal[:, None], monthly_rate, emi[:, None], boundaries)
+
+    opening, closing = balances[:, :-1], balances[:, 1:]
+    months_in_year = np.diff(boundaries, axis=1)
+    total_paid = emi[:, None] * months_in_year
+    principal_paid = opening - closing
+
+    result.update(
+        valid=months_in_year > 0,
+        opening_balance=opening,
+        principal_paid=principal_paid,
+        interest_paid=total_paid - principal_paid,
+        total_paid=total_paid,
+        closing_balance=closing
+    )
+    return result
+
+
+def monthly_schedule(principal, rate, tenure) -> dict:
+    """
+    Full month-by-month amortization for many loans
+
+    Memory is loans x longest tenure x 8 bytes per column, so callers
+    should batch large portfolios.
+
+    Returns:
+        batch_emi() arrays plus (loans x months) arrays interest, principal_paid,
+        balance and a boolean `valid` mask for months within each tenure
+    """
+    result = batch_emi(principal, rate, tenure)
+    principal, tenure, emi = result['principal'], result['tenure'], result['emi']
+    monthly_rate = (result['rate'] / 12 / 100)[:, None]
+
+    months = np.arange(0, int(tenure.max()) + 1 if len(tenure) else 1)
+    valid = months[1:] <= tenure[:, None]
+    balances = _balance_after(principal[:, None], monthly_rate, emi[:, None], np.minimum(months, tenure[:, None]))
+
+    interest = np.where(valid, balances[:, :-1] * monthly_rate, 0.0)
+    principal_paid = np.where(valid, balances[:, :-1] - balances[:, 1:], 0.0)
+
+    result.update(valid=valid, interest=interest, principal_paid=principal_paid, balance=balances[:, 1:])
+    return result
+
+
+def loan_rows(result: dict, breakdown: str = None) -> list:
+    """JSON-ready per-loan dicts from a batch result, rounded like calculate_emi"""
+    rows = []
+    for i in range(len(result['emi'])):
+        row = {
+            'principal': round(float(result['principal'][i]), 2),
+            'rate': float(result['rate'][i]),
+            'tenure': int(result['tenure'][i]),
+            'emi': round(float(result['emi'][i]), 2),
+            'total_amount': round(float(result['total_amount'][i]), 2),
+            'total_interest': round(float(result['total_interest'][i]), 2)
+        }
+        if breakdown == 'yearly':
+            n = int(result['valid'][i].sum())
+            columns = [np.round(result[name][i, :n], 2).tolist() for name in
+                       ('opening_balance', 'principal_paid', 'interest_paid', 'total_paid', 'closing_balance')]
+            row['yearly_breakdown'] = [{
+                'year': year + 1,
+                'opening_balance': opening,
+                'principal_paid': principal_paid,
+                'interest_paid': interest_paid,
+                'total_paid': total_paid,
+                'closing_balance': closing
+            } for year, (opening, principal_paid, interest_paid, total_paid, closing) in enumerate(zip(*columns))]
+        elif breakdown == 'monthly':
+            n = int(result['tenure'][i])
+            row['schedule'] = {
+                'interest': np.round(result['interest'][i, :n], 2).tolist(),
+                'principal': np.round(result['principal_paid'][i, :n], 2).tolist(),
+                'balance': np.round(result['balance'][i, :n], 2).tolist()
+            }
+        rows.append(row)
+    return rows
+
+
+def add_months(first: date, months: int) -> date:
+    """Same day `months` later, clamped to the end of shorter months"""
+    month_index = first.year * 12 + first.month - 1 + months
+    year, month = divmod(month_index, 12)
+    return date(year, month + 1, min(first.day, calendar.monthrange(year, month + 1)[1]))
+
+
+def iter_schedule(principal: float, rate: float, tenure: int, first_payment: date = None):
+    """
+    Month-by-month amortization rows, computed one at a time
+
+    Nothing is materialized, so a 30-year schedule can be streamed row by
+    row. The last payment absorbs rounding so the balance ends at zero.
+
+    Args:
+        principal: Loan amount in INR
+        rate: Annual interest rate in percent
+        tenure: Tenure in months
+        first_payment: Date of the first EMI (rows carry dates when given)
+
+    Yields:
+        Tuples in SCHEDULE_COLUMNS order: (month, date or None, emi,
+        interest, principal, balance)
+    """
+    tenure = int(tenure)
+    monthly_rate = rate / 12 / 100
+    emi = float(batch_emi(principal, rate, tenure)['emi'][0])
+    balance = float(principal)
+
+    for month in range(1, tenure + 1):
+        interest = balance * monthly_rate
+        repaid = balance if month == tenure else min(emi - interest, balance)
+        balance -= repaid
+        yield (month, add_months(first_payment, month - 1) if first_payment else None,
+               repaid + interest, interest, repaid, balance)
+
+
+def schedule_json(principal: float, rate: float, tenure: int, first_payment: date = None, rows_per_chunk: int = 60):
+    """A schedule as a streamed JSON document, a chunk of rows at a time"""
+    emi = float(batch_emi(principal, rate, tenure)['emi'][0])
+    rows = iter_schedule(principal, rate, tenure, first_payment)
+
+    yield (f'{{"principal": {round(float(principal), 2)}, "rate": {float(rate)}, "tenure": {int(tenure)}, '
+           f'"emi": {round(emi, 2)}, "schedule": [')
+    chunk, total_interest, separator = [], 0.0, ''
+    for month, when, payment, interest, repaid, balance in rows:
+        total_interest += interest
+        day = f'"{when.isoformat()}"' if when else 'null'
+        chunk.append(f'{separator}{{"month": {month}, "date": {day}, '
+                     f'"emi": {round(payment, 2)}, "interest": {round(interest, 2)}, '
+                     f'"principal": {round(repaid, 2)}, "balance": {round(balance, 2)}}}')
+        separator = ', '
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    yield ''.join(chunk) + f'], "total_interest": {round(total_interest, 2)}}}'
+
+
+def schedule_csv(principal: float, rate: float, tenure: int, first_payment: date = None, rows_per_chunk: int = 120):
+    """A schedule as streamed CSV text with a header row"""
+    rows = iter_schedule(principal, rate, tenure, first_payment)
+
+    yield ','.join(SCHEDULE_COLUMNS) + '\r\n'
+    chunk = []
+    for month, when, payment, interest, repaid, balance in rows:
+        chunk.append(f"{month},{when.isoformat() if when else ''},{payment:.2f},{interest:.2f},"
+                     f"{repaid:.2f},{balance:.2f}\r\n")
+        if len(chunk) >= rows_per_chunk:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
@@ -2,12 +2,38 @@
 Loan Eligibility Checker Tool
 """
 
+from sqlalchemy.exc import SQLAlchemyError
+
+from tools.eligibility_engine import BankSnapshot, bank_snapshot, evaluate, ranked_offers, MAX_EMI_SHARE
+
+TOP_OFFERS = 5
+
+
+def _bank_snapshot():
+    """(snapshot, True) from the bank table, or the typical-rate row (False) when there are no banks to use"""
+    from flask import has_app_context
+    
+    if has_app_context():
+        try:
+            snapshot = bank_snapshot()
+            if len(snapshot):
+                return snapshot, True
+        except SQLAlchemyError:
+            pass
+    return BankSnapshot.typical(), False
+
+
 def check_loan_eligibility(monthly_income: float, loan_amount: float, loan_type: str, 
                           credit_score: int = None, employment_type: str = None, 
-                          existing_loans: bool = False) -> dict:
+                          existing_loans: bool = False, existing_emi: float = 0.0,
+                          tenure_months: int = None) -> dict:
     """
     Check loan eligibility based on financial parameters
     
+    Every bank is evaluated at once (see tools.eligibility_engine): exact
+    EMI at its rate for the product, its CIBIL minimum and loan limits,
+    and the largest loan the income supports at its rate and tenure.
+    
     Args:
         monthly_income: Monthly income in INR
         loan_amount: Requested loan amount in INR
@@ -15,55 +41,80 @@ def check_loan_eligibility(monthly_income: float, loan_amount: float, loan_type:
         credit_score: CIBIL score (300-900)
         employment_type: salaried, self_employed, business
         existing_loans: Whether user has existing loans
+        existing_emi: Total EMIs already paid per month, in INR
+        tenure_months: Preferred tenure (the longest each bank allows when omitted)
     
     Returns:
-        Dictionary with eligibility status and details
+        Dictionary with eligibility status, details and ranked bank offers
     """
     
-    # Calculate maximum eligible loan (50x monthly income)
-    max_eligible = monthly_income * 50
+    snapshot, from_banks = _bank_snapshot()
+    result = evaluate(snapshot, monthly_income, loan_amount, loan_type, credit_score, existing_emi, tenure_months)
+    if from_banks and not len(result['order']):
+        # No bank has a rate for this product
+        snapshot, from_banks = BankSnapshot.typical(), False
+        result = evaluate(snapshot, monthly_income, loan_amount, loan_type, credit_score, existing_emi, tenure_months)
+    
+    offered = result['offered']
+    best = int(result['order'][0])
+    banks_eligible = int(result['eligible'].sum())
+    eligible = banks_eligible > 0
     
-    # Calculate EMI to income ratio (should be <50%)
-    estimated_emi = loan_amount * 0.015  # Rough estimate: 1.5% of loan amount
-    emi_ratio = (estimated_emi / monthly_income) * 100
+    # Best-ranked bank's terms
+    estimated_emi = float(result['emi'][best])
+    emi_ratio = ((estimated_emi + existing_emi) / monthly_income) * 100
+    max_eligible = float(result['max_amount'].max())
+    max_share = MAX_EMI_SHARE * 100
     
     # Initialize results
-    eligible = True
     reasons = []
     suggestions = []
     risk_level = "Low"
     
-    # Check 1: Loan amount vs income
-    if loan_amount > max_eligible:
-        eligible = False
-        reasons.append(f"Requested ₹{loan_amount:,.0f} exceeds max eligible ₹{max_eligible:,.0f}")
-        suggestions.append(f"Consider reducing loan amount to ₹{max_eligible:,.0f} or below")
-    
-    # Check 2: Credit score
+    # Check 1: Credit score against each bank's minimum
     if credit_score:
-        if credit_score < 600:
-            eligible = False
+        score_ok = result['score_ok'][offered]
+        if not score_ok.any():
             risk_level = "High"
-            reasons.append(f"Credit score {credit_score} is too low (minimum 600 required)")
+            reasons.append(f"Credit score {credit_score} is below every bank's minimum "
+                           f"(lowest: {snapshot.min_cibil[offered].min():.0f})")
             suggestions.append("Improve credit score before applying - pay bills on time, reduce credit utilization")
-        elif credit_score < 700:
-            risk_level = "Medium"
-            suggestions.append("Credit score {credit_score} is acceptable but improving to 700+ will get better rates")
         else:
-            suggestions.append(f"Excellent credit score {credit_score}! You qualify for best interest rates")
+            if credit_score < 700:
+                risk_level = "Medium"
+                suggestions.append(f"Credit score {credit_score} is acceptable but improving to 700+ will get better rates")
+            else:
+                suggestions.append(f"Excellent credit score {credit_score}! You qualify for best interest rates")
+            if not score_ok.all():
+                suggestions.append(f"{int((~score_ok).sum())} of {int(offered.sum())} banks need a higher CIBIL score")
     
-    # Check 3: EMI to income ratio
-    if emi_ratio > 50:
-        eligible = False
-        reasons.append(f"EMI would be {emi_ratio:.1f}% of income (max allowed: 50%)")
+    # Check 2: Loan amount vs what income and bank limits allow
+    if 0 < max_eligible < loan_amount:
+        reasons.append(f"Requested ₹{loan_amount:,.0f} exceeds max eligible ₹{max_eligible:,.0f}")
+        suggestions.append(f"Consider reducing loan amount to ₹{max_eligible:,.0f} or below")
+    elif not result['amount_ok'][offered].any():
+        reasons.append(f"₹{loan_amount:,.0f} is below every bank's minimum loan amount "
+                       f"(lowest: ₹{snapshot.min_loan[offered].min():,.0f})")
+    
+    # Check 3: EMI to income ratio (including existing EMIs)
+    if emi_ratio > max_share:
+        reasons.append(f"EMI would be {emi_ratio:.1f}% of income (max allowed: {max_share:.0f}%)")
         suggestions.append("Reduce loan amount or extend tenure to lower EMI")
     elif emi_ratio > 40:
-        risk_level = "Medium"
+        if risk_level == "Low":
+            risk_level = "Medium"
         suggestions.append(f"EMI is {emi_ratio:.1f}% of income - manageable but leaves little room for savings")
     
     # Check 4: Existing loans
-    if existing_loans:
-        suggestions.append("Existing loans will be considered - ensure combined EMI stays under 50% of income")
+    if existing_loans and not existing_emi:
+        suggestions.append(f"Existing loans will be considered - ensure combined EMI stays under {max_share:.0f}% of income")
+    
+    if not eligible and not reasons:
+        reasons.append("No single bank meets every criterion - see the bank offers for what each one needs")
+    if eligible and from_banks:
+        suggestions.insert(0, f"Best offer: {snapshot.names[best]} at {result['rate'][best]:.2f}% - "
+                              f"EMI ₹{estimated_emi:,.0f} over {int(result['tenure'][best])} months "
+                              f"({banks_eligible} of {int(offered.sum())} banks eligible)")
     
     # Loan type specific advice
     loan_specific_tips = {
@@ -80,11 +131,18 @@ def check_loan_eligibility(monthly_income: float, loan_amount: float, loan_type:
         "risk_level": risk_level,
         "loan_type": loan_type,
         "requested_amount": loan_amount,
-        "max_eligible_amount": max_eligible,
+        "max_eligible_amount": round(max_eligible, 2),
         "monthly_income": monthly_income,
         "credit_score": credit_score,
         "estimated_monthly_emi": round(estimated_emi, 2),
         "emi_to_income_ratio": round(emi_ratio, 1),
+        "interest_rate": float(result['rate'][best]),
+        "tenure_months": int(result['tenure'][best]),
+        "existing_emi": existing_emi,
+        "rates_source": "banks" if from_banks else "typical",
+        "banks_evaluated": int(offered.sum()) if from_banks else 0,
+        "banks_eligible": banks_eligible if from_banks else 0,
+        "bank_offers": ranked_offers(snapshot, result, TOP_OFFERS) if from_banks else [],
         "reasons": reasons if not eligible else ["✓ All basic eligibility criteria met"],
         "suggestions": suggestions,
         "loan_specific_tips": loan_specific_tips.get(loan_type, []),
@@ -0,0 +1,453 @@
+"""
+Loan Simulation Tool
+Applies prepayments, rate resets and EMI changes to an amortization
+schedule. Between two events the loan follows the closed-form balance
+B_k = B(1+r)^k - EMI((1+r)^k - 1)/r, so each stretch is one vectorized
+segment; LoanSimulation keeps the schedule and, when events change,
+recomputes only the tail from the first affected month. Scenario
+summaries need no schedule at all - O(events) each, or one NumPy pass for
+a sweep of single prepayments.
+"""
+
+import math
+from bisect import bisect_left
+from datetime import date
+
+import numpy as np
+
+from tools.emi_engine import MAX_TENURE_MONTHS, add_months
+
+EVENT_TYPES = ('prepayment', 'rate_change', 'emi_change')
+
+# Closing a loan on a floating-point hair over a whole month shouldn't add a month
+_EPSILON = 1e-9
+
+
+class SimulationError(ValueError):
+    """Event list that can't be applied to the loan"""
+
+
+def _emi(balance: float, monthly_rate: float, months: int) -> float:
+    if months <= 0:
+        return balance * (1 + monthly_rate)
+    if monthly_rate == 0:
+        return balance / months
+    growth = (1 + monthly_rate) ** months
+    return balance * monthly_rate * growth / (growth - 1)
+
+
+def _months_to_close(balance: float, monthly_rate: float, emi: float) -> int:
+    """Payments of `emi` needed to clear `balance` (the last one may be smaller)"""
+    if balance <= _EPSILON:
+        return 0
+    if monthly_rate == 0:
+        return math.ceil(balance / emi - _EPSILON)
+    if emi <= balance * monthly_rate:
+        return None  # EMI doesn't cover the interest
+    return math.ceil(-math.log(1 - balance * monthly_rate / emi) / math.log(1 + monthly_rate) - _EPSILON)
+
+
+def _balance_after(balance: float, monthly_rate: float, emi: float, months: int) -> float:
+    if monthly_rate == 0:
+        return max(balance - emi * months, 0.0)
+    growth = (1 + monthly_rate) ** months
+    return max(balance * growth - emi * (growth - 1) / monthly_rate, 0.0)
+
+
+def normalize_events(events, first_payment: date = None, tenure: int = None) -> list:
+    """
+    Validate events and sort them by month
+
+    Each event is a dict with 'type' and either 'month' (payments made
+    before it applies; 0 = before the first EMI) or 'date' (needs
+    first_payment), plus:
+        prepayment: amount, reduce ('tenure' or 'emi', default tenure)
+        rate_change: rate (annual %), adjust ('tenure' or 'emi', default tenure)
+        emi_change: emi (new amount) or step_up_percent
+
+    With `tenure`, every event must fall within the loan's term
+    (month 0 to tenure - 1).
+
+    Raises:
+        SimulationError: On an unknown type, missing/invalid values or a
+            month outside the term
+    """
+    normalized = []
+    for index, event in enumerate(events or []):
+        kind = event.get('type')
+        if kind not in EVENT_TYPES:
+            raise SimulationError(f"Event {index}: type must be one of {', '.join(EVENT_TYPES)}")
+        try:
+            if 'month' in event:
+                month = int(event['month'])
+            elif 'date' in event and first_payment:
+                when = event['date'] if isinstance(event['date'], date) else date.fromisoformat(event['date'])
+                # Payments made on or before the event date
+                month = (when.year - first_payment.year) * 12 + when.month - first_payment.month + \
+                    (1 if when.day >= first_payment.day else 0)
+            else:
+                raise SimulationError(f"Event {index}: needs 'month' (or 'date' with a first payment date)")
+            if month < 0 or (tenure is not None and month >= tenure):
+                raise SimulationError(f"Event {index}: month {month} is outside the loan's term "
+                                      f"(0 to {(tenure or MAX_TENURE_MONTHS) - 1})")
+            item = {'type': kind, 'month': month}
+            if kind == 'prepayment':
+                item['amount'] = float(event['amount'])
+                item['reduce'] = event.get('reduce', 'tenure')
+                if item['amount'] <= 0 or item['reduce'] not in ('tenure', 'emi'):
+                    raise ValueError
+            elif kind == 'rate_change':
+                item['rate'] = float(event['rate'])
+                item['adjust'] = event.get('adjust', 'tenure')
+                if item['rate'] < 0 or item['adjust'] not in ('tenure', 'emi'):
+                    raise ValueError
+            else:
+                if 'emi' in event:
+                    item['emi'] = float(event['emi'])
+                    if item['emi'] <= 0:
+                        raise ValueError
+                else:
+                    item['step_up_percent'] = float(event['step_up_percent'])
+        except SimulationError:
+            raise
+        except (KeyError, TypeError, ValueError):
+            raise SimulationError(f"Event {index}: invalid or missing values for {kind}")
+        normalized.append(item)
+
+    # Stable: events in the same month apply in the order given
+    return sorted(normalized, key=lambda item: item['month'])
+
+
+def _apply(event: dict, balance: float, monthly_rate: float, emi: float, end: int, month: int):
+    """
+    One event on the loan state after `month` payments
+
+    Returns:
+        (balance, monthly_rate, emi, end month, amount prepaid, what was
+        adjusted - 'tenure', 'emi' or None for an EMI change)
+    """
+    prepaid = 0.0
+    kind = event['type']
+    adjusted = None
+
+    if kind == 'prepayment':
+        prepaid = min(event['amount'], balance)
+        balance -= prepaid
+        adjusted = event['reduce']
+        if adjusted == 'emi':
+            emi = _emi(balance, monthly_rate, end - month)
+    elif kind == 'rate_change':
+        monthly_rate = event['rate'] / 12 / 100
+        adjusted = event['adjust']
+        if adjusted == 'emi':
+            emi = _emi(balance, monthly_rate, end - month)
+    else:
+        emi = event['emi'] if 'emi' in event else emi * (1 + event['step_up_percent'] / 100)
+
+    if balance <= _EPSILON:
+        return 0.0, monthly_rate, emi, month, prepaid, adjusted
+
+    remaining = _months_to_close(balance, monthly_rate, emi)
+    if remaining is None or month + remaining > MAX_TENURE_MONTHS:
+        if kind == 'emi_change':
+            raise SimulationError(f"EMI of {emi:,.2f} at month {month} doesn't cover the interest")
+        # Keeping the EMI would never close the loan - banks re-price the EMI instead
+        emi = _emi(balance, monthly_rate, max(end - month, 1))
+        remaining = _months_to_close(balance, monthly_rate, emi)
+        adjusted = 'emi'
+    return balance, monthly_rate, emi, month + remaining, prepaid, adjusted
+
+
+def summarize(principal: float, rate: float, tenure: int, events=()) -> dict:
+    """
+    Totals for a loan under events, without building the schedule
+
+    O(number of events): each stretch between events is evaluated in
+    closed form. `events` must already be normalized. 'notes' lists the
+    events that didn't apply as asked (EMI re-priced instead of extending
+    the tenure, or the loan already closed).
+    """
+    monthly_rate = rate / 12 / 100
+    emi = _emi(principal, monthly_rate, tenure)
+    balance, end, month = float(principal), int(tenure), 0
+    paid = prepaid = 0.0
+    notes = []
+
+    for event in list(events) + [None]:
+        stop = min(event['month'], end) if event else end
+        if stop > month:
+            if stop == end:
+                # Runs to the close: last payment clears what's left
+                before_last = _balance_after(balance, monthly_rate, emi, stop - month - 1)
+                paid += emi * (stop - month - 1) + before_last * (1 + monthly_rate)
+                balance = 0.0
+            else:
+                after = _balance_after(balance, monthly_rate, emi, stop - month)
+                paid += emi * (stop - month)
+                balance = after
+            month = stop
+        if event is None:
+            break
+        if balance <= _EPSILON:
+            notes.append(_event_note(event, None))
+            continue
+        requested = event.get('reduce', event.get('adjust'))
+        balance, monthly_rate, emi, end, amount, adjusted = _apply(event, balance, monthly_rate, emi, end, month)
+        prepaid += amount
+        if adjusted != requested:
+            notes.append(_event_note(event, adjusted))
+
+    return {
+        'months': end,
+        'total_interest': paid + prepaid - principal,
+        'total_paid': paid + prepaid,
+        'prepaid': prepaid,
+        'final_emi': emi,
+        'final_rate': monthly_rate * 12 * 100,
+        'notes': notes
+    }
+
+
+def _event_note(event: dict, adjusted) -> str:
+    """Why an event didn't apply as asked: adjusted is what changed instead, None if it never applied"""
+    if adjusted is None:
+        return f"Month {event['month']} {event['type']}: not applied, the loan is already closed"
+    return (f"Month {event['month']} {event['type']}: the EMI no longer covers the interest, "
+            f"so the EMI was re-priced instead of extending the tenure")
+
+
+class LoanSimulation:
+    """
+    A loan's monthly schedule under a list of events
+
+    The schedule is a struct of float64 arrays plus the parameter segments
+    that produced it. add_event()/remove_event() keep everything before the
+    event's month and recompute only the tail.
+    """
+
+    def __init__(self, principal: float, rate: float, tenure: int, events=(), first_payment: date = None):
+        self.principal = float(principal)
+        self.rate = float(rate)
+        self.tenure = int(tenure)
+        self.first_payment = first_payment
+        self.events = normalize_events(events, first_payment, self.tenure)
+        self.interest = np.empty(0)
+        self.principal_paid = np.empty(0)
+        self.balance = np.empty(0)
+        self.payment = np.empty(0)
+        # (from month, monthly rate, emi, end month, prepaid, adjusted): parameters for payments after
+        # `from month`, one per applied event after the initial one
+        self.segments = []
+        self.recomputed_months = 0
+        self._recompute(0)
+
+    def add_event(self, event: dict):
+        """Apply one more event, recomputing from its month on"""
+        event = normalize_events([event], self.first_payment, self.tenure)[0]
+        # After existing events of the same month
+        position = bisect_left([e['month'] for e in self.events], event['month'] + 1)
+        self.events.insert(position, event)
+        self._recompute(event['month'])
+
+    def remove_event(self, index: int):
+        event = self.events.pop(index)
+        self._recompute(event['month'])
+
+    def _state_before(self, month: int):
+        """(balance, monthly rate, emi, end) after `month` payments, before that month's events"""
+        balance = self.balance[month - 1] if month > 0 else self.principal
+        for start, monthly_rate, emi, end, _, _ in reversed(self.segments):
+            if start < month:
+                return balance, monthly_rate, emi, end
+        monthly_rate = self.rate / 12 / 100
+        return balance, monthly_rate, _emi(self.principal, monthly_rate, self.tenure), self.tenure
+
+    def _recompute(self, month: int):
+        month = min(month, len(self.balance))
+        balance, monthly_rate, emi, end = self._state_before(month)
+        self.segments = [segment for segment in self.segments if segment[0] < month]
+        if not self.segments:
+            self.segments.append((-1, monthly_rate, emi, end, 0.0, None))
+
+        pieces = [(self.interest[:month], self.principal_paid[:month], self.balance[:month], self.payment[:month])]
+        pending = [event for event in self.events if event['month'] >= month]
+        start = month
+
+        for event in pending + [None]:
+            if balance <= _EPSILON:
+                break
+            stop = min(event['month'], end) if event else end
+            if stop > start:
+                pieces.append(self._segment(balance, monthly_rate, emi, stop - start, closes=stop == end))
+                balance = float(pieces[-1][2][-1])
+                start = stop
+            if event is None or balance <= _EPSILON:
+                break
+            balance, monthly_rate, emi, end, prepaid, adjusted = _apply(event, balance, monthly_rate, emi, end, start)
+            self.segments.append((start, monthly_rate, emi, end, prepaid, adjusted))
+
+        self.interest, self.principal_paid, self.balance, self.payment = (
+            np.concatenate(column) for column in zip(*pieces))
+        self.recomputed_months = len(self.balance) - month
+
+    @staticmethod
+    def _segment(balance: float, monthly_rate: float, emi: float, months: int, closes: bool = False):
+        """Schedule columns for `months` payments from one state; `closes` makes the last one clear the loan"""
+        k = np.arange(months + 1)
+        if monthly_rate == 0:
+            balances = np.maximum(balance - emi * k, 0.0)
+        else:
+            growth = (1 + monthly_rate) ** k
+            balances = np.maximum(balance * growth - emi * (growth - 1) / monthly_rate, 0.0)
+        if closes:
+            balances[-1] = 0.0
+        interest = balances[:-1] * monthly_rate
+        repaid = balances[:-1] - balances[1:]
+        return interest, repaid, balances[1:], interest + repaid
+
+    @property
+    def months(self) -> int:
+        return len(self.balance)
+
+    def summary(self) -> dict:
+        prepaid = sum(segment[4] for segment in self.segments)
+        final = self.segments[-1]
+        end = self.first_payment and add_months(self.first_payment, self.months - 1)
+        return {
+            'months': self.months,
+            'total_interest': round(float(self.interest.sum()), 2),
+            'total_paid': round(float(self.payment.sum()) + prepaid, 2),
+            'prepaid': round(prepaid, 2),
+            'final_emi': round(final[2], 2),
+            'final_rate': round(final[1] * 12 * 100, 4),
+            'closing_date': end.isoformat() if end else None
+        }
+
+    def applied_events(self) -> list:
+        """
+        The events with how each was applied
+
+        Events apply in order until the loan closes, so segments after the
+        initial one pair up with the leading events. Each copy gets
+        'applied', 'adjusted' (what actually changed - 'tenure' or 'emi' -
+        for prepayments and rate changes) and a 'note' when that differs
+        from what was asked or the loan had already closed.
+        """
+        results = []
+        for index, event in enumerate(self.events):
+            item = dict(event)
+            if index + 1 < len(self.segments):
+                adjusted = self.segments[index + 1][5]
+                item['applied'] = True
+                if adjusted is not None:
+                    item['adjusted'] = adjusted
+                    if adjusted != event.get('reduce', event.get('adjust')):
+                        item['note'] = _event_note(event, adjusted)
+            else:
+                item['applied'] = False
+                item['note'] = _event_note(event, None)
+            results.append(item)
+        return results
+
+    def yearly(self) -> list:
+        """Per-year totals of the schedule"""
+        rows = []
+        for year, offset in enumerate(range(0, self.months, 12), start=1):
+            window = slice(offset, offset + 12)
+            opening = self.balance[offset - 1] if offset else self.principal
+            rows.append({
+                'year': year,
+                'opening_balance': round(float(opening), 2),
+                'principal_paid': round(float(self.principal_paid[window].sum()), 2),
+                'interest_paid': round(float(self.interest[window].sum()), 2),
+                'total_paid': round(float(self.payment[window].sum()), 2),
+                'closing_balance': round(float(self.balance[window][-1]), 2)
+            })
+        return rows
+
+
+def compare_scenarios(principal: float, rate: float, tenure: int, scenarios: dict, first_payment: date = None) -> dict:
+    """
+    Side-by-side totals for named event lists against the unchanged loan
+
+    Returns:
+        Dict with 'baseline' and 'scenarios' (name -> totals plus interest
+        and months saved)
+    """
+    baseline = summarize(principal, rate, tenure)
+    results = {}
+    for name, events in scenarios.items():
+        totals = summarize(principal, rate, tenure, normalize_events(events, first_payment, tenure))
+        totals['interest_saved'] = baseline['total_interest'] - totals['total_interest']
+        totals['months_saved'] = baseline['months'] - totals['months']
+        if first_payment:
+            totals['closing_date'] = add_months(first_payment, totals['months'] - 1).isoformat()
+        results[name] = {key: round(value, 2) if isinstance(value, float) else value for key, value in totals.items()}
+
+    if first_payment:
+        baseline['closing_date'] = add_months(first_payment, baseline['months'] - 1).isoformat()
+    return {
+        'baseline': {key: round(value, 2) if isinstance(value, float) else value for key, value in baseline.items()},
+        'scenarios': results
+    }
+
+
+def sweep_prepayments(principal: float, rate: float, tenure: int, months, amounts, reduce: str = 'tenure') -> dict:
+    """
+    Interest and tenure after one lump-sum prepayment, for many (month, amount) pairs at once
+
+    Args:
+        months: Payments made before each prepayment (array)
+        amounts: Prepayment amounts (array, broadcast against months)
+        reduce: 'tenure' keeps the EMI, 'emi' keeps the end date
+
+    Returns:
+        Dict of arrays: months (total tenure), total_interest, interest_saved, emi
+    """
+    monthly_rate = rate / 12 / 100
+    emi = _emi(principal, monthly_rate, tenure)
+    at, amount = np.broadcast_arrays(np.minimum(np.asarray(months, dtype=np.int64), tenure),
+                                     np.asarray(amounts, dtype=np.float64))
+    baseline_interest = emi * tenure - principal
+
+    def balance_after(balance, payment, k):
+        if monthly_rate == 0:
+            return np.maximum(balance - payment * k, 0.0)
+        growth = (1 + monthly_rate) ** k
+        return np.maximum(balance * growth - payment * (growth - 1) / monthly_rate, 0.0)
+
+    before = balance_after(principal, emi, at)
+    interest_so_far = emi * at - (principal - before)
+    remaining = np.maximum(before - amount, 0.0)
+    left = tenure - at
+
+    if reduce == 'emi':
+        if monthly_rate == 0:
+            new_emi = np.divide(remaining, left, out=np.zeros_like(remaining), where=left > 0)
+        else:
+            growth = (1 + monthly_rate) ** left
+            new_emi = np.divide(remaining * monthly_rate * growth, growth - 1,
+                                out=np.zeros_like(remaining), where=left > 0)
+        tail_interest = new_emi * left - remaining
+        total_months = np.where(remaining > _EPSILON, tenure, at)
+    else:
+        new_emi = np.full(remaining.shape, emi)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if monthly_rate == 0:
+                n = np.ceil(remaining / emi - _EPSILON)
+            else:
+                n = np.ceil(-np.log1p(-remaining * monthly_rate / emi) / np.log1p(monthly_rate) - _EPSILON)
+        n = np.where(remaining > _EPSILON, np.maximum(n, 1), 0).astype(np.int64)
+        # n - 1 full EMIs, then a last payment that clears the balance
+        last_balance = balance_after(remaining, emi, np.maximum(n - 1, 0))
+        tail_paid = emi * np.maximum(n - 1, 0) + np.where(n > 0, last_balance * (1 + monthly_rate), 0.0)
+        tail_interest = tail_paid - remaining
+        total_months = at + n
+
+    total_interest = interest_so_far + tail_interest
+    return {
+        'months': total_months,
+        'total_interest': total_interest,
+        'interest_saved': baseline_interest - total_interest,
+        'emi': new_emi
+    }
@@ -0,0 +1,383 @@
+"""
+Spending Analytics Tool
+Loads a user's expenses into columnar NumPy arrays and computes monthly and
+category trends, rolling averages, month-over-month deltas, recurring
+payments and anomalies in vectorized passes. Reports are cached per
+(user, data version), where the version is the user's expense write
+counter in data_versions - every expense add, edit, delete or import
+bumps it.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+ROLLING_MONTHS = 3
+ANOMALY_Z = 3.0
+MIN_RECURRING = 3
+
+# Cadences recognised as recurring: (name, min gap, max gap) in days
+CADENCES = (('weekly', 6, 8), ('monthly', 26, 35), ('quarterly', 85, 97), ('yearly', 355, 375))
+
+# Reference numbers, dates and amounts vary between occurrences of the same payment
+_REFERENCE_CHARS = str.maketrans('', '', '0123456789/:#*.-_')
+_MONTH_NAMES = re.compile(r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b')
+_SPACES = re.compile(r'\s+')
+
+
+def _encode(values):
+    """Integer codes for a sequence of strings plus the code -> string table"""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+class ExpenseArrays:
+    """A user's expenses as parallel columns"""
+
+    def __init__(self, ids, days, amounts, categories, descriptions):
+        """
+        Args:
+            ids: Expense ids
+            days: Expense dates as datetime64[D]
+            amounts: float64 amounts
+            categories: Category strings
+            descriptions: Description strings
+        """
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.days = np.asarray(days, dtype='datetime64[D]')
+        self.amounts = np.asarray(amounts, dtype=np.float64)
+        self.descriptions = list(descriptions)
+        self.category_codes, self.category_labels = _encode(categories)
+
+        # Recurring detection groups by normalized description. Dropping reference
+        # digits collapses most texts, so the regex pass only sees the distinct rest
+        stripped_codes, stripped = _encode([(text or '').lower().translate(_REFERENCE_CHARS)
+                                            for text in self.descriptions])
+        normalized_codes, self.description_labels = _encode(
+            [_SPACES.sub(' ', _MONTH_NAMES.sub(' ', text)).strip() for text in stripped])
+        self.description_codes = normalized_codes[stripped_codes] if len(stripped_codes) else normalized_codes
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @classmethod
+    def load(cls, user_id: int, batch_size: int = 50000):
+        """Read the user's expenses in batches straight into arrays"""
+        from database.models import db, Expense
+
+        stmt = db.select(
+            Expense.id,
+            _epoch_days(Expense.date),
+            Expense.amount,
+            Expense.category,
+            Expense.description
+        ).where(Expense.user_id == user_id).order_by(Expense.date, Expense.id)
+
+        # Core rows on the session's connection - no ORM result processing per row
+        ids, days, amounts, categories, descriptions = [], [], [], [], []
+        result = db.session.connection().execution_options(yield_per=batch_size).execute(stmt)
+        for rows in result.partitions():
+            batch_ids, batch_days, batch_amounts, batch_categories, batch_descriptions = zip(*rows)
+            ids.extend(batch_ids)
+            days.extend(batch_days)
+            amounts.extend(batch_amounts)
+            categories.extend(batch_categories)
+            descriptions.extend(batch_descriptions)
+
+        return cls(ids, np.array(days, dtype=np.int64).astype('datetime64[D]'), amounts, categories, descriptions)
+
+
+def _epoch_days(column):
+    """SQL expression for days since 1970-01-01, so dates arrive as plain integers"""
+    from database.models import db
+
+    if db.engine.dialect.name == 'mysql':
+        return db.func.to_days(column) - 719528
+    return db.cast(db.func.julianday(column) - 2440587.5, db.Integer)
+
+
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` points (shorter at the start)"""
+    sums = np.cumsum(values, axis=0)
+    sums[window:] = sums[window:] - sums[:-window]
+    counts = np.minimum(np.arange(1, len(values) + 1), window)
+    return sums / counts.reshape((-1,) + (1,) * (values.ndim - 1))
+
+
+def _pct_change(current: np.ndarray, previous: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (current - previous) / previous * 100
+    return np.where(previous > 0, change, np.nan)
+
+
+def _round(values, digits: int = 2):
+    """Rounded list with NaN as None, for JSON"""
+    return [None if np.isnan(v) else round(float(v), digits) for v in values]
+
+
+def analyze(data: ExpenseArrays, months: int = 12, anomaly_limit: int = 20, recurring_limit: int = 20) -> dict:
+    """
+    Compute the spending report for a user's expenses
+
+    Args:
+        data: The user's expenses
+        months: Months of series to return (all history is used for stats)
+        anomaly_limit: Most unusual expenses to list
+        recurring_limit: Recurring payments to list
+
+    Returns:
+        Report dict with monthly, categories, recurring and anomalies
+    """
+    n = len(data)
+    if n == 0:
+        return {'expense_count': 0, 'total_spent': 0.0, 'monthly': [], 'categories': [],
+                'recurring': [], 'anomalies': []}
+
+    amounts = data.amounts
+    cats = data.category_codes
+    n_cats = len(data.category_labels)
+
+    # ---- Monthly and category matrices over a continuous month range ----
+    month_of = data.days.astype('datetime64[M]')
+    first_month = month_of.min()
+    month_index = (month_of - first_month).astype(np.int64)
+    n_months = int(month_index.max()) + 1
+    month_labels = np.arange(first_month, first_month + n_months, dtype='datetime64[M]').astype(str)
+
+    monthly_total = np.bincount(month_index, weights=amounts, minlength=n_months)
+    monthly_count = np.bincount(month_index, minlength=n_months)
+    by_category = np.bincount(month_index * n_cats + cats, weights=amounts,
+                              minlength=n_months * n_cats).reshape(n_months, n_cats)
+
+    rolling = _rolling_mean(monthly_total, ROLLING_MONTHS)
+    previous = np.concatenate(([np.nan], monthly_total[:-1]))
+    mom_delta = monthly_total - previous
+    mom_pct = _pct_change(monthly_total, previous)
+
+    shown = slice(max(0, n_months - months), n_months)
+    monthly = [{
+        'month': label,
+        'total': round(float(total), 2),
+        'count': int(count),
+        'rolling_avg': round(float(avg), 2),
+        'mom_delta': None if np.isnan(delta) else round(float(delta), 2),
+        'mom_pct': None if np.isnan(pct) else round(float(pct), 1)
+    } for label, total, count, avg, delta, pct in zip(
+        month_labels[shown], monthly_total[shown], monthly_count[shown],
+        rolling[shown], mom_delta[shown], mom_pct[shown])]
+
+    # ---- Category trends: least-squares slope per category over the shown window ----
+    window = by_category[shown]
+    x = np.arange(len(window), dtype=np.float64)
+    if len(window) > 1:
+        slopes = np.polyfit(x, window, 1)[0]
+    else:
+        slopes = np.zeros(n_cats)
+    category_rolling = _rolling_mean(window, ROLLING_MONTHS)
+    category_total = by_category.sum(axis=0)
+    last = window[-1]
+    before_last = window[-2] if len(window) > 1 else np.full(n_cats, np.nan)
+    category_mom = _pct_change(last, before_last)
+
+    order = np.argsort(-category_total)
+    total_spent = float(amounts.sum())
+    categories = [{
+        'category': data.category_labels[c],
+        'total': round(float(category_total[c]), 2),
+        'share': round(float(category_total[c]) / total_spent * 100, 1) if total_spent else 0.0,
+        'monthly': _round(window[:, c]),
+        'rolling_avg': _round(category_rolling[:, c]),
+        'last_month': round(float(last[c]), 2),
+        'mom_pct': None if np.isnan(category_mom[c]) else round(float(category_mom[c]), 1),
+        'trend_per_month': round(float(slopes[c]), 2),
+        'trend': 'up' if slopes[c] > 0.05 * max(window[:, c].mean(), 1) else
+                 'down' if slopes[c] < -0.05 * max(window[:, c].mean(), 1) else 'flat'
+    } for c in order]
+
+    return {
+        'expense_count': n,
+        'total_spent': round(total_spent, 2),
+        'first_date': str(data.days.min()),
+        'last_date': str(data.days.max()),
+        'months': month_labels[shown].tolist(),
+        'monthly': monthly,
+        'categories': categories,
+        'recurring': _recurring(data, recurring_limit),
+        'anomalies': _anomalies(data, anomaly_limit)
+    }
+
+
+def _recurring(data: ExpenseArrays, limit: int) -> list:
+    """
+    Payments that repeat at a steady cadence for a similar amount
+
+    Groups by normalized description, then works on the date-sorted
+    gaps within each group with segment reductions - no Python loop over
+    expenses.
+    """
+    groups = data.description_codes
+    n_groups = len(data.description_labels)
+    day_numbers = data.days.astype(np.int64)
+
+    order = np.lexsort((day_numbers, groups))
+    g = groups[order]
+    d = day_numbers[order]
+    a = data.amounts[order]
+
+    count = np.bincount(g, minlength=n_groups)
+    candidates = count >= MIN_RECURRING
+    if not candidates.any():
+        return []
+
+    # Gaps between consecutive payments of the same group
+    same = g[1:] == g[:-1]
+    gaps = (d[1:] - d[:-1])[same].astype(np.float64)
+    gap_group = g[1:][same]
+    gap_count = np.bincount(gap_group, minlength=n_groups)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gap_mean = np.bincount(gap_group, weights=gaps, minlength=n_groups) / gap_count
+        gap_std = np.sqrt(np.maximum(
+            np.bincount(gap_group, weights=gaps ** 2, minlength=n_groups) / gap_count - gap_mean ** 2, 0))
+        amount_mean = np.bincount(g, weights=a, minlength=n_groups) / count
+        amount_std = np.sqrt(np.maximum(
+            np.bincount(g, weights=a ** 2, minlength=n_groups) / count - amount_mean ** 2, 0))
+        amount_cv = amount_std / amount_mean
+
+    cadence = np.full(n_groups, -1)
+    for i, (_, low, high) in enumerate(CADENCES):
+        cadence[(gap_mean >= low) & (gap_mean <= high)] = i
+
+    steady = candidates & (cadence >= 0) & (gap_std <= np.maximum(3, gap_mean * 0.15)) & (amount_cv <= 0.15)
+    steady &= np.array([bool(label) for label in data.description_labels])
+    found = np.flatnonzero(steady)
+    if not len(found):
+        return []
+
+    # Last payment (and its category) per group: the final element of each sorted run
+    last_pos = np.searchsorted(g, found, side='right') - 1
+    last_day = d[last_pos]
+    last_category = data.category_codes[order][last_pos]
+    last_row = order[last_pos]
+
+    ranked = np.argsort(-(amount_mean[found] * 365 / gap_mean[found]))[:limit]
+    recurring = []
+    for i in ranked:
+        group = found[i]
+        name = CADENCES[cadence[group]][0]
+        recurring.append({
+            'description': data.descriptions[last_row[i]],
+            'category': data.category_labels[last_category[i]],
+            'frequency': name,
+            'amount': round(float(amount_mean[group]), 2),
+            'occurrences': int(count[group]),
+            'average_gap_days': round(float(gap_mean[group]), 1),
+            'last_date': str(np.datetime64(int(last_day[i]), 'D')),
+            'next_expected': str(np.datetime64(int(round(last_day[i] + gap_mean[group])), 'D')),
+            'yearly_cost': round(float(amount_mean[group] * 365 / gap_mean[group]), 2)
+        })
+    return recurring
+
+
+def _anomalies(data: ExpenseArrays, limit: int) -> list:
+    """Expenses far above their category's usual size (z-score of log amounts)"""
+    cats = data.category_codes
+    n_cats = len(data.category_labels)
+    log_amounts = np.log1p(np.maximum(data.amounts, 0))
+
+    count = np.bincount(cats, minlength=n_cats)
+    mean = np.bincount(cats, weights=log_amounts, minlength=n_cats) / np.maximum(count, 1)
+    variance = np.bincount(cats, weights=log_amounts ** 2, minlength=n_cats) / np.maximum(count, 1) - mean ** 2
+    std = np.sqrt(np.maximum(variance, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (log_amounts - mean[cats]) / std[cats]
+    flagged = np.flatnonzero((z > ANOMALY_Z) & (count[cats] >= 10))
+    if not len(flagged):
+        return []
+
+    top = flagged[np.argsort(-z[flagged])][:limit]
+    typical = np.expm1(mean)
+    return [{
+        'id': int(data.ids[i]),
+        'date': str(data.days[i]),
+        'category': data.category_labels[cats[i]],
+        'description': data.descriptions[i],
+        'amount': round(float(data.amounts[i]), 2),
+        'typical_amount': round(float(typical[cats[i]]), 2),
+        'z_score': round(float(z[i]), 2)
+    } for i in top]
+
+
+def expense_data_version(user_id: int) -> int:
+    """The user's expense write counter - one primary-key lookup"""
+    from database.data_versions import get_expense_version
+
+    return get_expense_version(user_id)
+
+
+class SpendingAnalytics:
+    """Per-user spending reports, cached until the user's expenses change"""
+
+    def __init__(self, max_cached: int = 256):
+        """
+        Args:
+            max_cached: Users whose latest arrays and reports are kept in memory
+        """
+        self.max_cached = max_cached
+        self._cache = OrderedDict()  # user_id -> (version, ExpenseArrays, {months: report})
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def report(self, user_id: int, months: int = 12) -> dict:
+        """Spending report for the user, recomputed only when their expense data changed"""
+        version = expense_data_version(user_id)
+
+        with self._lock:
+            entry = self._cache.get(user_id)
+            if entry and entry[0] == version:
+                self._cache.move_to_end(user_id)
+                if months in entry[2]:
+                    self.hits += 1
+                    return {**entry[2][months], 'cached': True}
+            self.misses += 1
+
+        started = time.perf_counter()
+        if entry and entry[0] == version:
+            data = entry[1]
+        else:
+            data = ExpenseArrays.load(user_id)
+        loaded = time.perf_counter()
+        result = analyze(data, months=months)
+        result['version'] = version
+        result['load_ms'] = round((loaded - started) * 1000, 1)
+        result['compute_ms'] = round((time.perf_counter() - loaded) * 1000, 1)
+
+        with self._lock:
+            current = self._cache.get(user_id)
+            reports = current[2] if current and current[0] == version else {}
+            reports[months] = result
+            self._cache[user_id] = (version, data, reports)
+            self._cache.move_to_end(user_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+
+        return {**result, 'cached': False}
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._cache.pop(user_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'users_cached': len(self._cache),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / total, 3) if total else 0.0
+            }
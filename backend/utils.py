@@ -5,10 +5,15 @@ Helper functions for chat, pagination, and common operations
 
 import time
 import re
+import json
+import base64
+import binascii
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import date, datetime
 import logging
 
+from sqlalchemy import and_, or_
+
 logger = logging.getLogger(__name__)
 
 
@@ -61,24 +66,49 @@ def simulate_typing_delay(text: str, enabled: bool = True, **kwargs) -> float:
     return delay
 
 
-def paginate_query(query, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
+class InvalidCursorError(ValueError):
+    """Cursor that doesn't decode to values for the pagination key"""
+
+
+def paginate_query(query, page: int = 1, per_page: int = 20, keyset=None, cursor: Optional[str] = None,
+                   descending: bool = True, include_total: bool = True, total: Optional[int] = None) -> Dict[str, Any]:
     """
     Paginate a SQLAlchemy query
     
+    Offset mode (default) counts the rows and uses LIMIT/OFFSET. Keyset mode
+    (pass `keyset`) seeks past the last row of the previous page instead, so
+    deep pages cost the same as the first; it fetches per_page + 1 rows to
+    tell whether there is a next page and only counts when include_total.
+    
     Args:
         query: SQLAlchemy query object
-        page: Page number (1-indexed)
+        page: Page number (1-indexed, offset mode)
         per_page: Items per page
+        keyset: Columns to page by in keyset mode, ending in a unique one,
+            e.g. (Expense.date, Expense.id); replaces the query's ordering
+        cursor: next_cursor from the previous page (None for the first page)
+        descending: Keyset order, newest first by default
+        include_total: Count matching rows in keyset mode
+        total: Row count the caller already has (e.g. from an aggregate
+            query) - used instead of running COUNT
     
     Returns:
         Dictionary with pagination metadata and items
+    
+    Raises:
+        InvalidCursorError: If the cursor doesn't match the keyset
     """
+    per_page = min(100, max(1, per_page))  # Cap at 100 items per page
+    
+    if keyset is not None:
+        return _keyset_paginate(query, list(keyset), cursor, per_page, descending, include_total, total)
+    
     # Ensure valid page number
     page = max(1, page)
-    per_page = min(100, max(1, per_page))  # Cap at 100 items per page
     
     # Get total count
-    total = query.count()
+    if total is None:
+        total = query.count()
     
     # Calculate pagination
     total_pages = (total + per_page - 1) // per_page  # Ceiling division
@@ -103,6 +133,113 @@ def paginate_query(query, page: int = 1, per_page: int = 20) -> Dict[str, Any]:
     }
 
 
+def _keyset_paginate(query, columns: list, cursor: Optional[str], per_page: int,
+                     descending: bool, include_total: bool, total: Optional[int]) -> Dict[str, Any]:
+    if total is None and include_total:
+        total = query.order_by(None).count()
+    
+    if cursor:
+        values = decode_cursor(cursor)
+        if not values or len(values) != len(columns):
+            raise InvalidCursorError('Invalid cursor')
+        values = [_cursor_value(column, value) for column, value in zip(columns, values)]
+        query = query.filter(_after_key(columns, values, descending))
+    
+    ordering = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(None).order_by(*ordering).limit(per_page + 1).all()
+    items = rows[:per_page]
+    has_next = len(rows) > per_page
+    
+    next_cursor = None
+    if has_next:
+        next_cursor = encode_cursor(*[getattr(items[-1], column.key) for column in columns])
+    
+    return {
+        'items': items,
+        'pagination': {
+            'per_page': per_page,
+            'total': total,
+            'has_next': has_next,
+            'next_cursor': next_cursor
+        }
+    }
+
+
+def _after_key(columns: list, values: list, descending: bool):
+    """(c1, c2, ...) < (v1, v2, ...) spelled out with AND/OR so every database can seek on it"""
+    def past(column, value):
+        return column < value if descending else column > value
+    
+    condition = past(columns[-1], values[-1])
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        condition = or_(past(column, value), and_(column == value, condition))
+    return condition
+
+
+def _cursor_value(column, value):
+    """Turn a decoded cursor value back into the column's Python type"""
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type in (int, float, str):
+            return python_type(value)
+    except (TypeError, ValueError):
+        raise InvalidCursorError('Invalid cursor')
+    return value
+
+
+def encode_cursor(*values) -> str:
+    """
+    Encode keyset pagination values as an opaque URL-safe cursor
+    
+    Args:
+        values: Sort key values of the last row on the page (dates/datetimes allowed)
+    
+    Returns:
+        Cursor string
+    """
+    payload = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """
+    Decode a cursor produced by encode_cursor
+    
+    Returns:
+        List of values (dates/datetimes stay ISO strings), or None if missing/invalid
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return values if isinstance(values, list) else None
+    except (ValueError, binascii.Error):
+        return None
+
+
+def month_range(month: str):
+    """
+    Date bounds of a 'YYYY-MM' month
+    
+    Returns:
+        Tuple of (first day, first day of the next month)
+    
+    Raises:
+        ValueError: If month isn't YYYY-MM
+    """
+    start = datetime.strptime(f"{month}-01", '%Y-%m-%d').date()
+    end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+    return start, end
+
+
 def sanitize_user_input(text: str, max_length: int = 2000) -> str:
     """
     Sanitize user input text